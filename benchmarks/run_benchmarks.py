@@ -0,0 +1,211 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.backends import BACKENDS, NODES_FILE, EDGES_FILE, get_backend
+from scripts_common.compressed_io import open_binary, open_text
+
+# Default output and baseline files
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.json")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# A metric this much worse than the baseline is reported as a regression
+REGRESSION_THRESHOLD = 0.20
+
+# Seconds a Query 2 worker process may run before it is stopped and the backend marked failed
+QUERY2_TIMEOUT = 1800
+
+def percentile(samples, p):
+    """ Nearest-rank percentile of a list of numbers. """
+    ordered = sorted(samples)
+    rank = max(1, int(round(p / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def sample_disease_ids(nodes_file, count, seed):
+    """ Picks `count` disease ids from nodes.tsv with a fixed seed. """
+    with open_text(nodes_file) as f:
+        next(f)  # Skip header
+        disease_ids = [line.split("\t", 1)[0] for line in f if line.rstrip("\n").endswith("\tDisease")]
+    rng = random.Random(seed)
+    return rng.sample(disease_ids, min(count, len(disease_ids)))
+
+def count_rows(path):
+    """ Number of data rows in a TSV file. """
+    with open_binary(path) as f:
+        return sum(1 for _ in f) - 1
+
+def measure_ingest(name, nodes_file, edges_file):
+    """
+    Times loading the dataset into a backend and returns rows/sec.
+    memory and pandas parse the TSV files; neo4j and cassandra run their full loaders.
+    """
+    rows = count_rows(nodes_file) + count_rows(edges_file)
+    start = time.perf_counter()
+    if name == "memory":
+        from scripts_common.csr_graph import build_csr_graph
+        build_csr_graph(nodes_file, edges_file)
+    elif name == "pandas":
+        BACKENDS["pandas"](nodes_file, edges_file).load()
+    elif name == "neo4j":
+        from scripts_neo4j.load_data import load_nodes, load_edges
+        load_nodes(nodes_file)
+        load_edges(edges_file)
+    elif name == "cassandra":
+        from scripts_cassandra import hetio_cassandra
+        hetio_cassandra.ingest_dataset(hetio_cassandra.get_session(), force=True)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "rows": rows, "rows_per_second": rows / max(elapsed, 1e-9)}
+
+def measure_query1(backend, disease_ids, repeat):
+    """ Query 1 latency percentiles (ms) over the sampled disease ids, after one warm-up call. """
+    backend.disease_info(disease_ids[0])
+    samples = []
+    for _ in range(repeat):
+        for disease_id in disease_ids:
+            start = time.perf_counter()
+            backend.disease_info(disease_id)
+            samples.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": percentile(samples, 50), "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99), "samples": len(samples)}
+
+def get_peak_rss_mib():
+    """ Peak RSS of this process in MiB; ru_maxrss is in bytes on macOS and KiB on Linux. """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def query2_worker(name, nodes_file, edges_file, results):
+    """ Runs Query 2 once in a fresh process and reports wall time and peak RSS, or the error it raised. """
+    try:
+        if name in ("memory", "pandas"):
+            backend = BACKENDS[name](nodes_file, edges_file)
+        else:
+            backend = get_backend(name)
+        start = time.perf_counter()
+        candidates = backend.new_drug_candidates()
+        elapsed = time.perf_counter() - start
+        results.put({"seconds": elapsed, "peak_rss_mib": get_peak_rss_mib(), "candidates": len(candidates)})
+    except Exception as exc:
+        results.put({"error": repr(exc)})
+
+def measure_query2(name, nodes_file, edges_file, timeout=QUERY2_TIMEOUT):
+    """
+    Query 2 wall time and peak RSS, measured in a separate process so backends do not
+    share memory high-water marks. For memory and pandas this includes loading the data.
+    Returns {"error": ...} if the worker fails, dies without a result or runs past `timeout` seconds.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=query2_worker, args=(name, nodes_file, edges_file, results))
+    process.start()
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                try:
+                    result = results.get(timeout=1)  # A result sent just before exiting
+                except queue.Empty:
+                    result = {"error": f"worker exited with code {process.exitcode} without a result"}
+            elif time.monotonic() > deadline:
+                process.terminate()
+                result = {"error": f"timed out after {timeout}s"}
+    process.join()
+    return result
+
+def run_benchmarks(backends, nodes_file, edges_file, samples, repeat, seed, ingest):
+    """ Runs every benchmark on every reachable backend and returns the results as a dict. """
+    disease_ids = sample_disease_ids(nodes_file, samples, seed)
+    report = {"dataset": {"nodes_file": nodes_file, "edges_file": edges_file}, "backends": {}}
+
+    for name in backends:
+        if name in ("memory", "pandas"):
+            backend = BACKENDS[name](nodes_file, edges_file)
+        else:
+            backend = get_backend(name)
+        if not backend.is_available():
+            print(f"Skipping {name}: not reachable.")
+            report["backends"][name] = {"skipped": True}
+            continue
+
+        print(f"Benchmarking {name}...")
+        result = {}
+        if name in ("memory", "pandas") or (ingest and name in ("neo4j", "cassandra")):
+            result["ingest"] = measure_ingest(name, nodes_file, edges_file)
+        if disease_ids:
+            result["query1"] = measure_query1(backend, disease_ids, repeat)
+        result["query2"] = measure_query2(name, nodes_file, edges_file)
+        if "error" in result["query2"]:
+            print(f"Query 2 failed on {name}: {result['query2']['error']}")
+            result["failed"] = True
+        report["backends"][name] = result
+
+    return report
+
+# Metrics compared with the baseline; True when a larger value is better
+COMPARED_METRICS = {
+    ("ingest", "rows_per_second"): True,
+    ("query1", "p50_ms"): False,
+    ("query1", "p95_ms"): False,
+    ("query1", "p99_ms"): False,
+    ("query2", "seconds"): False,
+    ("query2", "peak_rss_mib"): False,
+}
+
+def compare_with_baseline(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """ Prints each metric next to its baseline value and returns the list of regressions. """
+    regressions = []
+    for name, result in report["backends"].items():
+        base = baseline.get("backends", {}).get(name, {})
+        for (section, metric), higher_is_better in COMPARED_METRICS.items():
+            current = result.get(section, {}).get(metric)
+            previous = base.get(section, {}).get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            worse = -change if higher_is_better else change
+            flag = "REGRESSION" if worse > threshold else ""
+            print(f"{name:>10} {section}.{metric:<16} {previous:12.3f} -> {current:12.3f} ({change:+.1%}) {flag}")
+            if flag:
+                regressions.append((name, section, metric, previous, current))
+    return regressions
+
+# Run: python benchmarks/run_benchmarks.py [--backends memory pandas] [--save-baseline]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark load and query latency across backends.")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--nodes", default=NODES_FILE, help="nodes.tsv to use.")
+    parser.add_argument("--edges", default=EDGES_FILE, help="edges.tsv to use.")
+    parser.add_argument("--samples", type=int, default=50, help="Disease ids sampled for Query 1.")
+    parser.add_argument("--repeat", type=int, default=5, help="Times each Query 1 sample is run.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ingest", action="store_true", help="Also time full Neo4j/Cassandra loads (rewrites the databases).")
+    parser.add_argument("--output", default=RESULTS_FILE, help="Where to write the JSON results.")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON to compare with.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.backends, args.nodes, args.edges, args.samples, args.repeat, args.seed, args.ingest)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(report, json.load(f))
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,172 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+# Hetionet v1.0 node counts per kind, with the id prefix and zero padding used for generated ids
+NODE_KINDS = {
+    "Anatomy": (402, "UBERON:", 7),
+    "Biological Process": (11381, "GO:", 7),
+    "Cellular Component": (1391, "GO:", 7),
+    "Compound": (1552, "DB", 5),
+    "Disease": (137, "DOID:", 0),
+    "Gene": (20945, "", 0),
+    "Molecular Function": (2884, "GO:", 7),
+    "Pathway": (1822, "PC7_", 0),
+    "Pharmacologic Class": (345, "N", 10),
+    "Side Effect": (5734, "C", 7),
+    "Symptom": (438, "D", 6),
+}
+
+# Hetionet v1.0 edge counts per metaedge, with its source and target kinds
+METAEDGES = {
+    "AdG": ("Anatomy", "Gene", 102240),
+    "AeG": ("Anatomy", "Gene", 526407),
+    "AuG": ("Anatomy", "Gene", 97848),
+    "CbG": ("Compound", "Gene", 11571),
+    "CcSE": ("Compound", "Side Effect", 138944),
+    "CdG": ("Compound", "Gene", 21102),
+    "CpD": ("Compound", "Disease", 390),
+    "CrC": ("Compound", "Compound", 6486),
+    "CtD": ("Compound", "Disease", 755),
+    "CuG": ("Compound", "Gene", 18756),
+    "DaG": ("Disease", "Gene", 12623),
+    "DdG": ("Disease", "Gene", 7623),
+    "DlA": ("Disease", "Anatomy", 3602),
+    "DpS": ("Disease", "Symptom", 3357),
+    "DrD": ("Disease", "Disease", 543),
+    "DuG": ("Disease", "Gene", 7731),
+    "GcG": ("Gene", "Gene", 61690),
+    "GiG": ("Gene", "Gene", 147164),
+    "GpBP": ("Gene", "Biological Process", 559504),
+    "GpCC": ("Gene", "Cellular Component", 73566),
+    "GpMF": ("Gene", "Molecular Function", 97222),
+    "GpPW": ("Gene", "Pathway", 84372),
+    "Gr>G": ("Gene", "Gene", 265672),
+    "PCiC": ("Pharmacologic Class", "Compound", 1029),
+}
+
+# Zipf exponent of node degrees; Hetionet degrees are heavy-tailed (a few hub genes, many leaves)
+SKEW = 0.8
+
+# Rounds of redrawing duplicate edges before falling back to uniformly chosen targets
+REDRAW_ROUNDS = 20
+
+# Nodes written, and edges drawn, per chunk; bounds memory use at any scale
+CHUNK_SIZE = 20000
+EDGE_CHUNK_SIZE = 500000
+
+def format_id(kind, i):
+    """ Hetionet-style id of the i-th node of a kind, e.g. Compound::DB00001. """
+    _, prefix, width = NODE_KINDS[kind]
+    return f"{kind}::{prefix}{i + 1:0{width}d}"
+
+def scaled(count, scale):
+    return max(1, int(round(count * scale)))
+
+def degree_weights(rng, n, skew):
+    """
+    Zipf-like probabilities over n nodes. Ranks are shuffled so hubs are spread over the id range.
+    """
+    weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** skew
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+def write_nodes(f, scale):
+    """ Streams nodes.tsv rows. Returns the number of nodes per kind. """
+    f.write("id\tname\tkind\n")
+    counts = {}
+    for kind, (count, _, _) in NODE_KINDS.items():
+        counts[kind] = scaled(count, scale)
+        for start in range(0, counts[kind], CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, counts[kind])
+            f.writelines(f"{format_id(kind, i)}\t{kind.lower()} {i + 1}\t{kind}\n" for i in range(start, end))
+    return counts
+
+def generate_edges(rng, source_count, target_count, edge_count, skew, same_kind):
+    """
+    Yields (sources, targets) index arrays for one metaedge, one chunk of source nodes at a time.
+    Out-degrees are a multinomial draw over skewed source weights; targets are drawn from skewed
+    target weights. Duplicate edges and self-loops within a kind are redrawn for up to
+    REDRAW_ROUNDS rounds; hubs still short after that get uniformly chosen unused targets,
+    so every metaedge has exactly its scaled edge count.
+    """
+    max_degree = target_count - 1 if same_kind else target_count
+    edge_count = min(edge_count, source_count * max_degree)
+    weights = degree_weights(rng, source_count, skew)
+    degrees = np.zeros(source_count, dtype=np.int64)
+    while degrees.sum() < edge_count:  # Hand degree above the maximum back to the other nodes
+        open_weights = np.where(degrees < max_degree, weights, 0.0)
+        degrees = np.minimum(degrees + rng.multinomial(edge_count - degrees.sum(), open_weights / open_weights.sum()), max_degree)
+    target_cdf = np.cumsum(degree_weights(rng, target_count, skew))
+    target_cdf[-1] = 1.0
+
+    # Chunk boundaries so each chunk holds at most about EDGE_CHUNK_SIZE edges
+    ends = np.searchsorted(np.cumsum(degrees), np.arange(EDGE_CHUNK_SIZE, edge_count, EDGE_CHUNK_SIZE), side="right")
+    bounds = np.unique(np.concatenate(([0], np.maximum(ends, 1), [source_count])))
+    for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        chunk = degrees[start:end]
+        keys = np.empty(0, dtype=np.int64)  # source * target_count + target, unique and sorted
+        missing = chunk
+        for _ in range(REDRAW_ROUNDS):
+            sources = np.repeat(np.arange(start, start + len(chunk), dtype=np.int64), missing)
+            targets = np.searchsorted(target_cdf, rng.random(len(sources)), side="right")
+            if same_kind:
+                keep = sources != targets
+                sources, targets = sources[keep], targets[keep]
+            keys = np.union1d(keys, sources * target_count + targets)
+            missing = chunk - np.bincount(keys // target_count - start, minlength=len(chunk))
+            if not missing.any():
+                break
+        for i in np.flatnonzero(missing):  # Hubs close to the target count: fill from the unused targets
+            source = start + i
+            used = keys[(keys >= source * target_count) & (keys < (source + 1) * target_count)] % target_count
+            unused = np.setdiff1d(np.arange(target_count), np.append(used, source) if same_kind else used)
+            extra = rng.choice(unused, size=missing[i], replace=False)
+            keys = np.union1d(keys, source * target_count + extra)
+        yield keys // target_count, keys % target_count
+
+def write_edges(f, rng, node_counts, scale, skew):
+    """ Streams edges.tsv rows. Returns the number of edges per metaedge. """
+    f.write("source\tmetaedge\ttarget\n")
+    counts = {}
+    for metaedge, (source_kind, target_kind, count) in METAEDGES.items():
+        counts[metaedge] = 0
+        for sources, targets in generate_edges(rng, node_counts[source_kind], node_counts[target_kind],
+                                               scaled(count, scale), skew, source_kind == target_kind):
+            f.writelines(f"{format_id(source_kind, s)}\t{metaedge}\t{format_id(target_kind, t)}\n"
+                         for s, t in zip(sources.tolist(), targets.tolist()))
+            counts[metaedge] += len(sources)
+    return counts
+
+def generate_dataset(output_dir, scale=1.0, seed=42, skew=SKEW):
+    """
+    Writes nodes.tsv and edges.tsv to `output_dir` at `scale` times the size of Hetionet,
+    keeping its node-kind mix, metaedge distribution and a skewed degree distribution.
+    The same seed and scale always produce the same files. At scales well below 1, dense metaedges
+    such as DlA are capped at one edge per (source, target) pair. Returns (node counts, edge counts).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    with open(os.path.join(output_dir, "nodes.tsv"), "w", encoding="utf-8", newline="") as f:
+        node_counts = write_nodes(f, scale)
+    with open(os.path.join(output_dir, "edges.tsv"), "w", encoding="utf-8", newline="") as f:
+        edge_counts = write_edges(f, rng, node_counts, scale, skew)
+    return (node_counts, edge_counts)
+
+# Generate a dataset: python benchmarks/synthetic_data.py OUTPUT_DIR [--scale 10] [--seed 42]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Hetionet-like dataset.")
+    parser.add_argument("output_dir", help="Folder for nodes.tsv and edges.tsv.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiple of Hetionet's size (e.g. 1, 10, 100).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skew", type=float, default=SKEW, help="Zipf exponent of node degrees (0 = uniform).")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    node_counts, edge_counts = generate_dataset(args.output_dir, args.scale, args.seed, args.skew)
+    elapsed = time.perf_counter() - start
+    rows = sum(node_counts.values()) + sum(edge_counts.values())
+    print(f"Wrote {sum(node_counts.values())} nodes and {sum(edge_counts.values())} edges "
+          f"to {args.output_dir} in {elapsed:.1f}s ({rows / elapsed:.0f} rows/sec).")
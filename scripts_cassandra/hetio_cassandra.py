@@ -2,17 +2,52 @@ import subprocess
 import time
 import sys
 import os
-import csv
+import hashlib
+import heapq
+import queue
+import threading
+import zlib
+from datetime import datetime, timezone
 from cassandra.cluster import Cluster
+from cassandra.concurrent import execute_concurrent_with_args
 from collections import defaultdict
 import tkinter as tk
-from tkinter import ttk
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from scripts_common.snapshot import get_snapshot_graph
+from scripts_common.new_drugs import compute_new_drug_candidates
+from scripts_common.backends import BACKENDS, get_backend, format_disease_info, format_new_drugs, read_ids_file
+from scripts_common.gui_tasks import ResultPanel, shutdown_executor
+from scripts_common.delta import compute_delta, commit_manifest, get_manifest_dir, has_manifest, write_manifest
+from scripts_common.checkpoints import save_checkpoint, load_checkpoint, clear_checkpoint
+from scripts_common.compressed_io import find_input
+from scripts_common import metrics
+
 CASSANDRA_PATH = "/opt/cassandra/bin/cassandra"
 
-EDGE_DATA_FILE = "../data/edges.tsv"
-NODE_DATA_FILE = "../data/nodes.tsv"
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+EDGE_DATA_FILE = find_input(os.path.join(DATA_DIR, "edges.tsv"))  # Or edges.tsv.gz/.bz2/.xz
+NODE_DATA_FILE = find_input(os.path.join(DATA_DIR, "nodes.tsv"))
+
+# Concurrent writes: requests in flight at once, and retries for rows that fail
+WRITE_CONCURRENCY = 64
+WRITE_RETRIES = 3
+
+# Rows written between two checkpoints of a full ingest (see `ingest --resume`)
+CHECKPOINT_BATCH_SIZE = 5000
+INGEST_CHECKPOINT = "cassandra_ingest"
+
+# Concurrent reads: disease_info lookups in flight at once in batch Query 1
+READ_CONCURRENCY = 64
+
+# Number of partitions the new drug candidates are spread over
+CANDIDATE_BUCKETS = 16
+
+# Bump when the derived tables change shape, so the next run re-ingests
+SCHEMA_VERSION = 3
+
+# What the last ingest was built from, compared against the input files by `delta`
+MANIFEST_DIR = get_manifest_dir("cassandra")
 
 ################################################################################################
 # Cassandra setup
@@ -47,8 +82,11 @@ def stop_cassandra():
 def connect_to_cassandra():
     """Connects to Cassandra."""
     try:
+        start = time.perf_counter()
         cluster = Cluster(["127.0.0.1"])
         session = cluster.connect()
+        metrics.record_setup("cassandra_session", time.perf_counter() - start)
+        metrics.instrument_cassandra_session(session)  # Times every request when metrics are enabled
         print("[✔] Connected to Cassandra successfully!")
         return session
     except Exception as e:
@@ -82,19 +120,91 @@ def create_disease_table(session):
     """)
     print("[✔] disease_info table created.")
 
-def insert_disease_info(session, disease_names, drugs_names, gene_names, location_names, disease_data):
+def execute_concurrently(session, statement, parameters, concurrency=WRITE_CONCURRENCY, retries=WRITE_RETRIES):
+    """Execute a prepared statement for every parameter tuple with bounded concurrency, retrying failed rows."""
+    pending = list(parameters)
+    total = len(pending)
+    start = time.perf_counter()
+
+    for attempt in range(retries + 1):
+        results = execute_concurrent_with_args(session, statement, pending, concurrency=concurrency, raise_on_first_error=False)
+        pending = [params for params, (success, _) in zip(pending, results) if not success]
+        if not pending:
+            break
+        if attempt < retries:
+            print(f"[!] {len(pending)} rows failed, retrying ({attempt + 1}/{retries})...")
+
+    if pending:
+        raise RuntimeError(f"{len(pending)} rows could not be written after {retries} retries")
+
+    elapsed = time.perf_counter() - start
+    print(f"[✔] {total} rows written in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} rows/sec).")
+    metrics.record_load(f"cassandra {metrics.cql_name(statement.query_string)}", total, elapsed)
+
+class IngestCheckpoint:
+    """
+    Tracks which batches of a full ingest are written. Each table is written in batches of
+    CHECKPOINT_BATCH_SIZE rows, in a fixed order, and a checkpoint (table and batch id) is saved
+    after every batch. When resuming, finished tables and batches are skipped.
+    The checkpoint belongs to one dataset fingerprint and is ignored for any other.
+    """
+
+    def __init__(self, fingerprint, resume=False):
+        self.fingerprint = fingerprint
+        state = load_checkpoint(INGEST_CHECKPOINT, fingerprint) if resume else None
+        if state is None:
+            clear_checkpoint(INGEST_CHECKPOINT)
+            state = {"finished": [], "table": None, "batch_id": -1}
+        self.finished = state["finished"]
+        self.table = state["table"]
+        self.batch_id = state["batch_id"]
+        self.resuming = state["table"] is not None or bool(state["finished"])
+
+    def execute(self, session, statement, rows, table, concurrency=WRITE_CONCURRENCY):
+        """Write `rows` batch by batch, skipping batches a previous run already wrote."""
+        if table in self.finished:
+            print(f"[✔] {table} already written, skipping.")
+            return
+        first = self.batch_id + 1 if table == self.table else 0
+        if first:
+            print(f"[✔] Resuming {table} after batch {self.batch_id}.")
+        for batch_id in range(first, -(-len(rows) // CHECKPOINT_BATCH_SIZE)):
+            execute_concurrently(session, statement, rows[batch_id * CHECKPOINT_BATCH_SIZE:(batch_id + 1) * CHECKPOINT_BATCH_SIZE], concurrency)
+            self.table, self.batch_id = table, batch_id
+            self.save()
+        self.finished.append(table)
+        self.table, self.batch_id = None, -1
+        self.save()
+
+    def save(self):
+        save_checkpoint(INGEST_CHECKPOINT, self.fingerprint, finished=self.finished, table=self.table, batch_id=self.batch_id)
+
+    def clear(self):
+        clear_checkpoint(INGEST_CHECKPOINT)
+
+def write_rows(session, statement, rows, table, concurrency, checkpoint=None):
+    """Write rows all at once, or batch by batch with checkpoints during a full ingest."""
+    if checkpoint is None:
+        execute_concurrently(session, statement, rows, concurrency)
+    else:
+        checkpoint.execute(session, statement, rows, table, concurrency)
+
+def insert_disease_info(session, disease_names, drugs_names, gene_names, location_names, disease_data, concurrency=WRITE_CONCURRENCY, checkpoint=None):
     """Insert collected data into Cassandra."""
+    statement = session.prepare("""
+        INSERT INTO disease_info (disease_id, disease_name, drug_names, gene_names, location_names) 
+        VALUES (?, ?, ?, ?, ?);
+    """)
+
+    rows = []
     for disease_id, data in disease_data.items():
         disease_name = disease_names.get(disease_id, "Unknown Disease")
         drugs = {drugs_names.get(x,x) for x in data["drugs"]}
         genes = {gene_names.get(x,x) for x in data["genes"]}
         locations = {location_names.get(x,x) for x in data["locations"]}
+        rows.append((disease_id, disease_name, drugs, genes, locations))
 
-        session.execute("""
-            INSERT INTO disease_info (disease_id, disease_name, drug_names, gene_names, location_names) 
-            VALUES (%s, %s, %s, %s, %s);
-        """, (disease_id, disease_name, drugs, genes, locations))
-    
+    write_rows(session, statement, rows, "disease_info", concurrency, checkpoint)
     print("[✔] Disease data inserted successfully!")
 
 def create_compound_table(session):
@@ -108,108 +218,140 @@ def create_compound_table(session):
     """)
     print("[✔] compound_info table created.")
 
-def insert_compounds_info(session, drugs_names, new_drugs_info, old_drugs_info):
+def insert_compounds_info(session, drugs_names, new_drugs_info, old_drugs_info, concurrency=WRITE_CONCURRENCY, checkpoint=None):
     """Insert collected data into Cassandra"""
-    for compound_id in new_drugs_info:
-        session.execute("""
-            INSERT INTO compound_info (compound_id, compound_name, is_connected_with_disease) 
-            VALUES (%s, %s, %s);
-        """, (compound_id, drugs_names[compound_id], False))
-
-    for compound_id in old_drugs_info:
-        session.execute("""
-            INSERT INTO compound_info (compound_id, compound_name, is_connected_with_disease) 
-            VALUES (%s, %s, %s);
-        """, (compound_id, drugs_names[compound_id], True))
+    statement = session.prepare("""
+        INSERT INTO compound_info (compound_id, compound_name, is_connected_with_disease) 
+        VALUES (?, ?, ?);
+    """)
 
+    # Sorted, so batches hold the same rows in every run
+    rows = [(compound_id, drugs_names[compound_id], False) for compound_id in sorted(new_drugs_info)]
+    rows += [(compound_id, drugs_names[compound_id], True) for compound_id in sorted(old_drugs_info)]
+
+    write_rows(session, statement, rows, "compound_info", concurrency, checkpoint)
     print("[✔] Compound data inserted successfully!")
 
+def get_candidate_bucket(compound_id):
+    """Stable bucket (partition) of a compound id."""
+    return zlib.crc32(compound_id.encode("utf-8")) % CANDIDATE_BUCKETS
+
+def create_candidate_table(session):
+    """Create the new_compound_candidates table for query 2: a few partitions, each sorted by compound_id."""
+    session.execute("""
+        CREATE TABLE IF NOT EXISTS new_compound_candidates (
+            bucket INT,
+            compound_id TEXT,
+            compound_name TEXT,
+            PRIMARY KEY ((bucket), compound_id)
+        ) WITH CLUSTERING ORDER BY (compound_id ASC);
+    """)
+    print("[✔] new_compound_candidates table created.")
+
+def insert_candidates_info(session, drugs_names, new_drugs_info, concurrency=WRITE_CONCURRENCY, checkpoint=None):
+    """Insert new drug candidates into their buckets"""
+    statement = session.prepare("""
+        INSERT INTO new_compound_candidates (bucket, compound_id, compound_name) 
+        VALUES (?, ?, ?);
+    """)
+
+    rows = [(get_candidate_bucket(compound_id), compound_id, drugs_names[compound_id]) for compound_id in sorted(new_drugs_info)]
+
+    write_rows(session, statement, rows, "new_compound_candidates", concurrency, checkpoint)
+    print("[✔] Candidate data inserted successfully!")
+
+def create_metadata_table(session):
+    """Create the dataset_metadata table that records what has been ingested."""
+    session.execute("""
+        CREATE TABLE IF NOT EXISTS dataset_metadata (
+            dataset TEXT PRIMARY KEY,
+            fingerprint TEXT,
+            schema_version INT,
+            loaded_at TIMESTAMP
+        );
+    """)
+
+def compute_dataset_fingerprint(filenames=(NODE_DATA_FILE, EDGE_DATA_FILE)):
+    """Compute a SHA-256 content hash over the input files."""
+    digest = hashlib.sha256()
+    for filename in filenames:
+        digest.update(os.path.basename(filename).encode("utf-8"))
+        with open(filename, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def is_dataset_loaded(session, fingerprint):
+    """Check whether the tables already hold this dataset with the current schema version."""
+    row = session.execute("SELECT fingerprint, schema_version FROM dataset_metadata WHERE dataset = %s", ["hetio"]).one()
+    return row is not None and row.fingerprint == fingerprint and row.schema_version == SCHEMA_VERSION
+
+def save_dataset_fingerprint(session, fingerprint):
+    """Record the fingerprint of the dataset that was just ingested."""
+    session.execute("""
+        INSERT INTO dataset_metadata (dataset, fingerprint, schema_version, loaded_at)
+        VALUES (%s, %s, %s, %s);
+    """, ("hetio", fingerprint, SCHEMA_VERSION, datetime.now(timezone.utc)))
+
+def is_schema_current(session):
+    """Check whether the tables were built with the current schema version."""
+    row = session.execute("SELECT schema_version FROM dataset_metadata WHERE dataset = %s", ["hetio"]).one()
+    return row is not None and row.schema_version == SCHEMA_VERSION
+
+def create_tables(session):
+    """Create the keyspace and every table used by the queries."""
+    create_keyspace(session)
+    create_metadata_table(session)
+    create_disease_table(session)
+    create_compound_table(session)
+    create_candidate_table(session)
+
 ################################################################################################
 # Load Hetio data
 ################################################################################################
-def load_disease_names(filename=NODE_DATA_FILE):
-    """Load nodes.tsv to get disease names."""
-    disease_names = {}
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file, delimiter="\t")
-        next(reader)  # Skip header
-        for row in reader:
-            node_id, name, kind = row
-            if "Disease::" in node_id:      # Identify diseases
-                disease_names[node_id] = name
-    return disease_names
-
-def load_drugs_names(filename=NODE_DATA_FILE):
-    """Load nodes.tsv to get Compound names."""
-    compound_names = {}
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file, delimiter="\t")
-        next(reader)  # Skip header
-        for row in reader:
-            node_id, name, kind = row
-            if "Compound::" in node_id:     # Identify drugs
-                compound_names[node_id] = name
-    return compound_names
-
-def load_gene_names(filename=NODE_DATA_FILE):
-    """Load nodes.tsv to get Gene names."""
-    gene_names = {}
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file, delimiter="\t")
-        next(reader)  # Skip header
-        for row in reader:
-            node_id, name, kind = row
-            if "Gene::" in node_id:              # Identify gene
-                gene_names[node_id] = name
-    return gene_names
-
-def load_nodes_information(filename=NODE_DATA_FILE):
-    """Load nodes.tsv to get disease names."""
-    disease_names = {}
-    compound_names = {}
-    gene_names = {}
-    location_names = {}
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file, delimiter="\t")
-        next(reader)  # Skip header
-        for row in reader:
-            node_id, name, kind = row
-            if "Disease::" in node_id:          # Identify diseases
-                disease_names[node_id] = name
-            elif "Compound::" in node_id:       # Identify drugs
-                compound_names[node_id] = name
-            elif "Gene::" in node_id:           # Identify gene
-                gene_names[node_id] = name
-            elif "Anatomy::" in node_id:        # Identify location (anatomy)
-                location_names[node_id] = name    
+def get_graph(graph=None):
+    """Return the given graph, or the shared compact Hetio model (memory-mapped from its binary snapshot)."""
+    if graph is None:
+        graph = get_snapshot_graph(NODE_DATA_FILE, EDGE_DATA_FILE)
+    return graph
+
+def load_disease_names(graph=None):
+    """Get disease names from the Hetio model."""
+    return dict(get_graph(graph).get_names("Disease"))
+
+def load_drugs_names(graph=None):
+    """Get Compound names from the Hetio model."""
+    return dict(get_graph(graph).get_names("Compound"))
+
+def load_gene_names(graph=None):
+    """Get Gene names from the Hetio model."""
+    return dict(get_graph(graph).get_names("Gene"))
+
+def load_nodes_information(graph=None):
+    """Get disease, compound, gene and location (anatomy) names from the Hetio model."""
+    graph = get_graph(graph)
+    disease_names = dict(graph.get_names("Disease"))
+    compound_names = dict(graph.get_names("Compound"))
+    gene_names = dict(graph.get_names("Gene"))
+    location_names = dict(graph.get_names("Anatomy"))
 
     return (disease_names, compound_names, gene_names, location_names)
 
-def load_disease_relations(filename=EDGE_DATA_FILE):
-    """Load edges.tsv to map diseases to drugs, genes, and locations."""
+def load_disease_relations(graph=None):
+    """Map diseases to drugs, genes, and locations."""
+    graph = get_graph(graph)
     disease_data = defaultdict(lambda: {"drugs": set(), "genes": set(), "locations": set()})
-    
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file, delimiter="\t")
-        next(reader)  # Skip header
-        for row in reader:
-            source, metaedge, target = row
-            #print(source, metaedge, target)
-            if "Disease::" in target:
-                if metaedge == "CtD":  # Compound-treats-Disease
-                    disease_data[target]["drugs"].add(source)
-                elif metaedge == "CpD":  # Compound-Palliate-Disease
-                    disease_data[target]["drugs"].add(source)
-
-            if "Disease::" in source:
-                if metaedge == "DuG":  # Disease-upregulated-Gene
-                    disease_data[source]["genes"].add(target)
-                elif metaedge == "DdG":  # Disease-upregulated-Gene
-                    disease_data[source]["genes"].add(target)
-                elif metaedge == "DaG":  # Disease-upregulated-Gene
-                    disease_data[source]["genes"].add(target)
-                elif metaedge == "DlA":  # Disease-localized-in-Anatomy
-                    disease_data[source]["locations"].add(target)
+
+    for metaedge in ("CtD", "CpD"):         # Compound-treats/palliates-Disease
+        for source, target in graph.edges(metaedge):
+            disease_data[target]["drugs"].add(source)
+
+    for metaedge in ("DuG", "DdG", "DaG"):  # Disease-upregulates/downregulates/associates-Gene
+        for source, target in graph.edges(metaedge):
+            disease_data[source]["genes"].add(target)
+
+    for source, target in graph.edges("DlA"):  # Disease-localized-in-Anatomy
+        disease_data[source]["locations"].add(target)
 
     for disease_id, data in disease_data.items():
         data["drugs"] = sorted(data["drugs"])
@@ -218,109 +360,75 @@ def load_disease_relations(filename=EDGE_DATA_FILE):
 
     return disease_data
 
-def load_compound_gene_anatomy_relations(filename=EDGE_DATA_FILE):
-    """Load edges.tsv to get compound gene anatomy link"""
-    Compound_CdG = defaultdict(list)
-    Compound_CuG = defaultdict(list)
-    Anatomy_AdG = defaultdict(list)
-    Anatomy_AuG = defaultdict(list)
-
-    info_data = set()
-
-    # gene is key
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file, delimiter="\t")
-        next(reader)  # Skip header
-        for row in reader:
-            source, metaedge, target = row
-            #print(source, metaedge, target)
-            if "Compound::" in source and "CdG" in metaedge and "Gene::" in target:
-                Compound_CdG[target].append(source) 
-            elif "Compound::" in source and "CuG" in metaedge and "Gene::" in target:
-                Compound_CuG[target].append(source)
-            elif "Anatomy::" in source and "AdG" in metaedge and "Gene::" in target:
-                Anatomy_AdG[target].append(source)
-            elif "Anatomy::" in source and "AuG" in metaedge and "Gene::" in target:
-                Anatomy_AuG[target].append(source)
-
-    for gene_id, compound_id_list in Compound_CdG.items():
-        for compound_id in compound_id_list:
-            anatomy_id_list = Anatomy_AuG.get(gene_id)
-            if anatomy_id_list is not None:
-                for anatomy_id in anatomy_id_list:
-                    info_data.add((gene_id, compound_id, anatomy_id))
-                    #print(gene_id, compound_id, anatomy_id) 
-            
-    for gene_id, compound_id_list in Compound_CuG.items():
-        for compound_id in compound_id_list:
-            anatomy_id_list = Anatomy_AdG.get(gene_id)
-            if anatomy_id_list is not None:
-                for anatomy_id in anatomy_id_list:
-                    info_data.add((gene_id, compound_id, anatomy_id))
-                    #print(gene_id, compound_id, anatomy_id) 
-
-    #print("Path count: ", len(info_data))
-
-    return info_data
-
-def load_anatomy_desease_compound_relations(filename=EDGE_DATA_FILE):
-    """Load edges.tsv to disease and anatomy"""
-    disease_data = defaultdict(lambda: {"drugs": set(), "genes": set(), "locations": set()})
-    
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file, delimiter="\t")
-        next(reader)  # Skip header
-        for row in reader:
-            source, metaedge, target = row
-            #print(source, metaedge, target)
-            if "Anatomy::" in target:
-                if metaedge == "DlA":  
-                    disease_data[source]["locations"].add(target)
-
-            if "Compound::" in source:
-                if metaedge == "CtD" or metaedge == "CpD":  
-                    disease_data[target]["drugs"].add(source)
-            
-            if "Gene::" in target:
-                if metaedge == "DuG" or metaedge == "DaG" or metaedge == "DdG":
-                    disease_data[source]["genes"].add(target)
-        
-    return disease_data    
-
-def load_new_drugs_info(compound_gene_anatomy_relations, anatomy_disease_compound_relations):
-    """Insert collected data into Cassandra"""
-    all_drugs_info = set()
-    old_drugs_info = set()
-    for item in compound_gene_anatomy_relations:
-        # item[0] gene
-        # item[1] compound, drug
-        # item[2] Anatomy        
-        for disease_id, data in anatomy_disease_compound_relations.items():
-            all_drugs_info.add(item[1])
-            if item[1] in data["drugs"]:
-                old_drugs_info.add(item[1])
-    
-    new_drugs_info = all_drugs_info.difference(old_drugs_info)
-
-    return (new_drugs_info, old_drugs_info)
-
 ################################################################################################
 # Queries
 ################################################################################################
+def read_disease_info(session, disease_id):
+    """Read the disease_info row of one disease, or None."""
+    return session.execute("SELECT * FROM disease_info WHERE disease_id = %s", [disease_id]).one()
+
+def _format_disease_row(row):
+    """Format one disease_info row as output lines; shared by the single and batched Query 1."""
+    # Use join() for cleaner concatenation
+    return [
+        f"Disease ID: {row.disease_id}",
+        f"Disease Name: {row.disease_name}",
+        f"Drugs for Treatment/Palliation: {', '.join(row.drug_names) if row.drug_names else ' '}",
+        f"Genes that Cause the Disease: {', '.join(row.gene_names) if row.gene_names else ' '}",
+        f"Anatomy Locations: {', '.join(row.location_names) if row.location_names else ' '}",
+    ]
+
 def query_disease_info(session, disease_id):
     """Query disease information."""
     rows = session.execute("SELECT * FROM disease_info WHERE disease_id = %s", [disease_id])
 
     output_lines = []
     for row in rows:
-        output_lines.append(f"Disease ID: {row.disease_id}")
-        output_lines.append(f"Disease Name: {row.disease_name}")
+        output_lines.extend(_format_disease_row(row))
 
-        # Use join() for cleaner concatenation
-        output_lines.append(f"Drugs for Treatment/Palliation: {', '.join(row.drug_names) if row.drug_names else ' '}")
-        output_lines.append(f"Genes that Cause the Disease: {', '.join(row.gene_names) if row.gene_names else ' '}")
-        output_lines.append(f"Anatomy Locations: {', '.join(row.location_names) if row.location_names else ' '}")
+    return '\n'.join(output_lines)
 
+def read_diseases_info(session, disease_ids, concurrency=READ_CONCURRENCY):
+    """
+    Read the disease_info rows of many diseases with concurrent prepared reads, at most `concurrency`
+    in flight. Yields (disease_id, row or None) in the order the reads complete.
+    """
+    statement = session.prepare("SELECT * FROM disease_info WHERE disease_id = ?")
+    pending = iter(dict.fromkeys(disease_ids))  # Drop duplicates, keep order
+    completed = queue.Queue()
+
+    def submit():
+        disease_id = next(pending, None)
+        if disease_id is None:
+            return False
+        future = session.execute_async(statement, [disease_id])
+        future.add_callbacks(lambda rows: completed.put((disease_id, rows[0] if rows else None, None)),
+                             lambda error: completed.put((disease_id, None, error)))
+        return True
+
+    in_flight = sum(1 for _ in range(concurrency) if submit())
+    while in_flight:
+        disease_id, row, error = completed.get()
+        in_flight -= 1
+        if error is not None:
+            raise error
+        if submit():
+            in_flight += 1
+        yield (disease_id, row)
+
+def query_diseases_info(session, disease_ids):
+    """Query disease information for many diseases; ids that were not found are listed at the end."""
+    output_lines = []
+    missing = []
+    for disease_id, row in read_diseases_info(session, disease_ids):
+        if row is None:
+            missing.append(disease_id)
+            continue
+        output_lines.extend(_format_disease_row(row))
+        output_lines.append("")
+
+    if missing:
+        output_lines.append(f"No data found for diseases: {', '.join(missing)}")
     return '\n'.join(output_lines)
 
 def query_all_disease_info(session):
@@ -341,6 +449,37 @@ def query_all_new_compounds_info(session):
         
     return output_lines
 
+def read_new_compound_candidates(session):
+    """Read every candidate bucket in parallel and yield rows merged from the already sorted partitions."""
+    statement = session.prepare("SELECT compound_id, compound_name FROM new_compound_candidates WHERE bucket = ?")
+    futures = [session.execute_async(statement, [bucket]) for bucket in range(CANDIDATE_BUCKETS)]
+    partitions = [future.result() for future in futures]
+    return heapq.merge(*partitions, key=lambda row: row.compound_id)
+
+def query_new_compound_candidates(session):
+    """Query all new drug candidates, ordered by compound id."""
+    output_lines = ""
+    for row in read_new_compound_candidates(session):
+        output_lines += f"{row.compound_id}, Compound Name: {row.compound_name}\n"
+
+    return output_lines
+
+def benchmark_query2_reads(session, repeat=5):
+    """Time the ALLOW FILTERING scan of compound_info against the bucketed candidate table."""
+    timings = {}
+    for name, read in (("compound_info scan", query_all_new_compounds_info),
+                       ("bucketed candidates", query_new_compound_candidates)):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = read(session)
+            samples.append(time.perf_counter() - start)
+        timings[name] = (min(samples), sum(samples) / len(samples), output.count("\n"))
+
+    for name, (best, mean, rows) in timings.items():
+        print(f"{name:>20}: best {best * 1000:8.1f} ms, mean {mean * 1000:8.1f} ms, {rows} rows")
+    return timings
+
 ################################################################################################
 # Save result to file
 ################################################################################################
@@ -355,23 +494,153 @@ def save_results_to_file(filename, content):
 
     print(f"[✔] Query results saved to {file_path}")
 
+################################################################################################
+# Ingest: load Hetio data into Cassandra once per dataset version
+################################################################################################
+@metrics.stage("cassandra_ingest")
+def ingest_dataset(session, force=False, concurrency=WRITE_CONCURRENCY, resume=False):
+    """
+    Build the query tables from nodes.tsv/edges.tsv, unless this exact dataset is already loaded.
+    With `resume`, an interrupted ingest of the same dataset continues after its last written batch.
+    """
+    create_tables(session)
+
+    fingerprint = compute_dataset_fingerprint()
+    if not force and is_dataset_loaded(session, fingerprint):
+        if not has_manifest(MANIFEST_DIR):
+            write_manifest(NODE_DATA_FILE, EDGE_DATA_FILE, MANIFEST_DIR)  # Lets `delta` run without a re-ingest
+        print("[✔] Dataset already ingested, skipping load.")
+        return False
+
+    checkpoint = IngestCheckpoint(fingerprint, resume)
+    start = time.perf_counter()
+    if checkpoint.resuming:
+        print("[✔] Resuming interrupted ingest...")
+    else:
+        print("[✔] Ingesting dataset...")
+        # Until the new fingerprint is saved, no run may take the half-written tables as loaded
+        session.execute("DELETE FROM dataset_metadata WHERE dataset = %s", ["hetio"])
+        session.execute("TRUNCATE disease_info")
+        session.execute("TRUNCATE compound_info")
+        session.execute("TRUNCATE new_compound_candidates")
+
+    graph = get_graph()  # nodes.tsv and edges.tsv are each read once for the whole ingest
+    (disease_names, drugs_names, gene_names, location_names) = load_nodes_information(graph)
+    disease_relations = load_disease_relations(graph)
+    insert_disease_info(session, disease_names, drugs_names, gene_names, location_names, disease_relations, concurrency, checkpoint)
+
+    # Sparse matrix engine; same candidates as find_new_drugs in scripts_neo4j/queries.py
+    (new_drugs_info, old_drugs_info) = compute_new_drug_candidates(graph)
+    insert_compounds_info(session, drugs_names, new_drugs_info, old_drugs_info, concurrency, checkpoint)
+    insert_candidates_info(session, drugs_names, new_drugs_info, concurrency, checkpoint)
+
+    save_dataset_fingerprint(session, fingerprint)
+    write_manifest(NODE_DATA_FILE, EDGE_DATA_FILE, MANIFEST_DIR)
+    checkpoint.clear()
+    print(f"[✔] Dataset ingested in {time.perf_counter() - start:.1f}s.")
+    return True
+
+################################################################################################
+# Delta: apply only what changed in nodes.tsv/edges.tsv since the last ingest
+################################################################################################
+def get_affected_diseases(delta, disease_relations):
+    """Ids of the diseases whose disease_info row can change with this delta."""
+    affected = set()
+    for source, metaedge, target in delta.changed_edges():
+        if metaedge in ("CtD", "CpD"):
+            affected.add(target)
+        elif metaedge in ("DaG", "DdG", "DuG", "DlA"):
+            affected.add(source)
+
+    affected.update(node_id for node_id, _, kind in delta.nodes_added + delta.nodes_removed if kind == "Disease")
+
+    # Renamed compounds, genes and anatomies show up in the rows of the diseases they are linked to
+    changed_nodes = delta.changed_node_ids()
+    for disease_id, data in disease_relations.items():
+        if not changed_nodes.isdisjoint(data["drugs"]) or not changed_nodes.isdisjoint(data["genes"]) \
+                or not changed_nodes.isdisjoint(data["locations"]):
+            affected.add(disease_id)
+    return affected
+
+def update_compound_tables(session, drugs_names, new_drugs_info, old_drugs_info, concurrency=WRITE_CONCURRENCY):
+    """Write only the compound_info and new_compound_candidates rows that differ from the recomputed candidates."""
+    wanted = {compound_id: (drugs_names[compound_id], False) for compound_id in new_drugs_info}
+    wanted.update((compound_id, (drugs_names[compound_id], True)) for compound_id in old_drugs_info)
+    current = {row.compound_id: (row.compound_name, row.is_connected_with_disease)
+               for row in session.execute("SELECT compound_id, compound_name, is_connected_with_disease FROM compound_info")}
+
+    statement = session.prepare("INSERT INTO compound_info (compound_id, compound_name, is_connected_with_disease) VALUES (?, ?, ?);")
+    execute_concurrently(session, statement, [(compound_id, name, connected) for compound_id, (name, connected) in wanted.items()
+                                              if current.get(compound_id) != (name, connected)], concurrency)
+    statement = session.prepare("DELETE FROM compound_info WHERE compound_id = ?;")
+    execute_concurrently(session, statement, [(compound_id,) for compound_id in current if compound_id not in wanted], concurrency)
+
+    wanted = {compound_id: drugs_names[compound_id] for compound_id in new_drugs_info}
+    current = {row.compound_id: row.compound_name for row in read_new_compound_candidates(session)}
+
+    statement = session.prepare("INSERT INTO new_compound_candidates (bucket, compound_id, compound_name) VALUES (?, ?, ?);")
+    execute_concurrently(session, statement, [(get_candidate_bucket(compound_id), compound_id, name) for compound_id, name in wanted.items()
+                                              if current.get(compound_id) != name], concurrency)
+    statement = session.prepare("DELETE FROM new_compound_candidates WHERE bucket = ? AND compound_id = ?;")
+    execute_concurrently(session, statement, [(get_candidate_bucket(compound_id), compound_id) for compound_id in current
+                                              if compound_id not in wanted], concurrency)
+
+@metrics.stage("cassandra_delta")
+def apply_delta(session, concurrency=WRITE_CONCURRENCY):
+    """
+    Update the query tables with only what changed since the last ingest: the disease_info rows of
+    affected diseases, and the compound rows whose candidate status changed. Falls back to a full
+    ingest when there is no manifest of the last ingest or the schema version changed.
+    """
+    create_tables(session)
+    delta = compute_delta(NODE_DATA_FILE, EDGE_DATA_FILE, MANIFEST_DIR) if is_schema_current(session) else None
+    if delta is None:
+        print("[!] No manifest of a previous ingest with this schema, running a full ingest.")
+        return ingest_dataset(session, force=True, concurrency=concurrency)
+
+    print(f"[✔] Delta: {delta.summary()}.")
+    start = time.perf_counter()
+    if len(delta):
+        graph = get_graph()
+        (disease_names, drugs_names, gene_names, location_names) = load_nodes_information(graph)
+        disease_relations = load_disease_relations(graph)
+        affected = get_affected_diseases(delta, disease_relations)
+
+        # Diseases left without any relation have no row, as after a full ingest
+        insert_disease_info(session, disease_names, drugs_names, gene_names, location_names,
+                            {disease_id: disease_relations[disease_id] for disease_id in affected if disease_id in disease_relations}, concurrency)
+        statement = session.prepare("DELETE FROM disease_info WHERE disease_id = ?;")
+        execute_concurrently(session, statement, [(disease_id,) for disease_id in affected if disease_id not in disease_relations], concurrency)
+
+        (new_drugs_info, old_drugs_info) = compute_new_drug_candidates(graph)
+        update_compound_tables(session, drugs_names, new_drugs_info, old_drugs_info, concurrency)
+
+    save_dataset_fingerprint(session, compute_dataset_fingerprint())
+    commit_manifest(MANIFEST_DIR)
+    print(f"[✔] Delta applied in {time.perf_counter() - start:.1f}s.")
+    return True
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return a shared session, starting Cassandra and ingesting the dataset on first use if needed."""
+    global _session
+    with _session_lock:  # GUI queries run on worker threads; set up the session only once
+        if _session is None:
+            if not is_cassandra_running():
+                start_cassandra()
+            session = connect_to_cassandra()
+            ingest_dataset(session)
+            _session = session
+    return _session
+
 ################################################################################################
 # Connection with GUI
 ################################################################################################
 def get_result_query1(disease_id):
     print("[✔] Query 1 is called.")
-
-    if not is_cassandra_running():
-        start_cassandra()
-    session = connect_to_cassandra()
-
-    create_keyspace(session)
-    create_disease_table(session)
-
-    (disease_names, drugs_names, gene_names, location_names) = load_nodes_information(NODE_DATA_FILE)
-    disease_relations = load_disease_relations(EDGE_DATA_FILE)
-
-    insert_disease_info(session, disease_names, drugs_names, gene_names, location_names, disease_relations)
+    session = get_session()
 
     # Query execute for a specific disease
     # Disease::DOID:263
@@ -385,22 +654,10 @@ def get_result_query1(disease_id):
 
 def get_result_query2():
     print("[✔] Query 2 is called.")
-    if not is_cassandra_running():
-        start_cassandra()
-    session = connect_to_cassandra()
-
-    create_keyspace(session)
-    create_compound_table(session)
-    
-    (disease_names, drugs_names, gene_names, location_names) = load_nodes_information(NODE_DATA_FILE)
-    compound_gene_anatomy_relations = load_compound_gene_anatomy_relations(EDGE_DATA_FILE)
-    anatomy_disease_compound_relations = load_anatomy_desease_compound_relations(EDGE_DATA_FILE)
-    (new_drugs_info, old_drugs_info) = load_new_drugs_info(compound_gene_anatomy_relations, anatomy_disease_compound_relations)
-
-    insert_compounds_info(session, drugs_names, new_drugs_info, old_drugs_info)
+    session = get_session()
 
     # Query execute
-    output_text = query_all_new_compounds_info(session)
+    output_text = query_new_compound_candidates(session)
 
     # Save results to file
     save_results_to_file("cassandra_query2.txt", output_text)
@@ -411,9 +668,13 @@ def get_result_query2():
 # GUI
 ################################################################################################
 class App(tk.Tk):
-    def __init__(self):
+    def __init__(self, backend="cassandra"):
         super().__init__()
-        self.title("Hetio Data Analysis on Cassandra Database")
+        self.backend = backend
+        if backend == "cassandra":
+            self.title("Hetio Data Analysis on Cassandra Database")
+        else:
+            self.title(f"Hetio Data Analysis ({backend} backend)")
         self.geometry("700x600")
         
         self.container = tk.Frame(self)
@@ -426,11 +687,31 @@ class App(tk.Tk):
             page.grid(row=0, column=0, sticky="nsew")
         
         self.show_page(InitPage)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def show_page(self, page_class):
         page = self.pages[page_class]
         page.tkraise()
 
+    def on_close(self):
+        """Stop background queries and close the window."""
+        for page in self.pages.values():
+            if hasattr(page, "results"):
+                page.results.cancel()
+        shutdown_executor()
+        self.destroy()
+
+    def run_query1(self, disease_id):
+        if self.backend == "cassandra":
+            return get_result_query1(disease_id)
+        data = get_backend(self.backend).disease_info(disease_id)
+        return format_disease_info(data) if data else f"No data found for disease: {disease_id}"
+
+    def run_query2(self):
+        if self.backend == "cassandra":
+            return get_result_query2()
+        return format_new_drugs(get_backend(self.backend).new_drug_candidates())
+
 class InitPage(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
@@ -469,6 +750,7 @@ class InitPage(tk.Frame):
 class Query1Page(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
+        self.controller = controller
         label = tk.Label(self, text="Enter the disease id", font=("Arial", 14))
         label.pack(padx=30, pady=10)
         
@@ -483,39 +765,23 @@ class Query1Page(tk.Frame):
         button2 = tk.Button(self, text="Back to Main Page", command=lambda: controller.show_page(InitPage), font=("Arial", 14))
         button2.pack(padx=30, pady=10)
         
-        # Create Text widget for displaying content
-        self.text_widget = tk.Text(self, wrap="word", font=("Arial", 14), padx=10, pady=10)
-        self.text_widget.config(state="disabled")  # Disable editing initially
-
-        # Create Scrollbar
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.text_widget.yview)
-        self.text_widget.config(yscrollcommand=scrollbar.set)
-
-        # Grid layout
-        self.text_widget.pack(side="left", expand=True, fill="both", pady=10)
-        scrollbar.pack(side="right", fill="y")
-
-        # Configure expansion
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_columnconfigure(0, weight=1)
+        # Results, with progress and cancel controls. The first query may start Cassandra
+        # and ingest the dataset; it runs in the background so the window stays responsive.
+        self.results = ResultPanel(self)
+        self.results.pack(expand=True, fill="both")
 
     def get_query_result(self):
-        user_text = self.entry.get()  # Get the text entered by the user
-        output_text = ""
+        user_text = self.entry.get().strip()  # Get the text entered by the user
         if "Disease::" in user_text:  
-            output_text = get_result_query1(user_text)
+            self.results.run(self.controller.run_query1, user_text)
         else:
             print("Wrong disease id")
-
-        # Enable text widget to insert new content
-        self.text_widget.config(state="normal")
-        self.text_widget.delete("1.0", tk.END)  # Clear existing text
-        self.text_widget.insert("1.0", output_text)  # Insert new text
-        self.text_widget.config(state="disabled")  # Disable editing again
+            self.results.show_text("Wrong disease id. Use 'Disease::<ID>'.")
         
 class Query2Page(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
+        self.controller = controller
 
         # Button to get the input and display it
         button1 = tk.Button(self, text="Execute Query 2", command=self.get_query_result, font=("Arial", 14))
@@ -524,35 +790,60 @@ class Query2Page(tk.Frame):
         button2 = tk.Button(self, text="Back to Main Page", command=lambda: controller.show_page(InitPage), font=("Arial", 14))
         button2.pack(padx=30, pady=10)
 
-        # Create Text widget for displaying content
-        self.text_widget = tk.Text(self, wrap="word", font=("Arial", 14), padx=10, pady=10)
-        self.text_widget.config(state="disabled")  # Disable editing initially
-
-        # Create Scrollbar
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.text_widget.yview)
-        self.text_widget.config(yscrollcommand=scrollbar.set)
-
-        # Grid layout
-        #self.text_widget.grid(row=0, column=0, sticky="nsew")
-        #scrollbar.grid(row=0, column=1, sticky="ns")
-        self.text_widget.pack(side="left", expand=True, fill="both", pady=10)
-        scrollbar.pack(side="right", fill="y")
-
-        # Configure expansion
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_columnconfigure(0, weight=1)
+        # Results, with progress and cancel controls; the query runs in the background
+        self.results = ResultPanel(self)
+        self.results.pack(expand=True, fill="both")
 
     def get_query_result(self):
-        output_text = get_result_query2()       
-
-        # Enable text widget to insert new content
-        self.text_widget.config(state="normal")
-        self.text_widget.delete("1.0", tk.END)  # Clear existing text
-        self.text_widget.insert("1.0", output_text)  # Insert new text
-        self.text_widget.config(state="disabled")  # Disable editing again
- 
-        return
+        self.results.run(self.controller.run_query2)
 
 if __name__ == "__main__": 
-    app = App()
+    if len(sys.argv) > 1 and sys.argv[1] == "ingest":
+        # python hetio_cassandra.py ingest [--force] [--resume] [--concurrency N]
+        concurrency = WRITE_CONCURRENCY
+        if "--concurrency" in sys.argv:
+            concurrency = int(sys.argv[sys.argv.index("--concurrency") + 1])
+        if not is_cassandra_running():
+            start_cassandra()
+        ingest_dataset(connect_to_cassandra(), force="--force" in sys.argv, concurrency=concurrency, resume="--resume" in sys.argv)
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "delta":
+        # python hetio_cassandra.py delta [--concurrency N]
+        concurrency = WRITE_CONCURRENCY
+        if "--concurrency" in sys.argv:
+            concurrency = int(sys.argv[sys.argv.index("--concurrency") + 1])
+        if not is_cassandra_running():
+            start_cassandra()
+        apply_delta(connect_to_cassandra(), concurrency=concurrency)
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "query1":
+        # python hetio_cassandra.py query1 ID [ID...] | --file disease_ids.txt
+        if "--file" in sys.argv[2:] and not (len(sys.argv) == 4 and sys.argv[2] == "--file"):
+            print("[✖] Usage: python hetio_cassandra.py query1 ID [ID...] | --file disease_ids.txt")
+            sys.exit(1)
+        disease_ids = read_ids_file(sys.argv[3]) if sys.argv[2:3] == ["--file"] else sys.argv[2:]
+        if not disease_ids:
+            print("[✖] Provide one or more disease IDs, or --file with one ID per line.")
+            sys.exit(1)
+        output_text = query_diseases_info(get_session(), disease_ids)
+        save_results_to_file("cassandra_query1_batch.txt", output_text)
+        print(output_text)
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench-query2":
+        # python hetio_cassandra.py bench-query2
+        benchmark_query2_reads(get_session())
+        sys.exit(0)
+
+    # python hetio_cassandra.py [--backend memory|neo4j|cassandra]
+    backend = "cassandra"
+    if "--backend" in sys.argv:
+        backend = sys.argv[sys.argv.index("--backend") + 1]
+        if backend not in BACKENDS:
+            print(f"[✖] Unknown backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+            sys.exit(1)
+
+    app = App(backend)
     app.mainloop()
\ No newline at end of file
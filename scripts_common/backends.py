@@ -0,0 +1,341 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.compressed_io import find_input
+
+# Compressed copies (e.g. data/edges.tsv.gz) are used when the plain file is absent
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+NODES_FILE = find_input(os.path.join(DATA_DIR, "nodes.tsv"))
+EDGES_FILE = find_input(os.path.join(DATA_DIR, "edges.tsv"))
+
+# Backend used when none is named (HETIO_BACKEND in .env or the environment)
+DEFAULT_BACKEND = os.getenv("HETIO_BACKEND", "memory")
+
+################################################################################################
+# Result formatting shared by every backend
+################################################################################################
+def format_disease_info(data):
+    """
+    Formats a Query 1 result (Disease_ID, Disease_Name, Drugs, Genes, Locations) as text.
+    """
+    output_text = f"\nDisease ID: {data['Disease_ID']}\n"
+    output_text += f"Disease Name: {data['Disease_Name']}\n"
+    output_text += f"Drugs for Treatment/Palliation: {', '.join(sorted(data['Drugs'])) if data['Drugs'] else 'None'}\n"
+    output_text += f"Genes that Cause the Disease: {', '.join(sorted(data['Genes'])) if data['Genes'] else 'None'}\n"
+    output_text += f"Anatomy Locations: {', '.join(sorted(data['Locations'])) if data['Locations'] else 'Unknown'}\n"
+    return output_text
+
+def read_ids_file(path):
+    """
+    Reads ids from a text file, one per line. Blank lines and lines starting with # are skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+def format_new_drug(record):
+    """
+    Formats one new drug candidate (Compound_ID, Compound_Name) as an output line.
+    """
+    return f"{record['Compound_ID']}, Compound Name: {record['Compound_Name']}"
+
+def format_new_drugs(records):
+    """
+    Formats all new drug candidates as text.
+    """
+    lines = [format_new_drug(record) for record in records]
+    if not lines:
+        return "No new drug candidates found."
+    return "Potential New Drugs:\n" + "\n".join(lines)
+
+################################################################################################
+# Backends
+################################################################################################
+class QueryBackend:
+    """
+    Common interface for answering Query 1 and Query 2.
+
+    disease_info(disease_id) returns a dict with Disease_ID, Disease_Name, Drugs, Genes and Locations
+    (lists of names), or None if the disease is unknown. new_drug_candidates() returns dicts with
+    Compound_ID and Compound_Name, ordered by compound id.
+    """
+    name = None
+
+    def disease_info(self, disease_id):
+        raise NotImplementedError
+
+    def new_drug_candidates(self):
+        raise NotImplementedError
+
+    def diseases_info(self, disease_ids):
+        """
+        Yields (disease_id, disease_info(disease_id)) for many diseases; None marks an unknown id.
+        Backends that can batch round trips override this, possibly yielding in completion order.
+        """
+        for disease_id in dict.fromkeys(disease_ids):
+            yield (disease_id, self.disease_info(disease_id))
+
+    def is_available(self):
+        """
+        True when the backend can answer queries (e.g. its server is reachable).
+        """
+        return True
+
+    def close(self):
+        pass
+
+class MemoryBackend(QueryBackend):
+    """
+    In-process backend over the memory-mapped graph snapshot. Needs no database server.
+    """
+    name = "memory"
+
+    def __init__(self, nodes_file=NODES_FILE, edges_file=EDGES_FILE):
+        self.nodes_file = nodes_file
+        self.edges_file = edges_file
+        self._candidates = None
+        self._candidates_graph = None
+
+    @property
+    def graph(self):
+        from scripts_common.snapshot import get_snapshot_graph
+        return get_snapshot_graph(self.nodes_file, self.edges_file)
+
+    def disease_info(self, disease_id):
+        graph = self.graph
+        disease_name = graph.get_name("Disease", disease_id)
+        if disease_name is None:
+            return None
+
+        # Resolve only the disease's neighbours, so a lookup costs O(degree) rather than O(nodes)
+        drugs = {graph.get_name("Compound", c) for metaedge in ("CtD", "CpD") for c in graph.sources(metaedge, disease_id)}
+        genes = {graph.get_name("Gene", g) for metaedge in ("DaG", "DdG", "DuG") for g in graph.targets(metaedge, disease_id)}
+        locations = {graph.get_name("Anatomy", a) for a in graph.targets("DlA", disease_id)}
+
+        return {
+            "Disease_ID": disease_id,
+            "Disease_Name": disease_name,
+            "Drugs": sorted(name for name in drugs if name is not None),
+            "Genes": sorted(name for name in genes if name is not None),
+            "Locations": sorted(name for name in locations if name is not None),
+        }
+
+    def new_drug_candidates(self):
+        from scripts_common.new_drugs import find_new_drugs
+        graph = self.graph
+        if self._candidates_graph is not graph:  # Recompute only when the snapshot changed
+            self._candidates = [{"Compound_ID": compound_id, "Compound_Name": name}
+                                for compound_id, name in find_new_drugs(graph)]
+            self._candidates_graph = graph
+        return list(self._candidates)
+
+    def is_available(self):
+        return os.path.exists(self.nodes_file) and os.path.exists(self.edges_file)
+
+class Neo4jBackend(QueryBackend):
+    """
+    Backend over the Neo4j database (scripts_neo4j), using the shared pooled connection.
+    """
+    name = "neo4j"
+
+    def disease_info(self, disease_id):
+        from scripts_neo4j.queries import fetch_disease_info
+        record = fetch_disease_info(disease_id)
+        return dict(record) if record is not None else None
+
+    def diseases_info(self, disease_ids):
+        from scripts_neo4j.queries import iter_diseases_info
+        for disease_id, record in iter_diseases_info(disease_ids):
+            yield (disease_id, dict(record) if record is not None else None)
+
+    def new_drug_candidates(self):
+        from scripts_neo4j.queries import iter_new_drugs
+        return [dict(record) for record in iter_new_drugs()]
+
+    def is_available(self):
+        from scripts_neo4j.db_connection import get_connection
+        try:
+            get_connection().driver.verify_connectivity()
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        from scripts_neo4j.db_connection import close_connection
+        close_connection()
+
+class CassandraBackend(QueryBackend):
+    """
+    Backend over the Cassandra tables (scripts_cassandra/hetio_cassandra.py).
+    """
+    name = "cassandra"
+
+    @property
+    def session(self):
+        from scripts_cassandra import hetio_cassandra
+        return hetio_cassandra.get_session()
+
+    def disease_info(self, disease_id):
+        from scripts_cassandra.hetio_cassandra import read_disease_info
+        return self.row_to_dict(read_disease_info(self.session, disease_id))
+
+    def diseases_info(self, disease_ids):
+        from scripts_cassandra.hetio_cassandra import read_diseases_info
+        for disease_id, row in read_diseases_info(self.session, disease_ids):
+            yield (disease_id, self.row_to_dict(row))
+
+    @staticmethod
+    def row_to_dict(row):
+        """
+        Converts a disease_info row to the Query 1 dict, or None.
+        """
+        if row is None:
+            return None
+        return {
+            "Disease_ID": row.disease_id,
+            "Disease_Name": row.disease_name,
+            "Drugs": sorted(row.drug_names or ()),
+            "Genes": sorted(row.gene_names or ()),
+            "Locations": sorted(row.location_names or ()),
+        }
+
+    def new_drug_candidates(self):
+        from scripts_cassandra.hetio_cassandra import read_new_compound_candidates
+        return [{"Compound_ID": row.compound_id, "Compound_Name": row.compound_name}
+                for row in read_new_compound_candidates(self.session)]
+
+    def is_available(self):
+        from cassandra.cluster import Cluster
+        try:
+            cluster = Cluster(["127.0.0.1"], connect_timeout=2)
+            cluster.connect().shutdown()
+            cluster.shutdown()
+            return True
+        except Exception:
+            return False
+
+class PandasBackend(QueryBackend):
+    """
+    Backend over pandas DataFrames of nodes.tsv/edges.tsv, the approach of tests/test_alternative_approach_with_pandas.py.
+    """
+    name = "pandas"
+
+    def __init__(self, nodes_file=NODES_FILE, edges_file=EDGES_FILE):
+        self.nodes_file = nodes_file
+        self.edges_file = edges_file
+        self._nodes = None
+        self._edges = None
+
+    def load(self):
+        """
+        Reads both files into DataFrames on first use.
+        """
+        import pandas as pd
+        if self._nodes is None:
+            self._nodes = pd.read_csv(self.nodes_file, delimiter="\t", dtype=str, keep_default_na=False)
+            self._edges = pd.read_csv(self.edges_file, delimiter="\t", dtype=str, keep_default_na=False)
+        return (self._nodes, self._edges)
+
+    def disease_info(self, disease_id):
+        df_nodes, df_edges = self.load()
+        names = df_nodes.set_index("id")["name"]
+        if disease_id not in names.index:
+            return None
+
+        def linked_names(metaedges, column, other):
+            linked = df_edges[df_edges["metaedge"].isin(metaedges) & (df_edges[column] == disease_id)][other]
+            return sorted(set(names.reindex(linked).dropna()))
+
+        return {
+            "Disease_ID": disease_id,
+            "Disease_Name": names[disease_id],
+            "Drugs": linked_names(["CtD", "CpD"], "target", "source"),
+            "Genes": linked_names(["DaG", "DdG", "DuG"], "source", "target"),
+            "Locations": linked_names(["DlA"], "source", "target"),
+        }
+
+    def new_drug_candidates(self):
+        import pandas as pd
+        df_nodes, df_edges = self.load()
+        by_metaedge = lambda metaedge: df_edges[df_edges["metaedge"] == metaedge]
+
+        # Anatomies where a disease occurs
+        disease_anatomies = by_metaedge("DlA")["target"].drop_duplicates()
+
+        compounds = []
+        for compound_edge, anatomy_edge in (("CuG", "AdG"), ("CdG", "AuG")):
+            anatomy_gene = by_metaedge(anatomy_edge)
+            anatomy_gene = anatomy_gene[anatomy_gene["source"].isin(disease_anatomies)]
+            joined = pd.merge(by_metaedge(compound_edge), anatomy_gene, on="target", suffixes=("_compound", "_anatomy"))
+            compounds.append(joined["source_compound"])
+
+        candidates = set(pd.concat(compounds)) if compounds else set()
+        treating = set(df_edges[df_edges["metaedge"].isin(["CtD", "CpD"])]["source"])
+        names = df_nodes.set_index("id")["name"]
+        return [{"Compound_ID": compound_id, "Compound_Name": names.get(compound_id)}
+                for compound_id in sorted(candidates - treating)]
+
+    def is_available(self):
+        try:
+            import pandas
+        except ImportError:
+            return False
+        return os.path.exists(self.nodes_file) and os.path.exists(self.edges_file)
+
+class ServiceBackend(QueryBackend):
+    """
+    Client of the local query service (scripts_common/query_service.py), so several GUI processes
+    share its connection pool and concurrent identical queries run once.
+    """
+    name = "service"
+
+    def __init__(self, url=None):
+        self.url = url or f"http://127.0.0.1:{os.getenv('QUERY_SERVICE_PORT', '8765')}"
+
+    def request(self, path, timeout=600):
+        import json
+        import urllib.error
+        import urllib.request
+        try:
+            with urllib.request.urlopen(self.url + path, timeout=timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as error:
+            if error.code == 404 and path.startswith("/query1"):
+                return None
+            raise RuntimeError(json.load(error).get("error", str(error))) from error
+
+    def disease_info(self, disease_id):
+        from urllib.parse import quote
+        return self.request(f"/query1?disease_id={quote(disease_id)}")
+
+    def new_drug_candidates(self):
+        return self.request("/query2")["candidates"]
+
+    def is_available(self):
+        try:
+            self.request("/stats", timeout=2)
+            return True
+        except Exception:
+            return False
+
+BACKENDS = {
+    "memory": MemoryBackend,
+    "pandas": PandasBackend,
+    "neo4j": Neo4jBackend,
+    "cassandra": CassandraBackend,
+    "service": ServiceBackend,
+}
+
+_backends = {}  # name -> backend instance, one per process
+
+def get_backend(name=None):
+    """
+    Returns the (shared) backend called `name`: 'memory', 'pandas', 'neo4j', 'cassandra' or 'service'.
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.compressed_io import open_binary
+
+# One JSON file per loader, e.g. data/.checkpoints/neo4j_edges.json
+CHECKPOINT_DIR = os.getenv("HETIO_CHECKPOINT_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", ".checkpoints"))
+
+def get_checkpoint_path(name):
+    return os.path.join(CHECKPOINT_DIR, f"{name}.json")
+
+def describe_file(path):
+    """ Identifies an input file by path, size and modification time; a checkpoint only applies to the same file. """
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def save_checkpoint(name, source, **state):
+    """
+    Durably records the progress of a loader: written to a temporary file, flushed to disk
+    and renamed over the previous checkpoint, so a crash leaves either the old or the new one.
+    `source` identifies the input (e.g. `describe_file` or a dataset fingerprint).
+    """
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    path = get_checkpoint_path(name)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"source": source, **state}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+def load_checkpoint(name, source):
+    """
+    Returns the saved state of a loader, or None if there is none or it was saved for another input.
+    """
+    try:
+        with open(get_checkpoint_path(name), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.pop("source", None) != source:
+        return None
+    return state
+
+def clear_checkpoint(name):
+    try:
+        os.remove(get_checkpoint_path(name))
+    except FileNotFoundError:
+        pass
+
+def read_tsv_chunks(file_path, chunk_size, offset=0):
+    """
+    Reads a TSV file in chunks of `chunk_size` consecutive rows, starting at byte `offset`
+    (0 or any earlier end offset). Yields (rows as dicts keyed by the header, byte offset after the chunk),
+    so a loader that checkpoints the offset of each written chunk can seek straight past it on restart.
+    Compressed files are read through `open_binary`; offsets then count decompressed bytes, and
+    resuming decompresses (without parsing) up to the offset, since compressed streams cannot seek.
+    """
+    with open_binary(file_path) as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode("utf-8")], delimiter="\t"))
+        position = max(offset, len(header_line))
+        if f.seekable():
+            f.seek(position)
+        else:
+            remaining = position - len(header_line)
+            while remaining > 0:
+                skipped = len(f.read(min(remaining, 1 << 20)))
+                if not skipped:
+                    break
+                remaining -= skipped
+        lines = []
+        for line in f:
+            lines.append(line.decode("utf-8"))
+            position += len(line)
+            if len(lines) >= chunk_size:
+                yield ([dict(zip(header, fields)) for fields in csv.reader(lines, delimiter="\t") if fields], position)
+                lines = []
+        if lines:
+            yield ([dict(zip(header, fields)) for fields in csv.reader(lines, delimiter="\t") if fields], position)
@@ -0,0 +1,173 @@
+import argparse
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+# Supported compressed inputs, by file suffix (e.g. hetionet-v1.0-edges.sif.gz)
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+# Decompressed bytes per chunk, and chunks the background thread may decompress ahead of the reader
+READ_CHUNK_SIZE = 1 << 20
+PREFETCH_CHUNKS = 8
+
+def is_compressed(path):
+    return os.path.splitext(path)[1].lower() in COMPRESSED_OPENERS
+
+def find_input(path):
+    """
+    Returns `path` if it exists, else the first existing compressed copy (path.gz, path.bz2, path.xz),
+    so data/edges.tsv can be shipped as data/edges.tsv.gz. Falls back to `path` itself.
+    """
+    if os.path.exists(path):
+        return path
+    for suffix in COMPRESSED_OPENERS:
+        if os.path.exists(path + suffix):
+            return path + suffix
+    return path
+
+class BackgroundReader(io.RawIOBase):
+    """
+    A read-only binary stream over `source` whose chunks are read (and so decompressed) on a
+    background thread, up to `prefetch` chunks ahead of the consumer. zlib, bz2 and lzma release
+    the GIL while decompressing, so decompression overlaps the caller's parsing.
+    """
+
+    def __init__(self, source, chunk_size=READ_CHUNK_SIZE, prefetch=PREFETCH_CHUNKS):
+        super().__init__()
+        self._source = source
+        self._chunks = queue.Queue(maxsize=prefetch)
+        self._stop = threading.Event()
+        self._chunk = memoryview(b"")
+        self._offset = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, args=(chunk_size,), name="decompress", daemon=True)
+        self._thread.start()
+
+    def _produce(self, chunk_size):
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as error:
+            self._put(error)  # Raised in the reading thread
+
+    def _put(self, item):
+        while not self._stop.is_set():  # Never block forever once the reader has been closed
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._offset >= len(self._chunk):
+            if self._eof:
+                return 0
+            item = self._chunks.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._chunk, self._offset = memoryview(item), 0
+        count = min(len(buffer), len(self._chunk) - self._offset)
+        buffer[:count] = self._chunk[self._offset:self._offset + count]
+        self._offset += count
+        return count
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._source.close()
+        super().close()
+
+def open_binary(path, background=True):
+    """
+    Opens a plain or compressed (.gz/.bz2/.xz) file for binary reading. Compressed files are
+    decompressed as they are read, on a background thread unless `background` is False.
+    Plain files are returned as regular (seekable) files; compressed streams cannot seek.
+    """
+    if not is_compressed(path):
+        return open(path, "rb")
+    source = COMPRESSED_OPENERS[os.path.splitext(path)[1].lower()](path, "rb")
+    if not background:
+        return source
+    return io.BufferedReader(BackgroundReader(source), buffer_size=READ_CHUNK_SIZE)
+
+def open_text(path, encoding="utf-8", newline=None, background=True):
+    """ Text-mode `open_binary`, a drop-in for open(path, "r", encoding=...). """
+    if not is_compressed(path):
+        return open(path, "r", encoding=encoding, newline=newline)
+    return io.TextIOWrapper(open_binary(path, background), encoding=encoding, newline=newline)
+
+################################################################################################
+# Throughput: plain vs compressed
+################################################################################################
+def measure_read(path, background=True):
+    """ Parses a TSV file with csv.reader. Returns (rows, seconds). """
+    start = time.perf_counter()
+    with open_text(path, newline="", background=background) as f:
+        rows = sum(1 for _ in csv.reader(f, delimiter="\t"))
+    return (rows, time.perf_counter() - start)
+
+def compress_copy(path, suffix, output_dir):
+    """ Writes a compressed copy of `path` into `output_dir`. Returns its path. """
+    output = os.path.join(output_dir, os.path.basename(path) + suffix)
+    with open(path, "rb") as source, COMPRESSED_OPENERS[suffix](output, "wb") as target:
+        shutil.copyfileobj(source, target, READ_CHUNK_SIZE)
+    return output
+
+def compare_throughput(plain_path, compressed_paths, repeat=3):
+    """
+    Parses the plain TSV and each compressed copy (inline and with the background thread) and
+    prints rows/sec, MB/s of decompressed text and the time relative to the plain file.
+    Returns {label: best seconds}.
+    """
+    size = os.path.getsize(plain_path)
+    runs = [("plain", plain_path, True)]
+    for path in compressed_paths:
+        suffix = os.path.splitext(path)[1]
+        runs += [(f"{suffix} inline", path, False), (f"{suffix} background", path, True)]
+
+    timings = {}
+    for label, path, background in runs:
+        rows, seconds = min((measure_read(path, background) for _ in range(repeat)), key=lambda result: result[1])
+        timings[label] = seconds
+        print(f"{label:>16}: {os.path.getsize(path) / 1e6:8.1f} MB on disk, {seconds:6.2f}s, "
+              f"{rows / seconds:12,.0f} rows/sec, {size / 1e6 / seconds:7.1f} MB/s, "
+              f"{seconds / timings['plain']:5.2f}x plain")
+    return timings
+
+# Compare reading plain and compressed inputs: python scripts_common/compressed_io.py data/edges.tsv [--formats .gz,.bz2,.xz]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare parsing throughput of a plain TSV and compressed copies of it.")
+    parser.add_argument("plain", help="Plain TSV file, e.g. data/edges.tsv.")
+    parser.add_argument("--compressed", nargs="*", default=[],
+                        help="Existing compressed copies to compare; by default temporary copies are written.")
+    parser.add_argument("--formats", default=",".join(COMPRESSED_OPENERS), help="Formats of the temporary copies.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        compressed = args.compressed
+        if not compressed:
+            for suffix in args.formats.split(","):
+                start = time.perf_counter()
+                compressed.append(compress_copy(args.plain, suffix, tmp_dir))
+                print(f"Wrote {suffix} copy in {time.perf_counter() - start:.1f}s.")
+        compare_throughput(args.plain, compressed, args.repeat)
@@ -0,0 +1,263 @@
+import csv
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.hetio_graph import load_hetio_graph, get_hetio_graph
+from scripts_common.compressed_io import open_text
+from scripts_common import metrics
+
+def get_node_kind(node_id):
+    """ Returns the kind encoded in a Hetionet id, e.g. 'Compound::DB00035' -> 'Compound'. """
+    return node_id.split("::", 1)[0]
+
+class NodeIndex:
+    """
+    Interns the node ids of one kind to consecutive int32 indices.
+    """
+
+    def __init__(self):
+        self.ids = []     # index -> node id
+        self.names = []   # index -> name
+        self.index = {}   # node id -> index
+
+    def add(self, node_id, name=None):
+        """
+        Returns the index of `node_id`, adding it if needed. Edge endpoints missing from nodes.tsv have no name.
+        """
+        i = self.index.get(node_id)
+        if i is None:
+            i = len(self.ids)
+            self.index[node_id] = i
+            self.ids.append(node_id)
+            self.names.append(name)
+        elif name is not None:
+            self.names[i] = name
+        return i
+
+    def __len__(self):
+        return len(self.ids)
+
+class CSRAdjacency:
+    """
+    Compressed sparse row adjacency: the neighbours of row i are indices[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, offsets, indices):
+        self.offsets = offsets  # int64, length rows + 1
+        self.indices = indices  # int32, length edges
+
+    @classmethod
+    def from_pairs(cls, rows, columns, row_count):
+        """
+        Builds the adjacency from parallel arrays of row and column indices.
+        """
+        counts = np.bincount(rows, minlength=row_count)
+        offsets = np.zeros(row_count + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        order = np.argsort(rows, kind="stable")
+        return cls(offsets, columns[order].astype(np.int32, copy=False))
+
+    def neighbors(self, i):
+        """
+        Returns the column indices of row i as an array view.
+        """
+        return self.indices[self.offsets[i]:self.offsets[i + 1]]
+
+    def degrees(self):
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.indices.nbytes
+
+class AdjacencyView(Mapping):
+    """
+    Read-only {node id: [neighbour ids]} view over a CSR adjacency, listing only nodes with neighbours.
+    Lets code written against HetioGraph's dict adjacency run unchanged on a CSRGraph.
+    """
+
+    def __init__(self, adjacency, row_nodes, column_nodes):
+        self.adjacency = adjacency
+        self.row_nodes = row_nodes
+        self.column_nodes = column_nodes
+
+    def __getitem__(self, node_id):
+        i = self.row_nodes.index.get(node_id)
+        if i is None or i >= len(self.adjacency.offsets) - 1:
+            raise KeyError(node_id)
+        neighbors = self.adjacency.neighbors(i)
+        if len(neighbors) == 0:
+            raise KeyError(node_id)
+        ids = self.column_nodes.ids
+        return [ids[j] for j in neighbors]
+
+    def __iter__(self):
+        ids = self.row_nodes.ids
+        for i in np.flatnonzero(self.adjacency.degrees()):
+            yield ids[i]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.adjacency.degrees()))
+
+class CSRGraph:
+    """
+    Compact Hetionet graph: node ids interned to int32 indices per kind, and every metaedge
+    stored as NumPy CSR arrays in both directions. Offers the same read methods as HetioGraph.
+    """
+
+    def __init__(self):
+        self.nodes = {}              # kind -> NodeIndex
+        self.metaedge_kinds = {}     # metaedge -> (source kind, target kind)
+        self.forward = {}            # metaedge -> CSRAdjacency over source indices
+        self.backward = {}           # metaedge -> CSRAdjacency over target indices
+
+    def node_index(self, kind):
+        if kind not in self.nodes:
+            self.nodes[kind] = NodeIndex()
+        return self.nodes[kind]
+
+    def get_names(self, kind):
+        """
+        Returns {node id: name} for one kind, e.g. 'Disease'.
+        """
+        nodes = self.nodes.get(kind)
+        if nodes is None:
+            return {}
+        return {node_id: name for node_id, name in zip(nodes.ids, nodes.names) if name is not None}
+
+    def get_name(self, kind, node_id):
+        """
+        Returns the name of one node, or None if it is unknown or has no name. O(1): looks up its index only.
+        """
+        nodes = self.nodes.get(kind)
+        i = nodes.index.get(node_id) if nodes is not None else None
+        return nodes.names[i] if i is not None else None
+
+    def metaedges(self):
+        return list(self.forward)
+
+    def edges(self, metaedge):
+        """
+        Yields (source, target) id pairs of one metaedge.
+        """
+        if metaedge not in self.forward:
+            return
+        source_kind, target_kind = self.metaedge_kinds[metaedge]
+        source_ids, target_ids = self.nodes[source_kind].ids, self.nodes[target_kind].ids
+        adjacency = self.forward[metaedge]
+        for i in np.flatnonzero(adjacency.degrees()):
+            source = source_ids[i]
+            for j in adjacency.neighbors(i):
+                yield (source, target_ids[j])
+
+    def targets(self, metaedge, source):
+        if metaedge not in self.forward:
+            return []
+        return self.view(metaedge).get(source, [])
+
+    def sources(self, metaedge, target):
+        if metaedge not in self.backward:
+            return []
+        return self.reverse(metaedge).get(target, [])
+
+    def view(self, metaedge):
+        """
+        Returns {source id: [target ids]} for one metaedge.
+        """
+        source_kind, target_kind = self.metaedge_kinds[metaedge]
+        return AdjacencyView(self.forward[metaedge], self.nodes[source_kind], self.nodes[target_kind])
+
+    def reverse(self, metaedge):
+        """
+        Returns {target id: [source ids]} for one metaedge.
+        """
+        if metaedge not in self.backward:
+            return {}
+        source_kind, target_kind = self.metaedge_kinds[metaedge]
+        return AdjacencyView(self.backward[metaedge], self.nodes[target_kind], self.nodes[source_kind])
+
+    @property
+    def nbytes(self):
+        """
+        Bytes held by the CSR arrays (excluding the id and name string tables).
+        """
+        return sum(a.nbytes for a in self.forward.values()) + sum(a.nbytes for a in self.backward.values())
+
+@metrics.stage("build_csr_graph")
+def build_csr_graph(nodes_file, edges_file):
+    """
+    Reads nodes.tsv and edges.tsv once each and returns a CSRGraph.
+    Edge endpoints are collected into compact int32 arrays before the CSR arrays are built.
+    """
+    start = time.perf_counter()
+    graph = CSRGraph()
+
+    with open_text(nodes_file) as file:
+        reader = csv.reader(file, delimiter="\t")
+        next(reader)  # Skip header
+        for node_id, name, kind in reader:
+            graph.node_index(kind).add(node_id, name)
+
+    pairs = {}  # metaedge -> (source indices, target indices)
+    with open_text(edges_file) as file:
+        reader = csv.reader(file, delimiter="\t")
+        next(reader)  # Skip header
+        for source, metaedge, target in reader:
+            if metaedge not in pairs:
+                pairs[metaedge] = (array("i"), array("i"))
+                graph.metaedge_kinds[metaedge] = (get_node_kind(source), get_node_kind(target))
+            source_kind, target_kind = graph.metaedge_kinds[metaedge]
+            sources, targets = pairs[metaedge]
+            sources.append(graph.node_index(source_kind).add(source))
+            targets.append(graph.node_index(target_kind).add(target))
+
+    for metaedge, (sources, targets) in pairs.items():
+        source_kind, target_kind = graph.metaedge_kinds[metaedge]
+        sources = np.frombuffer(sources, dtype=np.int32)
+        targets = np.frombuffer(targets, dtype=np.int32)
+        graph.forward[metaedge] = CSRAdjacency.from_pairs(sources, targets, len(graph.nodes[source_kind]))
+        graph.backward[metaedge] = CSRAdjacency.from_pairs(targets, sources, len(graph.nodes[target_kind]))
+
+    rows = sum(len(nodes) for nodes in graph.nodes.values()) + sum(len(sources) for sources, _ in pairs.values())
+    metrics.record_load("build_csr_graph", rows, time.perf_counter() - start)
+    return graph
+
+def get_csr_graph(nodes_file, edges_file):
+    """
+    Returns the CSRGraph for these files, parsing them only once per process (or when they change).
+    """
+    return get_hetio_graph(nodes_file, edges_file, loader=build_csr_graph)
+
+def measure_memory(loader, nodes_file, edges_file):
+    """
+    Returns (seconds, bytes still allocated) for building a graph with `loader`.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph = loader(nodes_file, edges_file)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del graph
+    return (elapsed, current)
+
+# Compare memory of the dict-based and CSR models: python scripts_common/csr_graph.py [nodes.tsv] [edges.tsv]
+if __name__ == "__main__":
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+    nodes_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(data_dir, "nodes.tsv")
+    edges_file = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, "edges.tsv")
+
+    dict_time, dict_bytes = measure_memory(load_hetio_graph, nodes_file, edges_file)
+    csr_time, csr_bytes = measure_memory(build_csr_graph, nodes_file, edges_file)
+
+    print(f"HetioGraph (dicts of lists): {dict_bytes / 2**20:,.1f} MiB, built in {dict_time:.1f}s")
+    print(f"CSRGraph (int32 CSR arrays): {csr_bytes / 2**20:,.1f} MiB, built in {csr_time:.1f}s")
+    print(f"Memory reduction: {dict_bytes / max(csr_bytes, 1):.1f}x")
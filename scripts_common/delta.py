@@ -0,0 +1,189 @@
+import argparse
+import csv
+import hashlib
+import heapq
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.compressed_io import find_input, open_text
+
+# Manifests of what each database last loaded, e.g. data/.manifest/neo4j/
+MANIFEST_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", ".manifest")
+
+# Rows sorted in memory per run before runs are merged from disk
+RUN_SIZE = 200000
+
+# Manifest file names; a computed but not yet applied manifest is written next to them as *.pending
+MANIFEST_FILES = ("nodes.sorted", "edges.sorted")
+
+def get_manifest_dir(target):
+    """ Manifest folder of one database, e.g. 'neo4j' or 'cassandra'. """
+    return os.path.join(MANIFEST_ROOT, target)
+
+def row_hash(row):
+    """ 16 hex digit BLAKE2b hash of a normalized row. """
+    return hashlib.blake2b(row.encode("utf-8"), digest_size=8).hexdigest()
+
+def read_rows(file_path):
+    """ Yields the rows of a TSV file (header skipped) as tab-joined, whitespace-stripped fields. """
+    with open_text(file_path, newline="") as f:
+        reader = csv.reader(f, delimiter="\t")
+        next(reader, None)  # Skip header
+        for fields in reader:
+            if fields:
+                yield "\t".join(field.strip() for field in fields)
+
+def write_run(lines, directory):
+    """ Sorts one run in memory and writes it to a temporary file. Returns the file path. """
+    lines.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+        f.writelines(lines)
+    return path
+
+def sort_rows(file_path, output_path, run_size=RUN_SIZE):
+    """
+    Writes the rows of a TSV file to `output_path` as sorted, duplicate-free "hash<TAB>row" lines.
+    At most `run_size` rows are held in memory: sorted runs are spilled to disk and merged.
+    Returns the number of rows written.
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    run_paths = []
+    runs = []
+    try:
+        lines = []
+        for row in read_rows(file_path):
+            lines.append(f"{row_hash(row)}\t{row}\n")
+            if len(lines) >= run_size:
+                run_paths.append(write_run(lines, directory))
+                lines = []
+        lines.sort()
+
+        runs = [open(path, "r", encoding="utf-8", newline="") for path in run_paths]
+        count = 0
+        previous = None
+        with open(output_path, "w", encoding="utf-8", newline="") as output:
+            for line in heapq.merge(lines, *runs):
+                if line != previous:
+                    output.write(line)
+                    count += 1
+                previous = line
+        return count
+    finally:
+        for run in runs:
+            run.close()
+        for path in run_paths:
+            os.remove(path)
+
+def diff_sorted(old_path, new_path):
+    """
+    Merge-joins two files written by `sort_rows`. Yields ('-', fields) for rows only in the old file
+    and ('+', fields) for rows only in the new one; rows in both are skipped.
+    """
+    with open(old_path, "r", encoding="utf-8", newline="") as old, open(new_path, "r", encoding="utf-8", newline="") as new:
+        old_line = next(old, None)
+        new_line = next(new, None)
+        while old_line is not None or new_line is not None:
+            if new_line is None or (old_line is not None and old_line < new_line):
+                yield ("-", tuple(old_line.rstrip("\n").split("\t")[1:]))
+                old_line = next(old, None)
+            elif old_line is None or new_line < old_line:
+                yield ("+", tuple(new_line.rstrip("\n").split("\t")[1:]))
+                new_line = next(new, None)
+            else:
+                old_line = next(old, None)
+                new_line = next(new, None)
+
+class Delta:
+    """
+    Rows that changed between the last loaded nodes.tsv/edges.tsv and the current ones.
+
+    `nodes_added` holds (id, name, kind) rows that are new or whose name or kind changed;
+    `nodes_removed` holds the old rows of ids that are gone. Edges are (source, metaedge, target).
+    """
+
+    def __init__(self):
+        self.nodes_added = []
+        self.nodes_removed = []
+        self.edges_added = []
+        self.edges_removed = []
+
+    def changed_edges(self):
+        return self.edges_added + self.edges_removed
+
+    def changed_node_ids(self):
+        """ Ids of nodes that were added, renamed or removed. """
+        return {row[0] for row in self.nodes_added} | {row[0] for row in self.nodes_removed}
+
+    def __len__(self):
+        return len(self.nodes_added) + len(self.nodes_removed) + len(self.edges_added) + len(self.edges_removed)
+
+    def summary(self):
+        return (f"{len(self.nodes_added)} nodes added or changed, {len(self.nodes_removed)} removed; "
+                f"{len(self.edges_added)} edges added, {len(self.edges_removed)} removed")
+
+def has_manifest(manifest_dir):
+    return all(os.path.exists(os.path.join(manifest_dir, name)) for name in MANIFEST_FILES)
+
+def prepare_manifest(nodes_file, edges_file, manifest_dir, run_size=RUN_SIZE):
+    """ Writes the sorted manifest of the current files as *.pending, to be committed once they are loaded. """
+    os.makedirs(manifest_dir, exist_ok=True)
+    for name, file_path in zip(MANIFEST_FILES, (nodes_file, edges_file)):
+        sort_rows(file_path, os.path.join(manifest_dir, name + ".pending"), run_size)
+
+def commit_manifest(manifest_dir):
+    """
+    Records the pending manifest as loaded. Call only after every change has been written:
+    a run that fails before this point diffs against the old manifest again next time,
+    and re-applying a delta is harmless because every write is an upsert or delete.
+    """
+    for name in MANIFEST_FILES:
+        os.replace(os.path.join(manifest_dir, name + ".pending"), os.path.join(manifest_dir, name))
+
+def write_manifest(nodes_file, edges_file, manifest_dir, run_size=RUN_SIZE):
+    """ Records the current files as loaded, e.g. after a full load. """
+    prepare_manifest(nodes_file, edges_file, manifest_dir, run_size)
+    commit_manifest(manifest_dir)
+
+def compute_delta(nodes_file, edges_file, manifest_dir, run_size=RUN_SIZE):
+    """
+    Compares the current files with the manifest of the last load and returns a Delta,
+    or None when there is no manifest yet. Leaves the new manifest pending (see `commit_manifest`).
+
+    Sorting reads both files once, in O(dataset) time but bounded memory; only the delta,
+    which is usually a small fraction of the rows, is kept in memory and written to the database.
+    """
+    if not has_manifest(manifest_dir):
+        return None
+    prepare_manifest(nodes_file, edges_file, manifest_dir, run_size)
+
+    delta = Delta()
+    nodes_file_name, edges_file_name = MANIFEST_FILES
+    removed = []
+    for sign, row in diff_sorted(os.path.join(manifest_dir, nodes_file_name), os.path.join(manifest_dir, nodes_file_name + ".pending")):
+        (delta.nodes_added if sign == "+" else removed).append(row)
+    added_ids = {row[0] for row in delta.nodes_added}
+    delta.nodes_removed = [row for row in removed if row[0] not in added_ids]  # A rename is an upsert, not a delete
+
+    for sign, row in diff_sorted(os.path.join(manifest_dir, edges_file_name), os.path.join(manifest_dir, edges_file_name + ".pending")):
+        (delta.edges_added if sign == "+" else delta.edges_removed).append(row)
+    return delta
+
+# Show what changed since the last load: python scripts_common/delta.py neo4j [--nodes data/nodes.tsv] [--edges data/edges.tsv]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare nodes.tsv/edges.tsv with the manifest of the last load.")
+    parser.add_argument("target", choices=["neo4j", "cassandra"])
+    parser.add_argument("--nodes", default=find_input(os.path.join("data", "nodes.tsv")))
+    parser.add_argument("--edges", default=find_input(os.path.join("data", "edges.tsv")))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    delta = compute_delta(args.nodes, args.edges, get_manifest_dir(args.target))
+    if delta is None:
+        print(f"No manifest for {args.target} yet; the next load is a full load.")
+    else:
+        print(f"{delta.summary()} ({time.perf_counter() - start:.1f}s).")
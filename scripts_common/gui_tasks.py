@@ -0,0 +1,148 @@
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk, scrolledtext
+
+# Queries running at once in the background, across all pages
+GUI_WORKERS = 2
+
+# How often (ms) the Tk thread checks whether a query has finished
+POLL_INTERVAL = 50
+
+# Lines inserted into the result widget per Tk callback
+RENDER_CHUNK_LINES = 500
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """
+    Returns the worker pool shared by every ResultPanel, created on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=GUI_WORKERS, thread_name_prefix="gui-query")
+        return _executor
+
+def shutdown_executor():
+    """
+    Drops queued queries and stops accepting new ones; call when the window closes.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def split_chunks(text, chunk_lines=RENDER_CHUNK_LINES):
+    """
+    Splits result text into pieces of at most `chunk_lines` lines, keeping line endings.
+    """
+    lines = text.splitlines(keepends=True)
+    return ["".join(lines[i:i + chunk_lines]) for i in range(0, len(lines), chunk_lines)]
+
+class ResultPanel(tk.Frame):
+    """
+    A read-only result text widget with a progress bar, status line and Cancel button.
+
+    `run(func, *args)` calls `func` on the shared worker pool and, once it returns its result text,
+    inserts the text a chunk at a time from `after()` callbacks, so the window keeps responding
+    while a query runs and while a long result is drawn. Tk widgets are only touched on the Tk thread.
+
+    Cancel stops drawing and discards the result. A query already running on the server is not
+    interrupted; its result is ignored when it arrives.
+    """
+
+    def __init__(self, parent, font=("Arial", 14), height=15):
+        super().__init__(parent)
+        self._task = None  # Token of the current run; replaced on every run and cancel
+
+        controls = tk.Frame(self)
+        controls.pack(fill="x", padx=10)
+        self.progress = ttk.Progressbar(controls, mode="indeterminate", length=200)
+        self.progress.pack(side="left", pady=5)
+        self.status = tk.Label(controls, text="", font=("Arial", 12), anchor="w")
+        self.status.pack(side="left", padx=10, fill="x", expand=True)
+        self.cancel_button = tk.Button(controls, text="Cancel", command=self.cancel, state="disabled", font=("Arial", 12))
+        self.cancel_button.pack(side="right", pady=5)
+
+        self.text_widget = scrolledtext.ScrolledText(self, wrap="word", font=font, padx=10, pady=10, height=height)
+        self.text_widget.config(state="disabled")
+        self.text_widget.pack(padx=10, pady=10, expand=True, fill="both")
+
+    def run(self, func, *args):
+        """
+        Runs `func(*args)` in the background and shows the text it returns. A run in progress is cancelled.
+        """
+        self.cancel(status="")
+        task = self._task = object()
+        self.clear()
+        self.progress.config(mode="indeterminate", value=0)
+        self.progress.start(10)
+        self.status.config(text="Running query...")
+        self.cancel_button.config(state="normal")
+        self.after(POLL_INTERVAL, self._poll, task, get_executor().submit(func, *args))
+
+    def show_text(self, text):
+        """
+        Replaces the shown text at once, e.g. for input errors.
+        """
+        self.cancel(status="")
+        self.clear()
+        self._insert(text)
+
+    def cancel(self, status="Cancelled."):
+        if self._task is None:
+            return
+        self._task = None
+        self._finish(status)
+
+    def clear(self):
+        self.text_widget.config(state="normal")
+        self.text_widget.delete("1.0", tk.END)
+        self.text_widget.config(state="disabled")
+
+    def _insert(self, text):
+        self.text_widget.config(state="normal")
+        self.text_widget.insert(tk.END, text)
+        self.text_widget.config(state="disabled")
+
+    def _finish(self, status):
+        self.progress.stop()
+        self.cancel_button.config(state="disabled")
+        self.status.config(text=status)
+
+    def _poll(self, task, future):
+        if task is not self._task:
+            return  # Cancelled or superseded; drop the result
+        if not future.done():
+            self.after(POLL_INTERVAL, self._poll, task, future)
+            return
+
+        try:
+            text = future.result()
+        except Exception as error:
+            self._task = None
+            self._finish("Query failed.")
+            self._insert(f"Query failed: {error}")
+            return
+
+        text = text or ""
+        chunks = split_chunks(text)
+        self.progress.stop()
+        self.progress.config(mode="determinate", maximum=max(len(chunks), 1), value=0)
+        self._render(task, chunks, 0, len(text.splitlines()))
+
+    def _render(self, task, chunks, index, line_count):
+        if task is not self._task:
+            return
+        if index < len(chunks):
+            self._insert(chunks[index])
+            self.progress.config(value=index + 1)
+            self.status.config(text=f"Showing results... {index + 1}/{len(chunks)}")
+            self.after(1, self._render, task, chunks, index + 1, line_count)
+            return
+
+        self._task = None
+        self._finish(f"Done ({line_count} lines).")
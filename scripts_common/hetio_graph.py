@@ -0,0 +1,109 @@
+import csv
+import os
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.compressed_io import open_text
+
+class HetioGraph:
+    """
+    In-memory Hetionet model built from one scan of nodes.tsv and one scan of edges.tsv.
+    Holds node names by kind and adjacency by metaedge, and serves every query-preparation step.
+    """
+
+    def __init__(self):
+        self.names = defaultdict(dict)                           # kind -> {node id: name}
+        self.adjacency = defaultdict(lambda: defaultdict(list))  # metaedge -> {source id: [target ids]}
+        self._reverse = {}                                       # metaedge -> {target id: [source ids]}, built on demand
+
+    def add_node(self, node_id, name, kind):
+        """
+        Adds a node under its kind.
+        """
+        self.names[kind][sys.intern(node_id)] = name
+
+    def add_edge(self, source, metaedge, target):
+        """
+        Adds a directed edge. Node ids are interned so each id string is stored once.
+        """
+        self.adjacency[metaedge][sys.intern(source)].append(sys.intern(target))
+
+    def get_names(self, kind):
+        """
+        Returns {node id: name} for one kind, e.g. 'Disease'.
+        """
+        return self.names.get(kind, {})
+
+    def get_name(self, kind, node_id):
+        """
+        Returns the name of one node, or None if it is unknown.
+        """
+        return self.names.get(kind, {}).get(node_id)
+
+    def edges(self, metaedge):
+        """
+        Yields (source, target) pairs of one metaedge.
+        """
+        for source, targets in self.adjacency.get(metaedge, {}).items():
+            for target in targets:
+                yield (source, target)
+
+    def targets(self, metaedge, source):
+        """
+        Returns the targets of `source` along `metaedge`.
+        """
+        return self.adjacency.get(metaedge, {}).get(source, [])
+
+    def sources(self, metaedge, target):
+        """
+        Returns the sources pointing to `target` along `metaedge`.
+        """
+        return self.reverse(metaedge).get(target, [])
+
+    def reverse(self, metaedge):
+        """
+        Returns {target id: [source ids]} for one metaedge, building and caching it on first use.
+        """
+        if metaedge not in self._reverse:
+            reverse = defaultdict(list)
+            for source, target in self.edges(metaedge):
+                reverse[target].append(source)
+            self._reverse[metaedge] = dict(reverse)
+        return self._reverse[metaedge]
+
+def load_hetio_graph(nodes_file, edges_file):
+    """
+    Reads nodes.tsv and edges.tsv exactly once each and returns a HetioGraph.
+    """
+    graph = HetioGraph()
+
+    with open_text(nodes_file) as file:
+        reader = csv.reader(file, delimiter="\t")
+        next(reader)  # Skip header
+        for node_id, name, kind in reader:
+            graph.add_node(node_id, name, kind)
+
+    with open_text(edges_file) as file:
+        reader = csv.reader(file, delimiter="\t")
+        next(reader)  # Skip header
+        for source, metaedge, target in reader:
+            graph.add_edge(source, metaedge, target)
+
+    return graph
+
+# Graphs already parsed in this process, keyed by loader, file paths and modification times
+_graph_cache = {}
+
+def get_hetio_graph(nodes_file, edges_file, loader=load_hetio_graph):
+    """
+    Returns the graph built by `loader` for these files, parsing them only the first time
+    (or again when either file has changed on disk).
+    """
+    key = (loader,) + tuple((os.path.abspath(path), os.stat(path).st_mtime_ns) for path in (nodes_file, edges_file))
+    if key not in _graph_cache:
+        for stale in [k for k in _graph_cache if k[0] is loader]:
+            del _graph_cache[stale]  # Keep only the latest dataset in memory
+        _graph_cache[key] = loader(nodes_file, edges_file)
+    return _graph_cache[key]
@@ -0,0 +1,315 @@
+import atexit
+import bisect
+import json
+import os
+import re
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Metrics are off unless HETIO_METRICS=1; every recording call then returns immediately
+ENABLED = os.getenv("HETIO_METRICS", "0") == "1"
+
+# Opt-in extras: Neo4j PROFILE db hits (runs queries with PROFILE), and tracemalloc peaks per stage
+PROFILE_NEO4J = os.getenv("HETIO_METRICS_PROFILE", "0") == "1"
+TRACE_MEMORY = os.getenv("HETIO_METRICS_TRACEMALLOC", "0") == "1"
+
+# Written at exit when set; .json gives JSON, anything else Prometheus text
+METRICS_FILE = os.getenv("HETIO_METRICS_FILE")
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus style."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Registry:
+    """
+    Holds every metric of the process. Keys are (metric name, sorted label tuples).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, labels, value):
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+registry = Registry()
+
+def enable(profile=None, trace_memory=None):
+    """
+    Turns metrics on at runtime (e.g. from a benchmark), optionally with PROFILE capture or tracemalloc.
+    """
+    global ENABLED, PROFILE_NEO4J, TRACE_MEMORY
+    ENABLED = True
+    if profile is not None:
+        PROFILE_NEO4J = profile
+    if trace_memory is not None:
+        TRACE_MEMORY = trace_memory
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+################################################################################################
+# Recording
+################################################################################################
+class QueryTimer:
+    """Set `rows` (and, for Neo4j, `db_hits`) inside a `timed` block to record them too."""
+    __slots__ = ("rows", "db_hits")
+
+    def __init__(self):
+        self.rows = None
+        self.db_hits = None
+
+class _NoopTimer:
+    """Shared do-nothing timer used while metrics are disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+_NOOP = _NoopTimer()
+
+class _Timed:
+    __slots__ = ("name", "backend", "timer", "start")
+
+    def __init__(self, name, backend):
+        self.name = name
+        self.backend = backend
+
+    def __enter__(self):
+        self.timer = QueryTimer()
+        self.start = time.perf_counter()
+        return self.timer
+
+    def __exit__(self, exc_type, exc, tb):
+        error = exc_type is not None and not issubclass(exc_type, GeneratorExit)  # A closed stream is not an error
+        record_query(self.name, self.backend, time.perf_counter() - self.start,
+                     self.timer.rows, self.timer.db_hits, error=error)
+        return False
+
+def timed(name, backend):
+    """
+    Times one database call: `with metrics.timed("query1", "neo4j") as t: ...; t.rows = n`.
+    `name` may also be the query text, which is shortened with `query_name`.
+    """
+    if not ENABLED:
+        return _NOOP
+    return _Timed(query_name(name), backend)
+
+def record_query(name, backend, seconds, rows=None, db_hits=None, error=False):
+    """Records one finished query: latency histogram, rows returned, db hits and errors."""
+    if not ENABLED:
+        return
+    labels = {"query": name, "backend": backend}
+    registry.observe("hetio_query_duration_seconds", labels, seconds)
+    if rows is not None:
+        registry.increment("hetio_query_rows_total", labels, rows)
+    if db_hits is not None:
+        registry.increment("hetio_neo4j_db_hits_total", labels, db_hits)
+    if error:
+        registry.increment("hetio_query_errors_total", labels)
+
+def record_load(stage, rows, seconds):
+    """Records a loader run: rows written, time spent and rows/sec."""
+    if not ENABLED:
+        return
+    labels = {"stage": stage}
+    registry.increment("hetio_load_rows_total", labels, rows)
+    registry.increment("hetio_load_seconds_total", labels, seconds)
+    registry.set("hetio_load_rows_per_second", labels, rows / max(seconds, 1e-9))
+
+def record_setup(component, seconds):
+    """Records how long creating a driver or session took."""
+    if not ENABLED:
+        return
+    registry.set("hetio_setup_seconds", {"component": component}, seconds)
+
+@contextmanager
+def stage(name):
+    """
+    Records the duration and peak memory of a stage such as a full load.
+    Peak memory is the tracemalloc peak within the stage when HETIO_METRICS_TRACEMALLOC=1,
+    else the process peak RSS at the end of the stage (a high-water mark that never goes down).
+    """
+    if not ENABLED:
+        yield
+        return
+    started_tracing = TRACE_MEMORY and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if TRACE_MEMORY:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        labels = {"stage": name}
+        registry.set("hetio_stage_duration_seconds", labels, time.perf_counter() - start)
+        if TRACE_MEMORY:
+            registry.set("hetio_stage_peak_traced_bytes", labels, tracemalloc.get_traced_memory()[1])
+        registry.set("hetio_stage_peak_rss_bytes", labels, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        if started_tracing:
+            tracemalloc.stop()
+
+################################################################################################
+# Neo4j and Cassandra helpers
+################################################################################################
+def query_name(query):
+    """
+    A short stable name for a query without one: its first clauses, whitespace collapsed.
+    """
+    return " ".join(query.split())[:60]
+
+def profile_query(query):
+    """
+    Returns the query with PROFILE prepended when db-hit capture is on and the query can be profiled.
+    """
+    if not (ENABLED and PROFILE_NEO4J):
+        return query
+    text = query.lstrip().upper()
+    if text.startswith(("PROFILE", "EXPLAIN", "CREATE CONSTRAINT", "DROP", "SHOW")) or "IN TRANSACTIONS" in text:
+        return query
+    return "PROFILE " + query
+
+def count_db_hits(profile):
+    """Sums dbHits over a Neo4j profiled plan (ResultSummary.profile)."""
+    if not profile:
+        return None
+    return profile.get("dbHits", 0) + sum(count_db_hits(child) or 0 for child in profile.get("children", ()))
+
+_CQL_PATTERN = re.compile(r"^\s*(\w+)\b.*?\b(?:FROM|INTO|UPDATE|TABLE|TRUNCATE|KEYSPACE)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([\w.]+)",
+                          re.IGNORECASE | re.DOTALL)
+
+def cql_name(query_string):
+    """Names a CQL statement by its verb and table, e.g. 'select disease_info'."""
+    match = _CQL_PATTERN.match(query_string or "")
+    if match is None:
+        return query_name(query_string or "unknown")
+    return f"{match.group(1).lower()} {match.group(2)}"
+
+def instrument_cassandra_session(session):
+    """
+    Records latency and rows of every request on a cassandra-driver Session, including
+    execute, execute_async and concurrent executions. Does nothing while metrics are disabled.
+    """
+    if not ENABLED:
+        return session
+
+    def on_request(response_future):
+        statement = response_future.query
+        query_string = getattr(statement, "query_string", None) or getattr(
+            getattr(statement, "prepared_statement", None), "query_string", None) or str(statement)
+        name = cql_name(query_string)
+        start = time.perf_counter()
+        response_future.add_callbacks(
+            lambda rows: record_query(name, "cassandra", time.perf_counter() - start, len(rows or ())),
+            lambda error: record_query(name, "cassandra", time.perf_counter() - start, error=True))
+
+    session.add_request_init_listener(on_request)
+    return session
+
+################################################################################################
+# Export
+################################################################################################
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+def to_prometheus():
+    """Returns every metric in the Prometheus text exposition format."""
+    lines = []
+    with registry.lock:
+        for kind, metrics in (("counter", registry.counters), ("gauge", registry.gauges)):
+            for name in sorted({name for name, _ in metrics}):
+                lines.append(f"# TYPE {name} {kind}")
+                for (metric, labels), value in sorted(metrics.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for name in sorted({name for name, _ in registry.histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), histogram in sorted(registry.histograms.items(), key=lambda item: item[0]):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(BUCKETS) + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+def to_json():
+    """Returns every metric as a JSON-serializable dict."""
+    with registry.lock:
+        return {
+            "counters": [{"name": name, "labels": dict(labels), "value": value}
+                         for (name, labels), value in sorted(registry.counters.items())],
+            "gauges": [{"name": name, "labels": dict(labels), "value": value}
+                       for (name, labels), value in sorted(registry.gauges.items())],
+            "histograms": [{"name": name, "labels": dict(labels), "count": histogram.count, "sum": histogram.sum,
+                            "buckets": dict(zip([str(bound) for bound in BUCKETS] + ["+Inf"], histogram.counts))}
+                           for (name, labels), histogram in sorted(registry.histograms.items(), key=lambda item: item[0])],
+        }
+
+def write_metrics(path):
+    """Writes the metrics to `path`: JSON for a .json file, Prometheus text otherwise."""
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            json.dump(to_json(), f, indent=2)
+        else:
+            f.write(to_prometheus())
+
+def _write_at_exit():
+    if ENABLED and METRICS_FILE:
+        write_metrics(METRICS_FILE)
+
+atexit.register(_write_at_exit)
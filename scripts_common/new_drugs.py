@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.snapshot import get_snapshot_graph
+
+def adjacency_matrix(graph, metaedge, source_kind, target_kind):
+    """
+    Returns the metaedge of a CSRGraph as a sparse (source kind x target kind) matrix.
+    The CSR arrays are reused as they are; a missing metaedge gives an empty matrix.
+    """
+    shape = (len(graph.nodes.get(source_kind, ())), len(graph.nodes.get(target_kind, ())))
+    if metaedge not in graph.forward:
+        return sparse.csr_matrix(shape, dtype=np.int32)
+
+    adjacency = graph.forward[metaedge]
+    data = np.ones(len(adjacency.indices), dtype=np.int32)
+    return sparse.csr_matrix((data, adjacency.indices, adjacency.offsets), shape=shape)
+
+def compute_new_drug_candidates(graph):
+    """
+    Query 2 as sparse matrix products over a CSRGraph.
+
+    A compound reaches an anatomy when it up-regulates a gene the anatomy down-regulates (CuG·AdGᵀ)
+    or down-regulates a gene the anatomy up-regulates (CdG·AuGᵀ). Only anatomies where some disease
+    occurs (DlA) count. Returns (new, old) sets of compound ids: candidates without and with
+    an existing CtD/CpD edge.
+    """
+    CuG = adjacency_matrix(graph, "CuG", "Compound", "Gene")
+    CdG = adjacency_matrix(graph, "CdG", "Compound", "Gene")
+    AdG = adjacency_matrix(graph, "AdG", "Anatomy", "Gene")
+    AuG = adjacency_matrix(graph, "AuG", "Anatomy", "Gene")
+    DlA = adjacency_matrix(graph, "DlA", "Disease", "Anatomy")
+
+    reach = CuG @ AdG.T + CdG @ AuG.T                                # compound x anatomy, number of genes
+    disease_anatomies = np.asarray(DlA.sum(axis=0)).ravel() > 0     # anatomies where a disease occurs
+    reach = reach @ sparse.diags(disease_anatomies.astype(np.int32))  # keep only those anatomy columns
+    candidates = np.asarray(reach.getnnz(axis=1)) > 0
+
+    treated = np.zeros(candidates.shape, dtype=bool)
+    for metaedge in ("CtD", "CpD"):
+        treated |= np.asarray(adjacency_matrix(graph, metaedge, "Compound", "Disease").getnnz(axis=1)) > 0
+
+    compound_ids = graph.nodes["Compound"].ids if "Compound" in graph.nodes else []
+    new_drugs = {compound_ids[i] for i in np.flatnonzero(candidates & ~treated)}
+    old_drugs = {compound_ids[i] for i in np.flatnonzero(candidates & treated)}
+    return (new_drugs, old_drugs)
+
+def find_new_drugs(graph):
+    """
+    Returns [(compound id, compound name)] of new drug candidates ordered by id,
+    the same rows as `find_new_drugs` in scripts_neo4j/queries.py.
+    """
+    new_drugs, _ = compute_new_drug_candidates(graph)
+    names = graph.get_names("Compound")
+    return [(compound_id, names.get(compound_id)) for compound_id in sorted(new_drugs)]
+
+# Time the engine: python scripts_common/new_drugs.py [nodes.tsv] [edges.tsv]
+if __name__ == "__main__":
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+    nodes_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(data_dir, "nodes.tsv")
+    edges_file = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, "edges.tsv")
+
+    graph = get_snapshot_graph(nodes_file, edges_file)
+    start = time.perf_counter()
+    candidates = find_new_drugs(graph)
+    print(f"{len(candidates)} new drug candidates in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import concurrent.futures
+import heapq
+import json
+import os
+import sys
+import time
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.backends import BACKENDS, get_backend
+
+# The service only listens on loopback
+HOST = "127.0.0.1"
+QUERY_SERVICE_PORT = int(os.getenv("QUERY_SERVICE_PORT", "8765"))
+
+# Largest request head (request line + headers) accepted, in bytes
+MAX_REQUEST_BYTES = 16384
+
+################################################################################################
+# Async backends
+################################################################################################
+class AsyncNeo4jBackend:
+    """
+    Query 1 and Query 2 over one neo4j AsyncGraphDatabase driver (one connection pool).
+    """
+    name = "neo4j"
+
+    def __init__(self):
+        from neo4j import AsyncGraphDatabase
+        from scripts_neo4j.db_connection import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_MAX_POOL_SIZE
+        self.driver = AsyncGraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD),
+                                                max_connection_pool_size=NEO4J_MAX_POOL_SIZE)
+
+    async def disease_info(self, disease_id):
+        from scripts_neo4j.queries import DISEASE_INFO_QUERY
+        async with self.driver.session() as session:
+            result = await session.run(DISEASE_INFO_QUERY, disease_id=disease_id)
+            record = await result.single()
+        return dict(record) if record is not None else None
+
+    async def new_drug_candidates(self):
+        from scripts_neo4j.db_connection import FETCH_SIZE, PAGE_SIZE
+        from scripts_neo4j.queries import NEW_DRUGS_QUERY, NEW_DRUGS_MATERIALIZED_QUERY
+        async with self.driver.session(fetch_size=FETCH_SIZE) as session:
+            result = await session.run("MATCH (m:Materialization {name: 'PREDICTED_TREATS'}) RETURN m LIMIT 1")
+            if await result.peek() is None:
+                # Run the full pattern once and stream it, as in iter_new_drugs
+                result = await session.run(NEW_DRUGS_QUERY)
+                return [dict(record) async for record in result]
+
+            # Keyset pagination of the materialized edges, as in Neo4jConnection.paginate
+            candidates = []
+            after = None
+            while True:
+                result = await session.run(NEW_DRUGS_MATERIALIZED_QUERY, after=after, page_size=PAGE_SIZE)
+                page = [dict(record) async for record in result]
+                candidates.extend(page)
+                if len(page) < PAGE_SIZE:
+                    return candidates
+                after = page[-1]["Compound_ID"]
+
+    async def close(self):
+        await self.driver.close()
+
+def cassandra_result(response_future, loop):
+    """
+    Wraps a cassandra-driver ResponseFuture in an asyncio future resolving to all its rows.
+    Driver callbacks run on the driver's event thread, so results are handed over thread-safely.
+    """
+    future = loop.create_future()
+    rows = []
+
+    def resolve(setter, value):
+        if not future.done():
+            setter(value)
+
+    def on_page(page):
+        rows.extend(page)
+        if response_future.has_more_pages:
+            response_future.start_fetching_next_page()  # Calls on_page again with the next page
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, rows)
+
+    def on_error(error):
+        loop.call_soon_threadsafe(resolve, future.set_exception, error)
+
+    response_future.add_callbacks(on_page, on_error)
+    return future
+
+class AsyncCassandraBackend:
+    """
+    Query 1 and Query 2 over the shared Cassandra session, with execute_async wrapped in asyncio futures.
+    """
+    name = "cassandra"
+
+    def __init__(self):
+        self.session = None
+        self.disease_statement = None
+        self.candidates_statement = None
+
+    async def connect(self):
+        from scripts_cassandra import hetio_cassandra
+        loop = asyncio.get_running_loop()
+        # Starting Cassandra and the first ingest are blocking; keep them off the event loop
+        self.session = await loop.run_in_executor(None, hetio_cassandra.get_session)
+        self.disease_statement = self.session.prepare("SELECT * FROM disease_info WHERE disease_id = ?")
+        self.candidates_statement = self.session.prepare(
+            "SELECT compound_id, compound_name FROM new_compound_candidates WHERE bucket = ?")
+
+    async def disease_info(self, disease_id):
+        from scripts_common.backends import CassandraBackend
+        loop = asyncio.get_running_loop()
+        rows = await cassandra_result(self.session.execute_async(self.disease_statement, [disease_id]), loop)
+        return CassandraBackend.row_to_dict(rows[0] if rows else None)
+
+    async def new_drug_candidates(self):
+        from scripts_cassandra.hetio_cassandra import CANDIDATE_BUCKETS
+        loop = asyncio.get_running_loop()
+        partitions = await asyncio.gather(*(
+            cassandra_result(self.session.execute_async(self.candidates_statement, [bucket]), loop)
+            for bucket in range(CANDIDATE_BUCKETS)))
+        return [{"Compound_ID": row.compound_id, "Compound_Name": row.compound_name}
+                for row in heapq.merge(*partitions, key=lambda row: row.compound_id)]
+
+    async def close(self):
+        pass
+
+class ExecutorBackend:
+    """
+    Runs a synchronous QueryBackend (e.g. memory) on threads. Query 1 uses the default thread pool;
+    Query 2 runs on its own thread, so a long Query 2 never holds a thread Query 1 lookups need.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.query2_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="query2")
+
+    async def disease_info(self, disease_id):
+        return await asyncio.get_running_loop().run_in_executor(None, self.backend.disease_info, disease_id)
+
+    async def new_drug_candidates(self):
+        return await asyncio.get_running_loop().run_in_executor(self.query2_executor, self.backend.new_drug_candidates)
+
+    async def close(self):
+        self.query2_executor.shutdown(wait=False)
+
+async def open_async_backend(name):
+    """
+    Returns the async backend called `name`; neo4j and cassandra use their async drivers.
+    """
+    if name == "neo4j":
+        return AsyncNeo4jBackend()
+    if name == "cassandra":
+        backend = AsyncCassandraBackend()
+        await backend.connect()
+        return backend
+    return ExecutorBackend(get_backend(name))
+
+################################################################################################
+# Service
+################################################################################################
+class QueryService:
+    """
+    Serves Query 1 and Query 2 from one backend.
+
+    Identical requests that arrive while one is running share its result instead of running again.
+    Query 2 takes no parameters, so coalescing is its admission control: at most one Query 2 run
+    executes at a time, however many clients ask, and it holds one connection (Neo4j) or one
+    thread (ExecutorBackend), leaving the rest of the pool to Query 1 lookups.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.in_flight = {}  # request key -> task computing its result
+        self.counters = {"requests": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    async def coalesce(self, key, run):
+        """
+        Returns the result of `run()`, sharing one execution among concurrent calls with the same key.
+        """
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.counters["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self._execute(run))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return await asyncio.shield(task)  # A client that disconnects does not cancel the shared run
+
+    async def _execute(self, run):
+        self.counters["executions"] += 1
+        return await run()
+
+    async def disease_info(self, disease_id):
+        return await self.coalesce(("query1", disease_id), lambda: self.backend.disease_info(disease_id))
+
+    async def new_drug_candidates(self):
+        return await self.coalesce(("query2",), self.backend.new_drug_candidates)
+
+    def stats(self):
+        return dict(self.counters, backend=self.backend.name, in_flight=len(self.in_flight))
+
+    async def handle(self, path, params):
+        """
+        Routes one request. Returns (HTTP status, JSON-serializable body).
+        """
+        if path == "/query1":
+            disease_id = params.get("disease_id", [""])[0]
+            if not disease_id:
+                return (400, {"error": "disease_id is required"})
+            data = await self.disease_info(disease_id)
+            if data is None:
+                return (404, {"error": f"No data found for disease: {disease_id}", "disease_id": disease_id})
+            return (200, data)
+        if path == "/query2":
+            candidates = await self.new_drug_candidates()
+            return (200, {"count": len(candidates), "candidates": candidates})
+        if path == "/stats":
+            return (200, self.stats())
+        return (404, {"error": f"Unknown path {path}. Use /query1?disease_id=..., /query2 or /stats."})
+
+    async def handle_connection(self, reader, writer):
+        """
+        Minimal HTTP/1.1: one GET request per connection, JSON response.
+        """
+        status, body = 400, {"error": "Bad request"}
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            method, target, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+            if method != "GET":
+                status, body = 405, {"error": "Only GET is supported"}
+            else:
+                self.counters["requests"] += 1
+                url = urlsplit(target)
+                status, body = await self.handle(url.path, parse_qs(url.query))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        except Exception as error:
+            self.counters["errors"] += 1
+            status, body = 500, {"error": str(error)}
+
+        payload = json.dumps(body).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  500: "Internal Server Error"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+async def start_service(backend, port=QUERY_SERVICE_PORT):
+    """
+    Starts the service on loopback and returns (QueryService, asyncio server). Port 0 picks a free port.
+    """
+    service = QueryService(backend)
+    server = await asyncio.start_server(service.handle_connection, HOST, port, limit=MAX_REQUEST_BYTES)
+    return (service, server)
+
+async def serve(backend_name, port):
+    backend = await open_async_backend(backend_name)
+    service, server = await start_service(backend, port)
+    print(f"Query service ({backend_name}) listening on http://{HOST}:{server.sockets[0].getsockname()[1]}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await backend.close()
+
+# Run the service: python scripts_common/query_service.py [--backend neo4j] [--port 8765]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local HTTP service for Query 1 and Query 2.")
+    parser.add_argument("--backend", choices=[name for name in BACKENDS if name != "service"], default="neo4j")
+    parser.add_argument("--port", type=int, default=QUERY_SERVICE_PORT)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(serve(args.backend, args.port))
+    except KeyboardInterrupt:
+        print(f"Query service stopped after {time.perf_counter() - start:.0f}s.")
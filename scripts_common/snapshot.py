@@ -0,0 +1,176 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common.csr_graph import CSRGraph, CSRAdjacency, NodeIndex, build_csr_graph
+from scripts_common.hetio_graph import get_hetio_graph
+
+# Bump when the snapshot layout changes; older snapshots are then rebuilt
+SNAPSHOT_VERSION = 1
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+def get_snapshot_dir(edges_file):
+    """ Snapshots live next to the edges file, e.g. data/.snapshot/. """
+    return os.path.join(os.path.dirname(os.path.abspath(edges_file)), ".snapshot")
+
+def describe_sources(nodes_file, edges_file):
+    """ Identifies the source TSV files by path, size and modification time. """
+    sources = []
+    for path in (nodes_file, edges_file):
+        stat = os.stat(path)
+        sources.append({"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+    return sources
+
+def write_string_table(directory, name, strings):
+    """ Writes strings as one UTF-8 blob plus an int64 offsets array; None is stored as a flag. """
+    encoded = [(s or "").encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(directory, f"{name}_offsets.npy"), offsets)
+    np.save(os.path.join(directory, f"{name}_present.npy"), np.array([s is not None for s in strings], dtype=bool))
+
+def read_string_table(directory, name):
+    """ Reads a string table written by `write_string_table` into a list of str (None where absent). """
+    bounds = np.load(os.path.join(directory, f"{name}_offsets.npy")).tolist()
+    present = np.load(os.path.join(directory, f"{name}_present.npy")).tolist()
+    with open(os.path.join(directory, f"{name}.bin"), "rb") as f:
+        blob = f.read()
+    return [blob[bounds[i]:bounds[i + 1]].decode("utf-8") if present[i] else None for i in range(len(present))]
+
+def write_snapshot(graph, sources, snapshot_dir):
+    """
+    Writes a CSRGraph as .npy arrays plus string tables and a manifest.
+    The snapshot is written to a private temporary folder next to it and then moved into place,
+    so processes rebuilding the same snapshot at once never write into each other's files.
+    """
+    parent_dir = os.path.dirname(os.path.abspath(snapshot_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent_dir, prefix=".snapshot-")  # Same filesystem, so the rename is atomic
+    try:
+        write_snapshot_files(graph, sources, tmp_dir)
+        os.chmod(tmp_dir, 0o755)  # mkdtemp creates it private to this user
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_dir, snapshot_dir)
+        except OSError:
+            # Another process moved its snapshot of the same files into place first; keep that one
+            if read_manifest(snapshot_dir) is None:
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def write_snapshot_files(graph, sources, tmp_dir):
+    """ Writes the arrays, string tables and manifest of a snapshot into `tmp_dir`. """
+
+    kinds = list(graph.nodes)
+    for k, kind in enumerate(kinds):
+        write_string_table(tmp_dir, f"kind{k}_ids", graph.nodes[kind].ids)
+        write_string_table(tmp_dir, f"kind{k}_names", graph.nodes[kind].names)
+
+    metaedges = list(graph.forward)
+    for e, metaedge in enumerate(metaedges):  # Metaedges such as Gr>G are not safe file names, so use numbers
+        np.save(os.path.join(tmp_dir, f"edge{e}_forward_offsets.npy"), graph.forward[metaedge].offsets)
+        np.save(os.path.join(tmp_dir, f"edge{e}_forward_indices.npy"), graph.forward[metaedge].indices)
+        np.save(os.path.join(tmp_dir, f"edge{e}_backward_offsets.npy"), graph.backward[metaedge].offsets)
+        np.save(os.path.join(tmp_dir, f"edge{e}_backward_indices.npy"), graph.backward[metaedge].indices)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "sources": sources,
+        "kinds": kinds,
+        "metaedges": [[metaedge] + list(graph.metaedge_kinds[metaedge]) for metaedge in metaedges],
+    }
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+def read_manifest(snapshot_dir):
+    """ Returns the snapshot manifest, or None if there is no readable snapshot. """
+    try:
+        with open(os.path.join(snapshot_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def read_snapshot(snapshot_dir):
+    """
+    Opens a snapshot as a CSRGraph. Edge arrays are memory-mapped read-only,
+    so processes opening the same snapshot share its pages through the OS page cache.
+    """
+    manifest = read_manifest(snapshot_dir)
+    graph = CSRGraph()
+
+    for k, kind in enumerate(manifest["kinds"]):
+        nodes = NodeIndex()
+        nodes.ids = read_string_table(snapshot_dir, f"kind{k}_ids")
+        nodes.names = read_string_table(snapshot_dir, f"kind{k}_names")
+        nodes.index = {node_id: i for i, node_id in enumerate(nodes.ids)}
+        graph.nodes[kind] = nodes
+
+    for e, (metaedge, source_kind, target_kind) in enumerate(manifest["metaedges"]):
+        load = lambda name: np.load(os.path.join(snapshot_dir, f"edge{e}_{name}.npy"), mmap_mode="r")
+        graph.metaedge_kinds[metaedge] = (source_kind, target_kind)
+        graph.forward[metaedge] = CSRAdjacency(load("forward_offsets"), load("forward_indices"))
+        graph.backward[metaedge] = CSRAdjacency(load("backward_offsets"), load("backward_indices"))
+
+    return graph
+
+def is_snapshot_current(snapshot_dir, nodes_file, edges_file):
+    """ True when the snapshot exists, has the current version and matches the source files. """
+    manifest = read_manifest(snapshot_dir)
+    return (manifest is not None
+            and manifest.get("version") == SNAPSHOT_VERSION
+            and manifest.get("sources") == describe_sources(nodes_file, edges_file))
+
+def load_graph_snapshot(nodes_file, edges_file, snapshot_dir=None):
+    """
+    Returns the graph from its binary snapshot, (re)building the snapshot from the TSV files first
+    when it is missing, from an older version, or the TSV files have changed.
+    """
+    snapshot_dir = snapshot_dir or get_snapshot_dir(edges_file)
+    if not is_snapshot_current(snapshot_dir, nodes_file, edges_file):
+        print(f"Building graph snapshot in {snapshot_dir}...")
+        sources = describe_sources(nodes_file, edges_file)
+        write_snapshot(build_csr_graph(nodes_file, edges_file), sources, snapshot_dir)
+    return read_snapshot(snapshot_dir)
+
+def get_snapshot_graph(nodes_file, edges_file):
+    """
+    Returns the snapshot-backed graph for these files, opened once per process (or when they change).
+    """
+    return get_hetio_graph(nodes_file, edges_file, loader=load_graph_snapshot)
+
+def time_cold_start(mode, nodes_file, edges_file):
+    """ Times a fresh interpreter that loads the graph from 'tsv' or 'snapshot'. """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--load", mode, nodes_file, edges_file], check=True)
+    return time.perf_counter() - start
+
+# Build the snapshot and compare cold starts: python scripts_common/snapshot.py [nodes.tsv] [edges.tsv]
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--load":
+        mode, nodes_file, edges_file = sys.argv[2:5]
+        if mode == "tsv":
+            build_csr_graph(nodes_file, edges_file)
+        else:
+            read_snapshot(get_snapshot_dir(edges_file))
+        sys.exit(0)
+
+    nodes_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, "nodes.tsv")
+    edges_file = sys.argv[2] if len(sys.argv) > 2 else os.path.join(DATA_DIR, "edges.tsv")
+
+    load_graph_snapshot(nodes_file, edges_file)  # Make sure the snapshot is current
+    tsv_time = time_cold_start("tsv", nodes_file, edges_file)
+    snapshot_time = time_cold_start("snapshot", nodes_file, edges_file)
+    print(f"Cold start from TSV:      {tsv_time:.2f}s")
+    print(f"Cold start from snapshot: {snapshot_time:.2f}s")
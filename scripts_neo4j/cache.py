@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Cache settings (optional in .env)
+NEO4J_CACHE_SIZE = int(os.getenv("NEO4J_CACHE_SIZE", "256"))     # results kept
+NEO4J_CACHE_TTL = float(os.getenv("NEO4J_CACHE_TTL", "300"))     # seconds a result stays valid
+
+# Touched by load_data.py after every load; cached results older than this file are dropped
+LOAD_STAMP_FILE = os.getenv("NEO4J_LOAD_STAMP_FILE",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", ".neo4j_loaded"))
+
+def get_load_stamp(stamp_file=LOAD_STAMP_FILE):
+    """
+    Returns the modification time (ns) of the load stamp file, or 0 if no load has been recorded.
+    """
+    try:
+        return os.stat(stamp_file).st_mtime_ns
+    except OSError:
+        return 0
+
+def mark_data_loaded(stamp_file=LOAD_STAMP_FILE):
+    """
+    Records that the database contents changed, which invalidates every ResultCache in every process.
+    """
+    os.makedirs(os.path.dirname(stamp_file), exist_ok=True)
+    with open(stamp_file, "a", encoding="utf-8"):
+        pass
+    os.utime(stamp_file)
+    query_cache.clear()
+
+class ResultCache:
+    """
+    A thread-safe LRU cache of query results with a time-to-live.
+
+    Entries are evicted when the cache holds more than `maxsize` results, when they are older than
+    `ttl` seconds, or when the load stamp file changes (see `mark_data_loaded`).
+    """
+
+    def __init__(self, maxsize=NEO4J_CACHE_SIZE, ttl=NEO4J_CACHE_TTL, stamp_file=LOAD_STAMP_FILE):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stamp_file = stamp_file
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._stamp = get_load_stamp(stamp_file)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_stamp(self):
+        stamp = get_load_stamp(self.stamp_file)
+        if stamp != self._stamp:
+            self._entries.clear()
+            self._stamp = stamp
+
+    def get(self, key):
+        """
+        Returns (True, value) for a fresh cached result, else (False, None).
+        """
+        with self._lock:
+            self._check_stamp()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return (True, entry[1])
+            if entry is not None:
+                del self._entries[key]  # Expired
+                self.evictions += 1
+            self.misses += 1
+            return (False, None)
+
+    def put(self, key, value, stamp=None):
+        """
+        Stores a result. `stamp` is the load stamp seen before the result was computed;
+        if a load finished since then, the result may be stale and is not stored.
+        """
+        with self._lock:
+            self._check_stamp()
+            if stamp is not None and stamp != self._stamp:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stamp = get_load_stamp(self.stamp_file)
+
+    def stats(self):
+        """
+        Returns hit/miss/eviction counters and the current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def cached(self, func):
+        """
+        Decorator caching `func`'s result per positional/keyword arguments.
+        On a hit the function is not called at all, so it does not query or write files again.
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            found, value = self.get(key)
+            if found:
+                return value
+            stamp = get_load_stamp(self.stamp_file)
+            value = func(*args, **kwargs)
+            self.put(key, value, stamp)
+            return value
+
+        wrapper.cache = self
+        return wrapper
+
+# Shared cache for the functions in scripts_neo4j/queries.py
+query_cache = ResultCache()
@@ -1,7 +1,15 @@
 import os
+import sys
+import atexit
+import threading
+import time
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_common import metrics
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -10,29 +18,95 @@ NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USER = os.getenv("NEO4J_USER")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 
+# Connection pool settings (optional in .env)
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_LIVENESS_CHECK_TIMEOUT = float(os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", "30"))  # seconds idle before a ping
+
+# Records pulled from the server per round trip when streaming, and rows per page when paginating
+FETCH_SIZE = 1000
+PAGE_SIZE = 1000
+
 # Neo4j Connection Class
 class Neo4jConnection:
     """
     A class to manage Neo4j database connections and execute queries.
     """
 
-    def __init__(self):
+    def __init__(self, max_pool_size=NEO4J_MAX_POOL_SIZE, liveness_check_timeout=NEO4J_LIVENESS_CHECK_TIMEOUT):
         """
         Initializes the Neo4j driver with the provided credentials.
+
+        :param max_pool_size: Maximum number of pooled connections kept by the driver.
+        :param liveness_check_timeout: Idle seconds after which a pooled connection is checked before reuse.
         """
-        self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        start = time.perf_counter()
+        self.driver = GraphDatabase.driver(
+            NEO4J_URI,
+            auth=(NEO4J_USER, NEO4J_PASSWORD),
+            max_connection_pool_size=max_pool_size,
+            liveness_check_timeout=liveness_check_timeout,
+        )
+        self.driver_creation_time = time.perf_counter() - start  # Seconds spent creating the driver
+        metrics.record_setup("neo4j_driver", self.driver_creation_time)
 
-    def query(self, query, parameters=None):
+    def query(self, query, parameters=None, name=None):
         """
         Executes a Cypher query and returns the results as a list.
 
         :param query: The Cypher query to execute.
         :param parameters: Optional dictionary of query parameters.
+        :param name: Name the query is recorded under in metrics (defaults to its text).
         :return: A list of records from the query result.
         """
-        with self.driver.session() as session:
-            result = session.run(query, parameters)
-            return list(result)  # Convert result to a list before returning
+        with metrics.timed(name or query, "neo4j") as timer:
+            with self.driver.session() as session:
+                result = session.run(metrics.profile_query(query), parameters)
+                records = list(result)  # Convert result to a list before returning
+                timer.rows = len(records)
+                if metrics.ENABLED and metrics.PROFILE_NEO4J:
+                    timer.db_hits = metrics.count_db_hits(result.consume().profile)
+                return records
+
+    def stream(self, query, parameters=None, fetch_size=FETCH_SIZE, name=None):
+        """
+        Executes a Cypher query and yields records lazily, `fetch_size` records per round trip.
+        Only one batch of records is held in memory at a time.
+
+        :param query: The Cypher query to execute.
+        :param parameters: Optional dictionary of query parameters.
+        :param fetch_size: Number of records requested from the server at a time.
+        :param name: Name the query is recorded under in metrics (defaults to its text).
+        :return: A generator of records.
+        """
+        with metrics.timed(name or query, "neo4j") as timer:
+            with self.driver.session(fetch_size=fetch_size) as session:
+                result = session.run(query, parameters)
+                count = 0
+                for record in result:
+                    count += 1
+                    timer.rows = count
+                    yield record
+
+    def paginate(self, query, key, parameters=None, page_size=PAGE_SIZE, name=None):
+        """
+        Runs a keyset-paginated query page by page and yields its records.
+        The query must be ordered by `key` and use `$after` and `$page_size`, e.g.
+        `WHERE ($after IS NULL OR c.id > $after) ... ORDER BY c.id LIMIT $page_size`.
+
+        :param query: The Cypher query to execute.
+        :param key: Name of the returned column the results are ordered by.
+        :param parameters: Optional dictionary of extra query parameters.
+        :param page_size: Number of records per page.
+        :param name: Name each page query is recorded under in metrics.
+        :return: A generator of records.
+        """
+        after = None
+        while True:
+            page = self.query(query, {**(parameters or {}), "after": after, "page_size": page_size}, name=name)
+            yield from page
+            if len(page) < page_size:
+                break
+            after = page[-1][key]
 
     def close(self):
         """
@@ -40,14 +114,68 @@ class Neo4jConnection:
         """
         self.driver.close()
 
+# Process-wide shared connection, created lazily on first use
+_shared_connection = None
+_shared_lock = threading.Lock()
+
+def get_connection():
+    """
+    Returns the process-wide Neo4jConnection, creating it on first use.
+    The driver keeps a connection pool, so query functions and the GUI should reuse it instead of closing it.
+    """
+    global _shared_connection
+    if _shared_connection is None:
+        with _shared_lock:
+            if _shared_connection is None:
+                _shared_connection = Neo4jConnection()
+    return _shared_connection
+
+def close_connection():
+    """
+    Closes the process-wide connection, if one was created. Called automatically at exit.
+    """
+    global _shared_connection
+    with _shared_lock:
+        if _shared_connection is not None:
+            _shared_connection.close()
+            _shared_connection = None
+
+atexit.register(close_connection)
+
+def measure_connection_cost(query="RETURN 1", repeat=10):
+    """
+    Measures driver creation, the first connection handshake and warm query time separately.
+
+    :return: A dictionary of timings in seconds.
+    """
+    conn = Neo4jConnection()
+    try:
+        start = time.perf_counter()
+        conn.driver.verify_connectivity()
+        handshake = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            conn.query(query)
+        warm_query = (time.perf_counter() - start) / repeat
+    finally:
+        conn.close()
+
+    return {"driver_creation": conn.driver_creation_time, "first_connection": handshake, "warm_query": warm_query}
+
 # Test connection when running the script directly
 if __name__ == "__main__":
-    conn = Neo4jConnection()
+    conn = get_connection()
     try:
         result = conn.query("RETURN 'Test Connection' AS message")  # Test query to check connection
         for record in result:
             print("Successfully connected to Neo4j:", record["message"])
+
+        costs = measure_connection_cost()
+        print(f"Driver creation: {costs['driver_creation'] * 1000:.2f} ms")
+        print(f"First connection: {costs['first_connection'] * 1000:.2f} ms")
+        print(f"Warm query: {costs['warm_query'] * 1000:.2f} ms")
     except Exception as e:
         print(f"Error connecting to Neo4j: {e}")
     finally:
-        conn.close()
+        close_connection()
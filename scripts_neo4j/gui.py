@@ -4,17 +4,24 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import argparse
 import tkinter as tk
-from tkinter import ttk, scrolledtext
+from scripts_neo4j.db_connection import close_connection
 from scripts_neo4j.queries import get_disease_info, find_new_drugs
+from scripts_common.backends import BACKENDS, get_backend, format_disease_info, format_new_drugs
+from scripts_common.gui_tasks import ResultPanel, shutdown_executor
 
 class App(tk.Tk):
     """
     The main application class that manages GUI navigation.
     """
-    def __init__(self):
+    def __init__(self, backend="neo4j"):
         super().__init__()
-        self.title("Hetio Data Analysis on Neo4j Database")
+        self.backend = backend
+        if backend == "neo4j":
+            self.title("Hetio Data Analysis on Neo4j Database")
+        else:
+            self.title(f"Hetio Data Analysis ({backend} backend)")
         self.geometry("700x600")
         
         # Container for different pages
@@ -29,7 +36,38 @@ class App(tk.Tk):
             page.grid(row=0, column=0, sticky="nsew")
         
         self.show_page(InitPage)
+
+        # Queries share one pooled connection; close it when the window is closed
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
     
+    def run_query1(self, disease_id):
+        """
+        Runs Query 1 on the selected backend and returns the formatted result.
+        """
+        if self.backend == "neo4j":
+            return get_disease_info(disease_id)
+        data = get_backend(self.backend).disease_info(disease_id)
+        return format_disease_info(data) if data else f"No data found for disease: {disease_id}"
+
+    def run_query2(self):
+        """
+        Runs Query 2 on the selected backend and returns the formatted result.
+        """
+        if self.backend == "neo4j":
+            return find_new_drugs()
+        return format_new_drugs(get_backend(self.backend).new_drug_candidates())
+
+    def on_close(self):
+        """
+        Stops background queries, closes the shared Neo4j connection and the window.
+        """
+        for page in self.pages.values():
+            if hasattr(page, "results"):
+                page.results.cancel()
+        shutdown_executor()
+        close_connection()
+        self.destroy()
+
     def show_page(self, page_class):
         """
         Displays the requested page by raising it to the front.
@@ -81,6 +119,7 @@ class InitPage(tk.Frame):
 class Query1Page(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
+        self.controller = controller
         label = tk.Label(self, text="Enter the disease id", font=("Arial", 14))
         label.pack(padx=30, pady=10)
 
@@ -95,34 +134,22 @@ class Query1Page(tk.Frame):
         button2 = tk.Button(self, text="Back to Main Page", command=lambda: controller.show_page(InitPage), font=("Arial", 14))
         button2.pack(padx=30, pady=10)
 
-        # Create Text widget for displaying content
-        self.text_widget = scrolledtext.ScrolledText(self, wrap="word", font=("Arial", 14), padx=10, pady=10, height=15)
-        self.text_widget.config(state="disabled")
-
-        # Layout configuration
-        self.text_widget.pack(padx=10, pady=10, expand=True, fill="both")
+        # Results, with progress and cancel controls; queries run in the background
+        self.results = ResultPanel(self)
+        self.results.pack(expand=True, fill="both")
 
     def get_query_result(self):
-        #print("Result of Query 1")
         disease_id = self.entry.get().strip()
 
         if not disease_id.startswith("Disease::"):
-            output_text = "Invalid Disease ID format. Use 'Disease::<ID>'."
+            self.results.show_text("Invalid Disease ID format. Use 'Disease::<ID>'.")
         else:
-            output_text = get_disease_info(disease_id)  
-
-        self.update_output(output_text)
-
-    def update_output(self, text):
-        # Enable text widget to insert new content
-        self.text_widget.config(state="normal")
-        self.text_widget.delete("1.0", tk.END)  # Clear existing text
-        self.text_widget.insert("1.0", text)    # Insert new text
-        self.text_widget.config(state="disabled")   # Disable editing again
+            self.results.run(self.controller.run_query1, disease_id)
 
 class Query2Page(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
+        self.controller = controller
 
         button1 = tk.Button(self, text="Execute Query 2", command=self.get_query_result, font=("Arial", 14))
         button1.pack(padx=30, pady=10)
@@ -130,21 +157,16 @@ class Query2Page(tk.Frame):
         button2 = tk.Button(self, text="Back to Main Page", command=lambda: controller.show_page(InitPage), font=("Arial", 14))
         button2.pack(padx=30, pady=10)
 
-        self.text_widget = scrolledtext.ScrolledText(self, wrap="word", font=("Arial", 14), padx=10, pady=10, height=15)
-        self.text_widget.config(state="disabled")
-
-        self.text_widget.pack(padx=10, pady=10, expand=True, fill="both")
+        self.results = ResultPanel(self)
+        self.results.pack(expand=True, fill="both")
 
     def get_query_result(self):
-        output_text = find_new_drugs()  
-        self.update_output(output_text)
-
-    def update_output(self, text):
-        self.text_widget.config(state="normal")
-        self.text_widget.delete("1.0", tk.END)  # Clear existing text
-        self.text_widget.insert("1.0", text)    # Insert new text
-        self.text_widget.config(state="disabled")   # Disable editing again
+        self.results.run(self.controller.run_query2)
 
 if __name__ == "__main__":
-    app = App()
+    parser = argparse.ArgumentParser(description="Hetio query GUI.")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="neo4j", help="Backend that answers the queries.")
+    args = parser.parse_args()
+
+    app = App(args.backend)
     app.mainloop()
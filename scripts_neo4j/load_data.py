@@ -1,38 +1,112 @@
+import argparse
 import csv
 import sys
 import os
+import queue
+import random
+import re
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from neo4j.exceptions import TransientError
 
 # Add the project root to Python's path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from scripts_neo4j.db_connection import Neo4jConnection
+from scripts_neo4j.predictions import is_materialized, materialize_predicted_treats, refresh_predicted_treats
+from scripts_neo4j.cache import mark_data_loaded
+from scripts_common import metrics
+from scripts_common.delta import compute_delta, commit_manifest, get_manifest_dir, write_manifest
+from scripts_common.checkpoints import describe_file, save_checkpoint, load_checkpoint, clear_checkpoint, read_tsv_chunks
+from scripts_common.compressed_io import find_input, open_text
+
+# Set data file paths; compressed copies (e.g. data/edges.tsv.gz) are used when the plain file is absent
+NODES_FILE = find_input(os.path.join("data", "nodes.tsv"))
+EDGES_FILE = find_input(os.path.join("data", "edges.tsv"))
+
+# Number of rows sent per UNWIND query (or per transaction, for the checkpointed loaders)
+BATCH_SIZE = 5000
+
+# Checkpoint names of the sequential loaders (see scripts_common/checkpoints.py)
+NODES_CHECKPOINT = "neo4j_nodes"
+EDGES_CHECKPOINT = "neo4j_edges"
+
+# Parallel edge loading: worker count and retry policy for transient errors (e.g. deadlocks)
+WORKERS = 4
+MAX_RETRIES = 5
+RETRY_BACKOFF = 0.5  # seconds, doubled on each attempt
+
+# Output folder for the neo4j-admin import CSVs
+IMPORT_DIR = "import"
+
+# What the last load wrote, compared against the input files by --delta
+MANIFEST_DIR = get_manifest_dir("neo4j")
 
-# Set data file paths
-NODES_FILE = os.path.join("data", "nodes.tsv")
-EDGES_FILE = os.path.join("data", "edges.tsv")
+# Hetionet node kinds (as written in nodes.tsv) and their metaedge abbreviations
+NODE_KIND_ABBREVIATIONS = {
+    "A": "Anatomy",
+    "BP": "Biological Process",
+    "CC": "Cellular Component",
+    "C": "Compound",
+    "D": "Disease",
+    "G": "Gene",
+    "MF": "Molecular Function",
+    "PW": "Pathway",
+    "PC": "Pharmacologic Class",
+    "SE": "Side Effect",
+    "S": "Symptom",
+}
+
+# Metaedges look like <source abbreviation><relation><target abbreviation>, e.g. CtD, PCiC, Gr>G
+METAEDGE_PATTERN = re.compile(r"^([A-Z]+)([a-z>]+)([A-Z]+)$")
 
 # Function to determine correspondent node label based on kind
 def get_node_label(kind):
-    """ Maps 'kind' from nodes.tsv to the correct Neo4j label. """
-    label_mapping = {
-        "Compound": "Compound",
-        "Disease": "Disease",
-        "Gene": "Gene",
-        "Anatomy": "Anatomy"
-    }
-    return label_mapping.get(kind, "Entity")  # Default to Entity if kind is unknown
+    """ Maps 'kind' from nodes.tsv to the correct Neo4j label (e.g. 'Side Effect' -> 'SideEffect'). """
+    if kind in NODE_KIND_ABBREVIATIONS.values():
+        return kind.replace(" ", "")
+    return "Entity"  # Default to Entity if kind is unknown
+
+def get_metaedge_labels(metaedge):
+    """
+    Infers the (source label, target label) of a metaedge from its abbreviation,
+    e.g. 'CtD' -> ('Compound', 'Disease'). Unknown abbreviations map to 'Entity'.
+    """
+    match = METAEDGE_PATTERN.match(metaedge)
+    if not match:
+        return ("Entity", "Entity")
+    source_kind = NODE_KIND_ABBREVIATIONS.get(match.group(1), "")
+    target_kind = NODE_KIND_ABBREVIATIONS.get(match.group(3), "")
+    return (get_node_label(source_kind), get_node_label(target_kind))
 
 # Function to convert `>` to `_` in relationship names
 def convert_relationship_type(metaedge):
     """ Converts `>` to `_` in relationship types for Neo4j compatibility. """
     return metaedge.replace(">", "_")
 
-def load_nodes(file_path):
+def create_constraints(session):
     """
-    Loads nodes from a TSV file into Neo4j with labels.
+    Creates a uniqueness constraint on `id` for every Hetionet label (plus the Entity fallback),
+    so each endpoint lookup in `load_edges` is an index seek instead of a label scan.
+    """
+    labels = [get_node_label(kind) for kind in NODE_KIND_ABBREVIATIONS.values()] + ["Entity"]
+    for label in labels:
+        session.run(
+            f"CREATE CONSTRAINT {label.lower()}_id IF NOT EXISTS "
+            f"FOR (n:{label}) REQUIRE n.id IS UNIQUE"
+        ).consume()
+    print(f"Uniqueness constraints ensured for {len(labels)} labels.")
+
+def load_nodes_per_row(file_path):
+    """
+    Loads nodes from a TSV file into Neo4j with labels, one query per row.
+    Kept for debugging; `load_nodes` is the batched default.
     """
     conn = Neo4jConnection()
-    with open(file_path, "r", encoding="utf-8") as f:
+    with open_text(file_path) as f:
         reader = csv.DictReader(f, delimiter="\t")
         print("Headers detected:", reader.fieldnames)  
 
@@ -49,42 +123,504 @@ def load_nodes(file_path):
             )
     conn.close()
 
-def load_edges(file_path):
+def get_node_query(label):
+    return f"""
+    UNWIND $rows AS row
+    MERGE (n:{label} {{id: row.id}})
+    SET n.name = row.name
+    """
+
+def write_node_batch(session, label, rows):
+    """ Writes one chunk of nodes with a single UNWIND query inside a write transaction. """
+    query = get_node_query(label)
+    with metrics.timed("write_node_batch", "neo4j") as timer:
+        session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+        timer.rows = len(rows)
+
+def write_node_chunk(session, rows):
+    """ Writes consecutive nodes.tsv rows in one write transaction, one UNWIND query per label. """
+    groups = defaultdict(list)  # label -> rows
+    for row in rows:
+        groups[get_node_label(row["kind"].strip())].append({"id": row["id"].strip(), "name": row["name"].strip()})
+
+    def write(tx):
+        for label, group in groups.items():
+            tx.run(get_node_query(label), rows=group).consume()
+
+    with metrics.timed("write_node_chunk", "neo4j") as timer:
+        session.execute_write(write)
+        timer.rows = len(rows)
+
+def get_resume_point(name, source, resume):
+    """
+    Returns (byte offset, batch id, rows written) to continue a load from:
+    the saved checkpoint when resuming, else the start of the file.
+    """
+    state = load_checkpoint(name, source) if resume else None
+    if state is None:
+        if resume:
+            print("No checkpoint for this file, starting from the beginning.")
+        clear_checkpoint(name)
+        return (0, 0, 0)
+    print(f"Resuming after batch {state['batch_id']} ({state['rows']} rows, byte {state['offset']}).")
+    return (state["offset"], state["batch_id"], state["rows"])
+
+@metrics.stage("neo4j_load_nodes")
+def load_nodes(file_path, batch_size=BATCH_SIZE, resume=False):
+    """
+    Loads nodes from a TSV file into Neo4j with labels.
+    Every `batch_size` consecutive rows are written in one transaction (one UNWIND query per label),
+    after which the byte offset and batch id are saved as a checkpoint. With `resume`, loading
+    continues after the last saved batch. Prints throughput (rows/sec) when finished.
+    """
+    conn = Neo4jConnection()
+    source = describe_file(file_path)
+    offset, batch_id, count = get_resume_point(NODES_CHECKPOINT, source, resume)
+    written = 0
+    start = time.perf_counter()
+
+    with conn.driver.session() as session:
+        create_constraints(session)
+        for rows, offset in read_tsv_chunks(file_path, batch_size, offset):
+            write_node_chunk(session, rows)
+            batch_id += 1
+            count += len(rows)
+            written += len(rows)
+            save_checkpoint(NODES_CHECKPOINT, source, offset=offset, batch_id=batch_id, rows=count)
+            print(f"{count} nodes processed...")
+
+    elapsed = time.perf_counter() - start
+    print(f"Finished loading {written} nodes in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/sec).")
+    metrics.record_load("neo4j_load_nodes", written, elapsed)
+    conn.close()
+
+def get_edge_query(metaedge):
+    source_label, target_label = get_metaedge_labels(metaedge)
+    relationship_type = convert_relationship_type(metaedge)  # Convert for Neo4j
+    return f"""
+    UNWIND $rows AS row
+    MATCH (a:{source_label} {{id: row.source}})
+    MATCH (b:{target_label} {{id: row.target}})
+    MERGE (a)-[r:{relationship_type}]->(b)
+    ON CREATE SET r.metaedge = $original_metaedge, r.created_at = timestamp()
+    """
+
+def write_edge_batch(session, metaedge, rows):
+    """ Writes one chunk of edges of a single metaedge with a label-scoped UNWIND query. """
+    query = get_edge_query(metaedge)
+    with metrics.timed("write_edge_batch", "neo4j") as timer:
+        session.execute_write(lambda tx: tx.run(query, rows=rows, original_metaedge=metaedge).consume())
+        timer.rows = len(rows)
+
+def write_edge_chunk(session, rows):
+    """ Writes consecutive edges.tsv rows in one write transaction, one UNWIND query per metaedge. """
+    groups = defaultdict(list)  # metaedge -> rows
+    for row in rows:
+        groups[row["metaedge"].strip()].append({"source": row["source"].strip(), "target": row["target"].strip()})
+
+    def write(tx):
+        for metaedge, group in groups.items():
+            tx.run(get_edge_query(metaedge), rows=group, original_metaedge=metaedge).consume()
+
+    with metrics.timed("write_edge_chunk", "neo4j") as timer:
+        session.execute_write(write)
+        timer.rows = len(rows)
+
+@metrics.stage("neo4j_load_edges")
+def load_edges(file_path, batch_size=BATCH_SIZE, resume=False):
     """
     Loads all relationships from a TSV file into Neo4j without duplicates.
+    Every `batch_size` consecutive rows are written in one transaction (one UNWIND query per metaedge)
+    and checkpointed by byte offset and batch id, so with `resume` a restart repeats at most one batch.
     Prints progress every 10,000 edges.
     """
     conn = Neo4jConnection()
-    count = 0  
-    with open(file_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f, delimiter="\t")
+    source = describe_file(file_path)
+    offset, batch_id, count = get_resume_point(EDGES_CHECKPOINT, source, resume)
+    written = 0
+    start = time.perf_counter()
+
+    with conn.driver.session() as session:
+        create_constraints(session)
+        for rows, offset in read_tsv_chunks(file_path, batch_size, offset):
+            previous = count
+            write_edge_chunk(session, rows)
+            batch_id += 1
+            count += len(rows)
+            written += len(rows)
+            save_checkpoint(EDGES_CHECKPOINT, source, offset=offset, batch_id=batch_id, rows=count)
+            if count // 10000 > previous // 10000:
+                print(f"{count} edges processed...")
+
+    elapsed = time.perf_counter() - start
+    print(f"Finished loading {written} edges in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/sec).")
+    metrics.record_load("neo4j_load_edges", written, elapsed)
+    conn.close()
+
+def delete_edge_batch(session, metaedge, rows):
+    """ Deletes one chunk of edges of a single metaedge; edges that do not exist are skipped. """
+    source_label, target_label = get_metaedge_labels(metaedge)
+    relationship_type = convert_relationship_type(metaedge)
+    query = f"""
+    UNWIND $rows AS row
+    MATCH (a:{source_label} {{id: row.source}})-[r:{relationship_type}]->(b:{target_label} {{id: row.target}})
+    DELETE r
+    """
+    with metrics.timed("delete_edge_batch", "neo4j") as timer:
+        session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+        timer.rows = len(rows)
+
+def delete_node_batch(session, label, ids):
+    """ Deletes one chunk of nodes of a single label together with their remaining relationships. """
+    query = f"""
+    UNWIND $ids AS id
+    MATCH (n:{label} {{id: id}})
+    DETACH DELETE n
+    """
+    with metrics.timed("delete_node_batch", "neo4j") as timer:
+        session.execute_write(lambda tx: tx.run(query, ids=ids).consume())
+        timer.rows = len(ids)
+
+def write_grouped(session, write, groups, batch_size):
+    """ Calls `write(session, key, chunk)` for every chunk of `batch_size` rows of every group. Returns the row count. """
+    count = 0
+    for key, rows in groups.items():
+        for i in range(0, len(rows), batch_size):
+            write(session, key, rows[i:i + batch_size])
+        count += len(rows)
+    return count
+
+@metrics.stage("neo4j_load_delta")
+def load_delta(nodes_file, edges_file, batch_size=BATCH_SIZE, manifest_dir=MANIFEST_DIR):
+    """
+    Applies only what changed since the last load, as found by comparing the files with the manifest:
+    new or renamed nodes are merged, removed edges deleted, new edges merged and removed nodes deleted,
+    in that order. Materialized PREDICTED_TREATS edges are refreshed for the affected compounds only.
+    Returns the Delta, or None when there is no manifest yet and a full load is needed.
+    """
+    start = time.perf_counter()
+    delta = compute_delta(nodes_file, edges_file, manifest_dir)
+    if delta is None:
+        return None
+    print(f"Delta: {delta.summary()} (compared in {time.perf_counter() - start:.1f}s).")
 
+    upserted_nodes = defaultdict(list)  # label -> rows
+    for node_id, name, kind in delta.nodes_added:
+        upserted_nodes[get_node_label(kind)].append({"id": node_id, "name": name})
+    removed_nodes = defaultdict(list)  # label -> ids
+    for node_id, _, kind in delta.nodes_removed:
+        removed_nodes[get_node_label(kind)].append(node_id)
+    added_edges = defaultdict(list)    # metaedge -> rows
+    for source, metaedge, target in delta.edges_added:
+        added_edges[metaedge].append({"source": source, "target": target})
+    removed_edges = defaultdict(list)  # metaedge -> rows
+    for source, metaedge, target in delta.edges_removed:
+        removed_edges[metaedge].append({"source": source, "target": target})
+
+    conn = Neo4jConnection()
+    with conn.driver.session() as session:
+        create_constraints(session)
+        write_grouped(session, write_node_batch, upserted_nodes, batch_size)
+        write_grouped(session, delete_edge_batch, removed_edges, batch_size)
+        write_grouped(session, write_edge_batch, added_edges, batch_size)
+        write_grouped(session, delete_node_batch, removed_nodes, batch_size)
+    conn.close()
+
+    refresh_predicted_treats(delta.changed_edges())
+    commit_manifest(manifest_dir)
+
+    elapsed = time.perf_counter() - start
+    print(f"Applied {len(delta)} changed rows in {elapsed:.1f}s.")
+    metrics.record_load("neo4j_load_delta", len(delta), elapsed)
+    return delta
+
+def count_metaedges(file_path):
+    """ Counts edges per metaedge, used to balance the parallel loader's work. """
+    counts = defaultdict(int)
+    with open_text(file_path) as f:
+        reader = csv.DictReader(f, delimiter="\t")
         for row in reader:
-            original_metaedge = row["metaedge"].strip()  # Keep the original
-            relationship_type = convert_relationship_type(original_metaedge)  # Convert for Neo4j
+            counts[row["metaedge"].strip()] += 1
+    return counts
 
-            conn.query(
-                f"""
-                MATCH (a {{id: $source}}), (b {{id: $target}})
-                MERGE (a)-[r:{relationship_type}]->(b)
-                ON CREATE SET r.metaedge = $original_metaedge, r.created_at = timestamp()
-                """,
-                {"source": row["source"].strip(), "target": row["target"].strip(), "original_metaedge": original_metaedge}
-            )
+def assign_metaedges(metaedge_counts, workers):
+    """
+    Assigns every metaedge to one worker, largest first onto the least loaded worker.
+    Keeping a relationship type on one worker means two workers never MERGE the same edge type,
+    which reduces lock contention. It does not remove it: hub genes and compounds take part in
+    several metaedges handled by different workers, so those conflicts are left to
+    `write_edge_batch_with_retry`.
+    """
+    loads = [0] * workers
+    assignment = {}
+    for metaedge, count in sorted(metaedge_counts.items(), key=lambda item: item[1], reverse=True):
+        worker = loads.index(min(loads))
+        assignment[metaedge] = worker
+        loads[worker] += count
+    return assignment
 
-            count += 1
-            if count % 10000 == 0:
-                print(f"{count} edges processed...")
+def write_edge_batch_with_retry(session, metaedge, rows, retries=MAX_RETRIES):
+    """
+    Writes one edge batch, retrying transient errors (e.g. deadlocks between workers)
+    with exponential backoff and jitter once the driver's own retries are exhausted.
+    """
+    for attempt in range(retries + 1):
+        try:
+            write_edge_batch(session, metaedge, rows)
+            return
+        except TransientError as e:
+            if attempt == retries:
+                raise
+            delay = RETRY_BACKOFF * (2 ** attempt) * (1 + random.random())
+            print(f"Transient error on {metaedge} batch ({e.code}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def edge_worker(conn, worker_id, batches):
+    """
+    Consumes (metaedge, rows) batches from a queue with its own session until it gets None.
+    Returns (worker id, edges written, seconds).
+    """
+    count = 0
+    start = time.perf_counter()
+    with conn.driver.session() as session:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                break
+            metaedge, rows = batch
+            write_edge_batch_with_retry(session, metaedge, rows)
+            count += len(rows)
+    return (worker_id, count, time.perf_counter() - start)
+
+@metrics.stage("neo4j_load_edges_parallel")
+def load_edges_parallel(file_path, workers=WORKERS, partition="metaedge", batch_size=BATCH_SIZE):
+    """
+    Loads all relationships with a pool of workers, each with its own session.
+    Edges are partitioned either by metaedge (each relationship type goes to one worker)
+    or by a hash of the source node (all edges of a source node go to one worker).
+    The file is read once; each worker has a bounded queue so memory stays at a few batches.
+    Runs the same MERGE as `load_edges`, so the final graph is identical.
+    """
+    conn = Neo4jConnection()
+    with conn.driver.session() as session:
+        create_constraints(session)
+
+    if partition == "metaedge":
+        assignment = assign_metaedges(count_metaedges(file_path), workers)
+        def get_worker(source, metaedge):
+            return assignment[metaedge]
+    elif partition == "source":
+        def get_worker(source, metaedge):
+            return zlib.crc32(source.encode("utf-8")) % workers
+    else:
+        raise ValueError(f"Unknown partition strategy: {partition}")
+
+    queues = [queue.Queue(maxsize=4) for _ in range(workers)]
+    buffers = defaultdict(list)  # (worker, metaedge) -> pending rows
+    count = 0
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(edge_worker, conn, i, queues[i]) for i in range(workers)]
 
-    print(f"Finished loading {count} edges.")
+        def dispatch(worker, item):
+            # Never block forever on the queue of a worker that has died
+            while True:
+                if futures[worker].done():
+                    if item is not None:
+                        futures[worker].result()  # Re-raises the worker's error
+                    return
+                try:
+                    queues[worker].put(item, timeout=1)
+                    return
+                except queue.Full:
+                    pass
+
+        try:
+            with open_text(file_path) as f:
+                reader = csv.DictReader(f, delimiter="\t")
+                for row in reader:
+                    source, metaedge = row["source"].strip(), row["metaedge"].strip()
+                    worker = get_worker(source, metaedge)
+                    buffer = buffers[(worker, metaedge)]
+                    buffer.append({"source": source, "target": row["target"].strip()})
+
+                    if len(buffer) >= batch_size:
+                        dispatch(worker, (metaedge, buffer))
+                        buffers[(worker, metaedge)] = []
+
+                    count += 1
+                    if count % 100000 == 0:
+                        print(f"{count} edges read...")
+
+            # Flush whatever is left
+            for (worker, metaedge), buffer in buffers.items():
+                if buffer:
+                    dispatch(worker, (metaedge, buffer))
+        finally:
+            for worker in range(workers):
+                dispatch(worker, None)
+
+        for future in as_completed(futures):
+            worker_id, written, elapsed = future.result()
+            print(f"Worker {worker_id}: {written} edges in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/sec).")
+
+    elapsed = time.perf_counter() - start
+    print(f"Finished loading {count} edges with {workers} workers in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f} rows/sec).")
+    metrics.record_load("neo4j_load_edges_parallel", count, elapsed)
     conn.close()
 
+def generate_import_files(nodes_file, edges_file, output_dir=IMPORT_DIR):
+    """
+    Converts nodes.tsv and edges.tsv into header and data CSVs for `neo4j-admin database import`.
+    Writes one file pair per label and one per relationship type, streaming each input once.
+    Edges whose endpoints are not in nodes.tsv are written to rejected_edges.tsv instead,
+    so they cannot fail the offline import. Returns the import command.
+    Relationships get the same `metaedge` and `created_at` properties as `write_edge_batch` sets;
+    `created_at` is the generation time in milliseconds, like Cypher's timestamp().
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    created_at = int(time.time() * 1000)
+    node_ids = set()  # Needed to validate edge endpoints; edges themselves are never held in memory
+    writers = {}      # file name -> (file handle, csv writer)
+    node_files = {}   # label -> (header path, data path)
+    edge_files = {}   # relationship type -> (header path, data path)
+
+    def get_writer(name, header):
+        if name not in writers:
+            with open(os.path.join(output_dir, f"{name}_header.csv"), "w", encoding="utf-8", newline="") as h:
+                csv.writer(h).writerow(header)
+            f = open(os.path.join(output_dir, f"{name}.csv"), "w", encoding="utf-8", newline="")
+            writers[name] = (f, csv.writer(f))
+        return writers[name][1]
+
+    node_count = duplicate_count = edge_count = rejected_count = 0
+    try:
+        with open_text(nodes_file) as f:
+            reader = csv.DictReader(f, delimiter="\t")
+            for row in reader:
+                node_id = row["id"].strip()
+                if node_id in node_ids:
+                    duplicate_count += 1  # The importer refuses duplicate ids
+                    continue
+                node_ids.add(node_id)
+                label = get_node_label(row["kind"].strip())
+                get_writer(label, ["id:ID", "name"]).writerow([node_id, row["name"].strip()])
+                node_files[label] = (f"{label}_header.csv", f"{label}.csv")
+                node_count += 1
+
+        with open_text(edges_file) as f, \
+                open(os.path.join(output_dir, "rejected_edges.tsv"), "w", encoding="utf-8", newline="") as rejected:
+            reader = csv.DictReader(f, delimiter="\t")
+            rejected_writer = csv.writer(rejected, delimiter="\t")
+            rejected_writer.writerow(["source", "metaedge", "target", "reason"])
+
+            for row in reader:
+                source, metaedge, target = row["source"].strip(), row["metaedge"].strip(), row["target"].strip()
+                missing = [node for node in (source, target) if node not in node_ids]
+                if missing:
+                    rejected_writer.writerow([source, metaedge, target, "missing node: " + ", ".join(missing)])
+                    rejected_count += 1
+                    continue
+
+                relationship_type = convert_relationship_type(metaedge)
+                get_writer(relationship_type, [":START_ID", ":END_ID", "metaedge", "created_at:long"]).writerow([source, target, metaedge, created_at])
+                edge_files[relationship_type] = (f"{relationship_type}_header.csv", f"{relationship_type}.csv")
+                edge_count += 1
+
+                if edge_count % 100000 == 0:
+                    print(f"{edge_count} edges converted...")
+    finally:
+        for f, _ in writers.values():
+            f.close()
+
+    command = ["neo4j-admin", "database", "import", "full", "neo4j", "--overwrite-destination"]
+    for label, (header, data) in sorted(node_files.items()):
+        command.append(f"--nodes={label}={os.path.join(output_dir, header)},{os.path.join(output_dir, data)}")
+    for relationship_type, (header, data) in sorted(edge_files.items()):
+        command.append(f"--relationships={relationship_type}={os.path.join(output_dir, header)},{os.path.join(output_dir, data)}")
+    command = " ".join(command)
+
+    with open(os.path.join(output_dir, "import_command.sh"), "w", encoding="utf-8") as f:
+        f.write(command + "\n")
+
+    print(f"Wrote {node_count} nodes ({len(node_files)} labels) and {edge_count} edges ({len(edge_files)} types) to {output_dir}.")
+    if duplicate_count:
+        print(f"Skipped {duplicate_count} duplicate node ids.")
+    if rejected_count:
+        print(f"Rejected {rejected_count} edges with missing endpoints, see {os.path.join(output_dir, 'rejected_edges.tsv')}.")
+    print("Stop the database, then run:")
+    print(command)
+    return command
 
 if __name__ == "__main__":
-    print("Loading nodes from:", NODES_FILE)
-    load_nodes(NODES_FILE)
+    parser = argparse.ArgumentParser(description="Load Hetionet nodes and edges into Neo4j.")
+    parser.add_argument("--nodes", default=NODES_FILE, help="nodes.tsv to load; .gz, .bz2 and .xz files are read directly.")
+    parser.add_argument("--edges", default=EDGES_FILE, help="edges.tsv to load (e.g. hetionet-v1.0-edges.sif.gz).")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows sent per UNWIND query.")
+    parser.add_argument("--per-row", action="store_true", help="Use the old one-query-per-node loader.")
+    parser.add_argument("--import-csv", metavar="OUTPUT_DIR", nargs="?", const=IMPORT_DIR,
+                        help="Write neo4j-admin import CSVs instead of loading through Cypher.")
+    parser.add_argument("--constraints-only", action="store_true",
+                        help="Only create the id uniqueness constraints (e.g. after an offline import).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Load edges with this many parallel workers (1 = sequential).")
+    parser.add_argument("--partition", choices=["metaedge", "source"], default="metaedge",
+                        help="How edges are split across parallel workers.")
+    parser.add_argument("--materialize", action="store_true",
+                        help="Materialize Query 2 as PREDICTED_TREATS edges after loading.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted load after its last checkpointed batch.")
+    parser.add_argument("--delta", action="store_true",
+                        help="Only apply the rows that changed since the last load (full load if there is none yet).")
+    args = parser.parse_args()
+    if args.resume and (args.per_row or args.workers > 1):
+        parser.error("--resume needs the default batched loaders (no --per-row, --workers 1).")
+
+    if args.constraints_only:
+        conn = Neo4jConnection()
+        with conn.driver.session() as session:
+            create_constraints(session)
+        conn.close()
+        mark_data_loaded()  # Last step of an offline import
+        sys.exit(0)
+
+    if args.import_csv:
+        print("Generating neo4j-admin import files in:", args.import_csv)
+        generate_import_files(args.nodes, args.edges, args.import_csv)
+        sys.exit(0)
+
+    if args.delta:
+        if load_delta(args.nodes, args.edges, batch_size=args.batch_size) is not None:
+            mark_data_loaded()
+            sys.exit(0)
+        print("No manifest of a previous load found, running a full load.")
+
+    print("Loading nodes from:", args.nodes)
+    if args.per_row:
+        load_nodes_per_row(args.nodes)
+    else:
+        load_nodes(args.nodes, batch_size=args.batch_size, resume=args.resume)
     print("Nodes loaded successfully.")
 
     print("Loading all edges...")
-    load_edges(EDGES_FILE)  
+    if args.workers > 1:
+        load_edges_parallel(args.edges, workers=args.workers, partition=args.partition, batch_size=args.batch_size)
+    else:
+        load_edges(args.edges, batch_size=args.batch_size, resume=args.resume)
     print("All edges loaded successfully.")
+
+    # A full load can change any prediction, so rebuild them if they are in use
+    if args.materialize or is_materialized():
+        print("Materializing PREDICTED_TREATS edges...")
+        materialize_predicted_treats()
+
+    # Record what was loaded so the next --delta run only applies changes
+    write_manifest(args.nodes, args.edges, MANIFEST_DIR)
+
+    # The load is complete; the next run starts over unless it is a --delta
+    clear_checkpoint(NODES_CHECKPOINT)
+    clear_checkpoint(EDGES_CHECKPOINT)
+
+    # Drop cached query results in running GUIs and services
+    mark_data_loaded()
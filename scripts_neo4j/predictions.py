@@ -0,0 +1,151 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts_neo4j.db_connection import get_connection, close_connection
+
+# Compounds recomputed per transaction
+BATCH_SIZE = 200
+
+# Metaedges whose changes can change a PREDICTED_TREATS edge
+PREDICTION_METAEDGES = {"CuG", "CdG", "AuG", "AdG", "DlA", "CtD", "CpD"}
+
+# Writes (c)-[:PREDICTED_TREATS {via_genes, via_anatomies}]->(d) for a batch of compounds.
+# Same rule as Query 2: the compound regulates a gene in the opposite direction to an anatomy
+# where the disease occurs, and the compound does not already treat or palliate any disease.
+PREDICT_QUERY = """
+UNWIND $compound_ids AS compound_id
+MATCH (c:Compound {id: compound_id})
+WHERE NOT EXISTS { MATCH (c)-[:CtD|CpD]->(:Disease) }
+CALL {
+    WITH c
+    MATCH (c)-[:CuG]->(g:Gene)<-[:AdG]-(a:Anatomy)<-[:DlA]-(d:Disease)
+    RETURN d, g, a
+    UNION
+    WITH c
+    MATCH (c)-[:CdG]->(g:Gene)<-[:AuG]-(a:Anatomy)<-[:DlA]-(d:Disease)
+    RETURN d, g, a
+}
+WITH c, d, COLLECT(DISTINCT g.id) AS via_genes, COLLECT(DISTINCT a.id) AS via_anatomies
+MERGE (c)-[p:PREDICTED_TREATS]->(d)
+SET p.via_genes = via_genes, p.via_anatomies = via_anatomies
+"""
+
+def is_materialized():
+    """
+    Returns True when PREDICTED_TREATS edges have been materialized.
+    """
+    result = get_connection().query("MATCH (m:Materialization {name: 'PREDICTED_TREATS'}) RETURN m.refreshed_at AS refreshed_at")
+    return bool(result)
+
+def recompute_compounds(compound_ids, batch_size=BATCH_SIZE):
+    """
+    Deletes and recomputes the PREDICTED_TREATS edges of the given compounds, `batch_size` compounds per transaction.
+    """
+    conn = get_connection()
+    compound_ids = sorted(compound_ids)
+    with conn.driver.session() as session:
+        for i in range(0, len(compound_ids), batch_size):
+            batch = compound_ids[i:i + batch_size]
+
+            def write(tx):
+                tx.run("""
+                    UNWIND $compound_ids AS compound_id
+                    MATCH (:Compound {id: compound_id})-[p:PREDICTED_TREATS]->()
+                    DELETE p
+                """, compound_ids=batch).consume()
+                tx.run(PREDICT_QUERY, compound_ids=batch).consume()
+
+            session.execute_write(write)
+
+        session.run("""
+            MERGE (m:Materialization {name: 'PREDICTED_TREATS'})
+            SET m.refreshed_at = timestamp()
+        """).consume()
+
+def materialize_predicted_treats(batch_size=BATCH_SIZE):
+    """
+    Rebuilds every PREDICTED_TREATS edge from scratch.
+    """
+    start = time.perf_counter()
+    conn = get_connection()
+    conn.query("""
+        MATCH ()-[p:PREDICTED_TREATS]->()
+        CALL { WITH p DELETE p } IN TRANSACTIONS OF 10000 ROWS
+    """)
+    compound_ids = [record["id"] for record in conn.query("MATCH (c:Compound) RETURN c.id AS id")]
+    recompute_compounds(compound_ids, batch_size)
+
+    count = conn.query("MATCH ()-[p:PREDICTED_TREATS]->() RETURN count(p) AS count")[0]["count"]
+    print(f"Materialized {count} PREDICTED_TREATS edges in {time.perf_counter() - start:.1f}s.")
+
+def get_affected_compounds(changed_edges):
+    """
+    Returns the ids of compounds whose predictions can change when the given
+    (source, metaedge, target) edges are inserted or deleted.
+    """
+    compounds = set()
+    genes = set()
+    anatomies = set()
+    for source, metaedge, target in changed_edges:
+        if metaedge in ("CuG", "CdG", "CtD", "CpD"):
+            compounds.add(source)
+        elif metaedge in ("AuG", "AdG"):
+            genes.add(target)
+        elif metaedge == "DlA":
+            anatomies.add(target)
+
+    conn = get_connection()
+    if genes:
+        result = conn.query("""
+            MATCH (c:Compound)-[:CuG|CdG]->(g:Gene)
+            WHERE g.id IN $gene_ids
+            RETURN DISTINCT c.id AS id
+        """, {"gene_ids": list(genes)})
+        compounds.update(record["id"] for record in result)
+    if anatomies:
+        result = conn.query("""
+            MATCH (c:Compound)-[:CuG|CdG]->(:Gene)<-[:AuG|AdG]-(a:Anatomy)
+            WHERE a.id IN $anatomy_ids
+            RETURN DISTINCT c.id AS id
+        """, {"anatomy_ids": list(anatomies)})
+        compounds.update(record["id"] for record in result)
+    return compounds
+
+def refresh_predicted_treats(changed_edges, batch_size=BATCH_SIZE):
+    """
+    Incrementally refreshes PREDICTED_TREATS after CuG/CdG/AuG/AdG/DlA/CtD/CpD edges changed.
+    Only compounds that can be affected by the change are recomputed. Does nothing if not materialized.
+    """
+    changed_edges = [edge for edge in changed_edges if edge[1] in PREDICTION_METAEDGES]
+    if not changed_edges or not is_materialized():
+        return 0
+
+    start = time.perf_counter()
+    compound_ids = get_affected_compounds(changed_edges)
+    recompute_compounds(compound_ids, batch_size)
+    print(f"Refreshed PREDICTED_TREATS for {len(compound_ids)} compounds in {time.perf_counter() - start:.1f}s.")
+    return len(compound_ids)
+
+def drop_predicted_treats():
+    """
+    Removes the materialized edges; Query 2 then runs the full pattern query again.
+    """
+    conn = get_connection()
+    conn.query("""
+        MATCH ()-[p:PREDICTED_TREATS]->()
+        CALL { WITH p DELETE p } IN TRANSACTIONS OF 10000 ROWS
+    """)
+    conn.query("MATCH (m:Materialization {name: 'PREDICTED_TREATS'}) DELETE m")
+    print("PREDICTED_TREATS edges removed.")
+
+# Materialize from the terminal: python scripts_neo4j/predictions.py [--drop]
+if __name__ == "__main__":
+    try:
+        if "--drop" in sys.argv:
+            drop_predicted_treats()
+        else:
+            materialize_predicted_treats()
+    finally:
+        close_connection()
@@ -2,7 +2,13 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from scripts_neo4j.db_connection import Neo4jConnection
+from scripts_neo4j.db_connection import get_connection, PAGE_SIZE
+from scripts_neo4j.predictions import is_materialized
+from scripts_neo4j.cache import query_cache
+from scripts_common.backends import format_disease_info, format_new_drug, read_ids_file
+
+# Disease ids sent per UNWIND query in batch Query 1
+DISEASE_BATCH_SIZE = 1000
 
 def save_results_to_file(filename, content):
     """
@@ -18,6 +24,34 @@ def save_results_to_file(filename, content):
     print(f"Results saved to {file_path}")
 
 # Query 1: Get Disease Information (Sorted Without APOC)
+DISEASE_INFO_QUERY = """
+MATCH (d:Disease {id: $disease_id})
+OPTIONAL MATCH (d)<-[:CtD|CpD]-(c:Compound)  // Compounds treating or palliating the disease
+OPTIONAL MATCH (d)-[:DaG|DdG|DuG]->(g:Gene)  // Genes associated with the disease
+OPTIONAL MATCH (d)-[:DlA]->(a:Anatomy)       // Where the disease occurs (anatomy)
+
+WITH d, 
+     [drug IN COLLECT(DISTINCT c.name) | drug] AS Drugs,
+     [gene IN COLLECT(DISTINCT g.name) | gene] AS Genes,
+     [location IN COLLECT(DISTINCT a.name) | location] AS Locations
+
+RETURN 
+    d.id AS Disease_ID,
+    d.name AS Disease_Name, 
+    Drugs,
+    Genes,
+    Locations
+"""
+
+def fetch_disease_info(disease_id):
+    """
+    Runs Query 1 and returns the result record, or None if the disease does not exist.
+    """
+    conn = get_connection()  # Shared pooled connection, not closed after each query
+    result = conn.query(DISEASE_INFO_QUERY, {"disease_id": disease_id}, name="query1")
+    return result[0] if result else None
+
+@query_cache.cached
 def get_disease_info(disease_id):
     """
     Given a disease ID, retrieve:
@@ -26,101 +60,188 @@ def get_disease_info(disease_id):
     3. Gene names associated with the disease (DaG, DdG, DuG)
     4. Where the disease occurs (linked via DlA)
     """
-    query = """
-    MATCH (d:Disease {id: $disease_id})
-    OPTIONAL MATCH (d)<-[:CtD|CpD]-(c:Compound)  // Compounds treating or palliating the disease
-    OPTIONAL MATCH (d)-[:DaG|DdG|DuG]->(g:Gene)  // Genes associated with the disease
-    OPTIONAL MATCH (d)-[:DlA]->(a:Anatomy)       // Where the disease occurs (anatomy)
-
-    WITH d, 
-         [drug IN COLLECT(DISTINCT c.name) | drug] AS Drugs,
-         [gene IN COLLECT(DISTINCT g.name) | gene] AS Genes,
-         [location IN COLLECT(DISTINCT a.name) | location] AS Locations
+    data = fetch_disease_info(disease_id)
 
-    RETURN 
-        d.id AS Disease_ID,
-        d.name AS Disease_Name, 
-        Drugs,
-        Genes,
-        Locations
-    """
-    
-    conn = Neo4jConnection()
-    result = conn.query(query, {"disease_id": disease_id})
-    conn.close()
-
-    if not result:
+    if data is None:
         return f"No data found for disease: {disease_id}"
 
-    data = result[0]
-
     # Formatting results into a readable string
-    output_text = f"\nDisease ID: {data['Disease_ID']}\n"
-    output_text += f"Disease Name: {data['Disease_Name']}\n"
-    output_text += f"Drugs for Treatment/Palliation: {', '.join(sorted(data['Drugs'])) if data['Drugs'] else 'None'}\n"
-    output_text += f"Genes that Cause the Disease: {', '.join(sorted(data['Genes'])) if data['Genes'] else 'None'}\n"
-    output_text += f"Anatomy Locations: {', '.join(sorted(data['Locations'])) if data['Locations'] else 'Unknown'}\n"
+    output_text = format_disease_info(data)
 
     # Save results to file
     save_results_to_file("neo4j_query1.txt", output_text)
 
     return output_text  # Return formatted text to GUI
 
-# Query 2: Find New Drug Candidate
+# Query 1 for many diseases in one round trip. Each OPTIONAL MATCH is collected before the next
+# so the drug, gene and anatomy matches of a disease are not multiplied together.
+DISEASES_INFO_QUERY = """
+UNWIND $disease_ids AS disease_id
+MATCH (d:Disease {id: disease_id})
+OPTIONAL MATCH (d)<-[:CtD|CpD]-(c:Compound)
+WITH d, COLLECT(DISTINCT c.name) AS Drugs
+OPTIONAL MATCH (d)-[:DaG|DdG|DuG]->(g:Gene)
+WITH d, Drugs, COLLECT(DISTINCT g.name) AS Genes
+OPTIONAL MATCH (d)-[:DlA]->(a:Anatomy)
+WITH d, Drugs, Genes, COLLECT(DISTINCT a.name) AS Locations
+
+RETURN
+    d.id AS Disease_ID,
+    d.name AS Disease_Name,
+    Drugs,
+    Genes,
+    Locations
+"""
+
+def iter_diseases_info(disease_ids, batch_size=DISEASE_BATCH_SIZE):
+    """
+    Runs Query 1 for many diseases, `batch_size` ids per query, and yields (disease_id, record)
+    as records stream in. Ids with no Disease node are yielded last as (disease_id, None).
+    """
+    conn = get_connection()
+    disease_ids = list(dict.fromkeys(disease_ids))  # Drop duplicates, keep order
+    found = set()
+    for i in range(0, len(disease_ids), batch_size):
+        batch = disease_ids[i:i + batch_size]
+        for record in conn.stream(DISEASES_INFO_QUERY, {"disease_ids": batch}, name="query1_batch"):
+            found.add(record["Disease_ID"])
+            yield (record["Disease_ID"], record)
+
+    for disease_id in disease_ids:
+        if disease_id not in found:
+            yield (disease_id, None)
+
+def get_diseases_info(disease_ids, filename="neo4j_query1_batch.txt"):
+    """
+    Query 1 for a list of disease ids. Writes each result to the 'test_results' file as it arrives
+    and lists the ids that were not found at the end. Returns the list of missing ids.
+    """
+    folder_path = "test_results"
+    os.makedirs(folder_path, exist_ok=True)
+    file_path = os.path.join(folder_path, filename)
+
+    found = 0
+    missing = []
+    with open(file_path, "w", encoding="utf-8") as file:
+        for disease_id, data in iter_diseases_info(disease_ids):
+            if data is None:
+                missing.append(disease_id)
+                continue
+            file.write(format_disease_info(data))
+            found += 1
+        if missing:
+            file.write(f"\nNo data found for diseases: {', '.join(missing)}\n")
+
+    print(f"{found} diseases saved to {file_path}")
+    if missing:
+        print(f"No data found for {len(missing)} diseases: {', '.join(missing)}")
+    return missing
+
+# Query 2: Find New Drug Candidate (run once and streamed; see iter_new_drugs)
+NEW_DRUGS_QUERY = """
+MATCH (a:Anatomy)-[:AdG|AuG]->(g:Gene)  
+MATCH (c:Compound)-[:CuG|CdG]->(g)  
+WHERE (
+(NOT EXISTS { MATCH (c)-[:CtD|CpD]->(:Disease) } 
+    AND EXISTS { MATCH (a)-[:AdG]->(g) } 
+    AND EXISTS { MATCH (c)-[:CuG]->(g) } 
+    AND EXISTS { MATCH (d:Disease)-[:DlA]->(a) })
+OR 
+(NOT EXISTS { MATCH (c)-[:CtD|CpD]->(:Disease) } 
+    AND EXISTS { MATCH (a)-[:AuG]->(g) } 
+    AND EXISTS { MATCH (c)-[:CdG]->(g) } 
+    AND EXISTS { MATCH (d:Disease)-[:DlA]->(a) })
+)
+
+RETURN DISTINCT c.id AS Compound_ID, c.name AS Compound_Name
+ORDER BY c.id
+"""
+
+# Query 2 over the materialized PREDICTED_TREATS edges (see scripts_neo4j/predictions.py), keyset-paginated on c.id
+NEW_DRUGS_MATERIALIZED_QUERY = """
+MATCH (c:Compound)-[:PREDICTED_TREATS]->(:Disease)
+WHERE ($after IS NULL OR c.id > $after)
+RETURN DISTINCT c.id AS Compound_ID, c.name AS Compound_Name
+ORDER BY c.id
+LIMIT $page_size
+"""
+
+def iter_new_drugs(page_size=PAGE_SIZE):
+    """
+    Yields new drug candidates ordered by compound id, `page_size` records at a time,
+    so large results can be written or rendered with bounded memory.
+    Reads the materialized PREDICTED_TREATS edges page by page when they exist. Otherwise the
+    full pattern is run once and streamed: paginating it would re-run the whole expansion per page.
+    """
+    conn = get_connection()
+    if is_materialized():
+        yield from conn.paginate(NEW_DRUGS_MATERIALIZED_QUERY, "Compound_ID", page_size=page_size, name="query2")
+    else:
+        yield from conn.stream(NEW_DRUGS_QUERY, fetch_size=page_size, name="query2")
+
+@query_cache.cached
 def find_new_drugs():
     """
     Identifies new drug candidates that can treat diseases but are NOT currently linked to any disease.
     """
-    query = """
-    MATCH (a:Anatomy)-[:AdG|AuG]->(g:Gene)  
-    MATCH (c:Compound)-[:CuG|CdG]->(g)  
-    WHERE 
-    (NOT EXISTS { MATCH (c)-[:CtD|CpD]->(:Disease) } 
-        AND EXISTS { MATCH (a)-[:AdG]->(g) } 
-        AND EXISTS { MATCH (c)-[:CuG]->(g) } 
-        AND EXISTS { MATCH (d:Disease)-[:DlA]->(a) })
-    OR 
-    (NOT EXISTS { MATCH (c)-[:CtD|CpD]->(:Disease) } 
-        AND EXISTS { MATCH (a)-[:AuG]->(g) } 
-        AND EXISTS { MATCH (c)-[:CdG]->(g) } 
-        AND EXISTS { MATCH (d:Disease)-[:DlA]->(a) })
-    
-    RETURN DISTINCT c.id AS Compound_ID, c.name AS Compound_Name
-    ORDER BY c.id
-    """
-    
-    conn = Neo4jConnection()
-    result = conn.query(query)
-    conn.close()
+    lines = [format_new_drug(record) for record in iter_new_drugs()]
 
-    if not result:
+    if not lines:
         return "No new drug candidates found."
 
     # Formatting results into a readable string
     output_text = "Potential New Drugs:\n"
-    output_text += "\n".join([f"{record['Compound_ID']}, Compound Name: {record['Compound_Name']}" for record in result])
+    output_text += "\n".join(lines)
 
     # Save results to file
     save_results_to_file("neo4j_query2.txt", output_text)
 
     return output_text  # Return formatted text to GUI
 
+def export_new_drugs(filename="neo4j_query2.txt", page_size=PAGE_SIZE):
+    """
+    Streams new drug candidates straight into a file in the 'test_results' folder, batch by batch,
+    without building the whole result in memory. Returns the number of candidates written.
+    """
+    folder_path = "test_results"
+    os.makedirs(folder_path, exist_ok=True)
+    file_path = os.path.join(folder_path, filename)
+
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as file:
+        for record in iter_new_drugs(page_size):
+            file.write(("Potential New Drugs:\n" if count == 0 else "\n") + format_new_drug(record))
+            count += 1
+        if count == 0:
+            file.write("No new drug candidates found.")
+
+    print(f"{count} candidates saved to {file_path}")
+    return count
+
 # Allow terminal-based queries
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python scripts_neo4j/queries.py <query_number> [Disease_ID]")
+        print("Usage: python scripts_neo4j/queries.py <query_number> [Disease_ID ...]")
         print("Example for disease info: python scripts_neo4j/queries.py 1 Disease::DOID:1686")
+        print("Example for many diseases: python scripts_neo4j/queries.py 1 --file disease_ids.txt")
         print("Example for new drug candidates: python scripts_neo4j/queries.py 2")
         sys.exit(1)
     
     query_number = sys.argv[1]
     if query_number == "1":
-        if len(sys.argv) != 3:
-            print("For Query 1, please provide a disease ID.")
+        if "--file" in sys.argv[2:] and not (len(sys.argv) == 4 and sys.argv[2] == "--file"):
+            print("Usage: python scripts_neo4j/queries.py 1 Disease_ID [Disease_ID ...] | --file disease_ids.txt")
+            sys.exit(1)
+        if len(sys.argv) == 4 and sys.argv[2] == "--file":
+            get_diseases_info(read_ids_file(sys.argv[3]))
+        elif len(sys.argv) > 3:
+            get_diseases_info(sys.argv[2:])
+        elif len(sys.argv) == 3:
+            get_disease_info(sys.argv[2])
+        else:
+            print("For Query 1, please provide one or more disease IDs, or --file with one ID per line.")
             sys.exit(1)
-        disease_id = sys.argv[2]
-        get_disease_info(disease_id)
     elif query_number == "2":
-        find_new_drugs()
+        export_new_drugs()
     else:
         print("Invalid query number. Use 1 for disease info, 2 for new drug candidates.")
\ No newline at end of file
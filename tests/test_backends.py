@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_common.backends import MemoryBackend, PandasBackend, get_backend, format_disease_info, format_new_drugs
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+def test_memory_backend(tmp_path):
+    """
+    The in-memory backend answers Query 1 and Query 2 without a database server.
+    """
+    nodes = tmp_path / "nodes.tsv"
+    edges = tmp_path / "edges.tsv"
+    nodes.write_bytes(open(os.path.join(DATA_DIR, "sample_nodes.tsv"), "rb").read())
+    edges.write_bytes(open(os.path.join(DATA_DIR, "sample_edges.tsv"), "rb").read())
+    backend = MemoryBackend(str(nodes), str(edges))
+
+    data = backend.disease_info("Disease::DOID:0050156")
+    assert data["Disease_Name"] == "idiopathic pulmonary fibrosis"
+    assert data["Drugs"] == ["Goserelin"]
+    assert data["Genes"] == ["A1BG"]
+    assert data["Locations"] == ["uterine cervix"]
+    assert "Anatomy Locations: uterine cervix" in format_disease_info(data)
+    assert backend.disease_info("Disease::DOID:0") is None
+
+    results = dict(backend.diseases_info(["Disease::DOID:0050156", "Disease::DOID:0", "Disease::DOID:0050156"]))
+    assert results == {"Disease::DOID:0050156": data, "Disease::DOID:0": None}
+
+    # The only regulating compound (Goserelin) already treats a disease
+    assert backend.new_drug_candidates() == []
+    assert format_new_drugs([]) == "No new drug candidates found."
+
+def test_pandas_backend_matches_memory(tmp_path):
+    """
+    The pandas backend returns the same rows as the in-memory backend.
+    """
+    nodes = tmp_path / "nodes.tsv"
+    edges = tmp_path / "edges.tsv"
+    nodes.write_bytes(open(os.path.join(DATA_DIR, "sample_nodes.tsv"), "rb").read())
+    edges.write_bytes(open(os.path.join(DATA_DIR, "sample_edges.tsv"), "rb").read())
+    memory = MemoryBackend(str(nodes), str(edges))
+    pandas = PandasBackend(str(nodes), str(edges))
+
+    for disease_id in ("Disease::DOID:0050156", "Disease::DOID:0"):
+        assert pandas.disease_info(disease_id) == memory.disease_info(disease_id)
+    assert pandas.new_drug_candidates() == memory.new_drug_candidates()
+
+def test_get_backend():
+    """
+    Backends are looked up by name and shared per process.
+    """
+    assert get_backend("memory") is get_backend("memory")
+    try:
+        get_backend("mongodb")
+        assert False, "unknown backend should fail"
+    except ValueError:
+        pass
+
+# Run the test
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_memory_backend(pathlib.Path(tempfile.mkdtemp()))
+    test_pandas_backend_matches_memory(pathlib.Path(tempfile.mkdtemp()))
+    test_get_backend()
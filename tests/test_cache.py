@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_neo4j.cache import ResultCache, mark_data_loaded
+
+def test_result_cache(tmp_path):
+    """
+    Results are served from the cache until evicted by size, by age, or by a new load.
+    """
+    stamp_file = str(tmp_path / ".neo4j_loaded")
+    cache = ResultCache(maxsize=2, ttl=60, stamp_file=stamp_file)
+    calls = []
+
+    @cache.cached
+    def lookup(disease_id):
+        calls.append(disease_id)
+        return f"info for {disease_id}"
+
+    assert lookup("D1") == lookup("D1") == "info for D1"
+    assert calls == ["D1"]
+
+    lookup("D2")
+    lookup("D3")  # Evicts D1, the least recently used
+    lookup("D1")
+    assert calls == ["D1", "D2", "D3", "D1"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["size"] == 2
+
+    mark_data_loaded(stamp_file)  # A finished load invalidates every cached result
+    lookup("D1")
+    assert calls[-1] == "D1" and len(calls) == 5
+
+    cache.ttl = 0  # Results expire immediately
+    lookup("D2")
+    lookup("D2")
+    assert calls[-2:] == ["D2", "D2"]
+
+# Run the test
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_result_cache(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_common import checkpoints
+from scripts_common.checkpoints import describe_file, save_checkpoint, load_checkpoint, clear_checkpoint, read_tsv_chunks
+
+EDGES = ("source\tmetaedge\ttarget\n"
+         "Compound::DB00014\tCtD\tDisease::DOID:0050156\n"
+         "Compound::DB00014\tCuG\tGene::1\n"
+         "Disease::DOID:0050156\tDaG\tGene::2\n"
+         "Gene::1\tGr>G\tGene::2\n"
+         "Anatomy::UBERON:0000002\tAuG\tGene::1\n")
+
+def test_resume_from_offset(tmp_path):
+    """
+    A load resumed from the checkpoint of its last written chunk reads exactly the remaining rows.
+    """
+    checkpoint_dir = checkpoints.CHECKPOINT_DIR
+    checkpoints.CHECKPOINT_DIR = str(tmp_path / "checkpoints")
+    try:
+        check_resume_from_offset(tmp_path)
+    finally:
+        checkpoints.CHECKPOINT_DIR = checkpoint_dir
+
+def check_resume_from_offset(tmp_path):
+    edges = tmp_path / "edges.tsv"
+    edges.write_text(EDGES, encoding="utf-8")
+    source = describe_file(str(edges))
+
+    chunks = list(read_tsv_chunks(str(edges), 2))
+    assert [len(rows) for rows, _ in chunks] == [2, 2, 1]
+    assert chunks[0][0][0] == {"source": "Compound::DB00014", "metaedge": "CtD", "target": "Disease::DOID:0050156"}
+    assert chunks[-1][1] == os.path.getsize(edges)
+
+    # Interrupted after the first chunk
+    save_checkpoint("edges", source, offset=chunks[0][1], batch_id=1, rows=2)
+    state = load_checkpoint("edges", source)
+    assert state == {"offset": chunks[0][1], "batch_id": 1, "rows": 2}
+    resumed = [row["metaedge"] for rows, _ in read_tsv_chunks(str(edges), 2, state["offset"]) for row in rows]
+    assert resumed == ["DaG", "Gr>G", "AuG"]
+
+    # A checkpoint of another version of the file is ignored
+    edges.write_text(EDGES + "Gene::2\tGiG\tGene::1\n", encoding="utf-8")
+    assert load_checkpoint("edges", describe_file(str(edges))) is None
+
+    clear_checkpoint("edges")
+    assert load_checkpoint("edges", source) is None
+
+# Run the test
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_resume_from_offset(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_common.compressed_io import COMPRESSED_OPENERS, find_input, open_text, compress_copy
+from scripts_common.checkpoints import read_tsv_chunks
+from scripts_common.csr_graph import build_csr_graph
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+NODES_FILE = os.path.join(DATA_DIR, 'sample_nodes.tsv')
+EDGES_FILE = os.path.join(DATA_DIR, 'sample_edges.tsv')
+
+def test_compressed_inputs_match_plain(tmp_path):
+    """
+    Every supported format reads back as the plain file, inline and with the background thread,
+    and loaders accept compressed paths directly.
+    """
+    with open(EDGES_FILE, encoding="utf-8") as f:
+        plain = f.read()
+    plain_graph = build_csr_graph(NODES_FILE, EDGES_FILE)
+
+    for suffix in COMPRESSED_OPENERS:
+        edges = compress_copy(EDGES_FILE, suffix, str(tmp_path))
+        for background in (True, False):
+            with open_text(edges, background=background) as f:
+                assert f.read() == plain
+
+        graph = build_csr_graph(compress_copy(NODES_FILE, suffix, str(tmp_path)), edges)
+        assert sorted(graph.edges("CtD")) == sorted(plain_graph.edges("CtD"))
+        assert graph.get_names("Disease") == plain_graph.get_names("Disease")
+
+        # Resuming from a checkpointed offset skips the same rows as in the plain file
+        offset = next(read_tsv_chunks(edges, 2))[1]
+        assert [rows for rows, _ in read_tsv_chunks(edges, 2, offset)] == [rows for rows, _ in read_tsv_chunks(EDGES_FILE, 2, offset)]
+
+def test_find_input_and_errors(tmp_path):
+    """
+    A missing plain file falls back to its compressed copy; corrupt data raises in the reader.
+    """
+    plain = str(tmp_path / "edges.tsv")
+    assert find_input(plain) == plain
+    compress_copy(EDGES_FILE, ".gz", str(tmp_path))
+    os.rename(tmp_path / "sample_edges.tsv.gz", plain + ".gz")
+    assert find_input(plain) == plain + ".gz"
+
+    (tmp_path / "broken.tsv.gz").write_bytes(b"not gzip data")
+    try:
+        with open_text(str(tmp_path / "broken.tsv.gz")) as f:
+            f.read()
+        assert False, "corrupt input was not reported"
+    except OSError:
+        pass
+
+# Run the test
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_compressed_inputs_match_plain(pathlib.Path(tempfile.mkdtemp()))
+    test_find_input_and_errors(pathlib.Path(tempfile.mkdtemp()))
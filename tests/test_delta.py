@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_common.delta import sort_rows, compute_delta, commit_manifest, write_manifest
+
+NODES = ("id\tname\tkind\n"
+         "Compound::DB00014\tGoserelin\tCompound\n"
+         "Disease::DOID:0050156\tidiopathic pulmonary fibrosis\tDisease\n"
+         "Gene::1\tA1BG\tGene\n"
+         "Gene::2\tA2M\tGene\n")
+EDGES = ("source\tmetaedge\ttarget\n"
+         "Compound::DB00014\tCtD\tDisease::DOID:0050156\n"
+         "Compound::DB00014\tCuG\tGene::1\n"
+         "Disease::DOID:0050156\tDaG\tGene::2\n")
+
+def test_sort_rows_merges_runs(tmp_path):
+    """
+    Rows spilled over several runs come out sorted, without duplicates, whitespace normalized.
+    """
+    source = tmp_path / "edges.tsv"
+    source.write_text(EDGES + "Compound::DB00014 \tCuG\tGene::1\n" + "Gene::2\tGiG\tGene::1\n", encoding="utf-8")
+    output = tmp_path / "edges.sorted"
+
+    assert sort_rows(str(source), str(output), run_size=2) == 4
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert lines == sorted(lines)
+    assert sorted(line.split("\t", 1)[1] for line in lines) == sorted([
+        "Compound::DB00014\tCtD\tDisease::DOID:0050156", "Compound::DB00014\tCuG\tGene::1",
+        "Disease::DOID:0050156\tDaG\tGene::2", "Gene::2\tGiG\tGene::1"])
+    assert not list(tmp_path.glob("*.run"))
+
+def test_compute_delta(tmp_path):
+    """
+    Only added, renamed and removed rows are reported; a rename is not a removal.
+    """
+    nodes = tmp_path / "nodes.tsv"
+    edges = tmp_path / "edges.tsv"
+    manifest_dir = str(tmp_path / "manifest")
+    nodes.write_text(NODES, encoding="utf-8")
+    edges.write_text(EDGES, encoding="utf-8")
+    assert compute_delta(str(nodes), str(edges), manifest_dir) is None
+
+    write_manifest(str(nodes), str(edges), manifest_dir, run_size=2)
+    assert len(compute_delta(str(nodes), str(edges), manifest_dir, run_size=2)) == 0
+
+    nodes.write_text(NODES.replace("\tA1BG\t", "\tA1BG gene\t").replace("Gene::2\tA2M\tGene\n", "")
+                     + "Gene::3\tNAT2\tGene\n", encoding="utf-8")
+    edges.write_text(EDGES.replace("Disease::DOID:0050156\tDaG\tGene::2\n", "")
+                     + "Compound::DB00014\tCdG\tGene::3\n", encoding="utf-8")
+    delta = compute_delta(str(nodes), str(edges), manifest_dir, run_size=2)
+
+    assert sorted(delta.nodes_added) == [("Gene::1", "A1BG gene", "Gene"), ("Gene::3", "NAT2", "Gene")]
+    assert delta.nodes_removed == [("Gene::2", "A2M", "Gene")]
+    assert delta.edges_added == [("Compound::DB00014", "CdG", "Gene::3")]
+    assert delta.edges_removed == [("Disease::DOID:0050156", "DaG", "Gene::2")]
+    assert delta.changed_node_ids() == {"Gene::1", "Gene::2", "Gene::3"}
+
+    # Until the delta is committed, the next run still compares against the old load
+    assert len(compute_delta(str(nodes), str(edges), manifest_dir)) == 5
+    commit_manifest(manifest_dir)
+    assert len(compute_delta(str(nodes), str(edges), manifest_dir)) == 0
+
+# Run the test
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_sort_rows_merges_runs(pathlib.Path(tempfile.mkdtemp()))
+    test_compute_delta(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,83 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_common.hetio_graph import load_hetio_graph
+from scripts_common.csr_graph import build_csr_graph
+from scripts_common.snapshot import load_graph_snapshot, is_snapshot_current, write_snapshot, read_snapshot, describe_sources
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+NODES_FILE = os.path.join(DATA_DIR, 'sample_nodes.tsv')
+EDGES_FILE = os.path.join(DATA_DIR, 'sample_edges.tsv')
+
+def test_load_hetio_graph():
+    """
+    Names are grouped by kind and edges are indexed by metaedge in both directions.
+    """
+    graph = load_hetio_graph(NODES_FILE, EDGES_FILE)
+
+    assert graph.get_names("Gene") == {"Gene::1": "A1BG"}
+    assert graph.get_names("Compound")["Compound::DB00014"] == "Goserelin"
+    assert list(graph.edges("CtD")) == [("Compound::DB00014", "Disease::DOID:0050156")]
+    assert graph.targets("DlA", "Disease::DOID:0050156") == ["Anatomy::UBERON:0000002"]
+    assert graph.sources("CuG", "Gene::1") == ["Compound::DB00014"]
+    assert graph.sources("CuG", "Gene::404") == []
+
+def test_csr_graph_matches_hetio_graph():
+    """
+    The compact CSR graph answers the same lookups as the dict-based model.
+    """
+    graph = load_hetio_graph(NODES_FILE, EDGES_FILE)
+    csr = build_csr_graph(NODES_FILE, EDGES_FILE)
+
+    for kind in ("Anatomy", "Compound", "Disease", "Gene"):
+        assert csr.get_names(kind) == graph.get_names(kind)
+        for node_id, name in graph.get_names(kind).items():
+            assert csr.get_name(kind, node_id) == name
+    assert csr.get_name("Gene", "Gene::404") is None  # Edge endpoint missing from nodes.tsv
+    assert csr.get_name("Disease", "Disease::DOID:0") is None
+    for metaedge in graph.adjacency:
+        assert sorted(csr.edges(metaedge)) == sorted(graph.edges(metaedge))
+        assert dict(csr.reverse(metaedge)) == graph.reverse(metaedge)
+    assert csr.sources("CuG", "Gene::1") == ["Compound::DB00014"]
+    assert csr.targets("CuG", "Gene::1") == []
+
+def test_graph_snapshot(tmp_path):
+    """
+    A snapshot round-trips the graph and is rebuilt when the source TSV changes.
+    """
+    nodes = tmp_path / "nodes.tsv"
+    edges = tmp_path / "edges.tsv"
+    nodes.write_bytes(open(NODES_FILE, "rb").read())
+    edges.write_bytes(open(EDGES_FILE, "rb").read())
+    snapshot_dir = str(tmp_path / "snapshot")
+
+    graph = build_csr_graph(str(nodes), str(edges))
+    snapshot = load_graph_snapshot(str(nodes), str(edges), snapshot_dir)
+    assert is_snapshot_current(snapshot_dir, str(nodes), str(edges))
+    assert snapshot.get_names("Disease") == graph.get_names("Disease")
+    assert sorted(snapshot.edges("DlA")) == sorted(graph.edges("DlA"))
+
+    with open(edges, "a", encoding="utf-8") as f:
+        f.write("Compound::DB00035\tCtD\tDisease::DOID:0050156\n")
+    assert not is_snapshot_current(snapshot_dir, str(nodes), str(edges))
+    snapshot = load_graph_snapshot(str(nodes), str(edges), snapshot_dir)
+    assert len(list(snapshot.edges("CtD"))) == 2
+
+    # Concurrent rebuilds stage in separate folders and leave one complete snapshot behind
+    graph = build_csr_graph(str(nodes), str(edges))
+    writers = [threading.Thread(target=write_snapshot, args=(graph, describe_sources(str(nodes), str(edges)), snapshot_dir))
+               for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert is_snapshot_current(snapshot_dir, str(nodes), str(edges))
+    assert sorted(read_snapshot(snapshot_dir).edges("CtD")) == sorted(graph.edges("CtD"))
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".snapshot-")]
+
+# Run the test
+if __name__ == "__main__":
+    test_load_hetio_graph()
+    test_csr_graph_matches_hetio_graph()
@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import time
+
+from scripts_neo4j.load_data import get_node_label, get_metaedge_labels, convert_relationship_type, generate_import_files
+
+def test_get_node_label():
+    """
+    Every Hetionet kind gets its own label; unknown kinds fall back to Entity.
+    """
+    assert get_node_label("Compound") == "Compound"
+    assert get_node_label("Side Effect") == "SideEffect"
+    assert get_node_label("Biological Process") == "BiologicalProcess"
+    assert get_node_label("Unknown") == "Entity"
+
+def test_get_metaedge_labels():
+    """
+    Source and target labels are inferred from the metaedge abbreviation.
+    """
+    assert get_metaedge_labels("CtD") == ("Compound", "Disease")
+    assert get_metaedge_labels("DlA") == ("Disease", "Anatomy")
+    assert get_metaedge_labels("PCiC") == ("PharmacologicClass", "Compound")
+    assert get_metaedge_labels("CcSE") == ("Compound", "SideEffect")
+    assert get_metaedge_labels("Gr>G") == ("Gene", "Gene")
+    assert convert_relationship_type("Gr>G") == "Gr_G"
+
+def test_generate_import_files(tmp_path):
+    """
+    The import generator writes one file per label/type and rejects edges with missing endpoints.
+    """
+    nodes = tmp_path / "nodes.tsv"
+    edges = tmp_path / "edges.tsv"
+    nodes.write_text("id\tname\tkind\n"
+                     "Compound::DB00014\tGoserelin\tCompound\n"
+                     "Disease::DOID:0050156\tidiopathic pulmonary fibrosis\tDisease\n"
+                     "Gene::1\tA1BG\tGene\n", encoding="utf-8")
+    edges.write_text("source\tmetaedge\ttarget\n"
+                     "Compound::DB00014\tCtD\tDisease::DOID:0050156\n"
+                     "Gene::1\tGr>G\tGene::1\n"
+                     "Compound::DB00014\tCuG\tGene::404\n", encoding="utf-8")
+
+    output_dir = tmp_path / "import"
+    start = int(time.time() * 1000)
+    command = generate_import_files(str(nodes), str(edges), str(output_dir))
+
+    assert "--nodes=Compound=" in command
+    assert "--relationships=Gr_G=" in command
+    assert (output_dir / "Gene_header.csv").read_text(encoding="utf-8").strip() == "id:ID,name"
+    assert (output_dir / "CtD_header.csv").read_text(encoding="utf-8").strip() == ":START_ID,:END_ID,metaedge,created_at:long"
+    with open(output_dir / "CtD.csv", encoding="utf-8") as f:
+        (row,) = list(csv.reader(f))
+    assert row[:3] == ["Compound::DB00014", "Disease::DOID:0050156", "CtD"]
+    assert start <= int(row[3]) <= int(time.time() * 1000)  # Same milliseconds as Cypher's timestamp()
+    assert not (output_dir / "CuG.csv").exists()
+    assert "Gene::404" in (output_dir / "rejected_edges.tsv").read_text(encoding="utf-8")
+
+# Run the test
+if __name__ == "__main__":
+    test_get_node_label()
+    test_get_metaedge_labels()
@@ -0,0 +1,47 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_common import metrics
+
+def test_metrics(tmp_path):
+    """
+    Recorded queries, loads and stages are exported as Prometheus text and JSON; nothing is kept when disabled.
+    """
+    metrics.registry.clear()
+    metrics.disable()
+    with metrics.timed("query1", "neo4j") as timer:
+        timer.rows = 3
+    assert metrics.to_json()["histograms"] == []
+
+    metrics.enable()
+    try:
+        with metrics.timed("query1", "neo4j") as timer:
+            timer.rows = 3
+        with metrics.stage("load"):
+            metrics.record_load("load", 1000, 0.5)
+        metrics.record_setup("neo4j_driver", 0.01)
+    finally:
+        metrics.disable()
+
+    text = metrics.to_prometheus()
+    assert 'hetio_query_duration_seconds_count{backend="neo4j",query="query1"} 1' in text
+    assert 'hetio_query_duration_seconds_bucket{backend="neo4j",query="query1",le="+Inf"} 1' in text
+    assert 'hetio_query_rows_total{backend="neo4j",query="query1"} 3' in text
+    assert 'hetio_load_rows_per_second{stage="load"} 2000.0' in text
+    assert 'hetio_stage_peak_rss_bytes{stage="load"}' in text
+
+    metrics.write_metrics(str(tmp_path / "metrics.json"))
+    data = json.loads((tmp_path / "metrics.json").read_text())
+    assert {"name": "hetio_setup_seconds", "labels": {"component": "neo4j_driver"}, "value": 0.01} in data["gauges"]
+
+    assert metrics.cql_name("SELECT * FROM disease_info WHERE disease_id = ?") == "select disease_info"
+    assert metrics.cql_name("\n INSERT INTO compound_info (a) VALUES (?)") == "insert compound_info"
+    assert metrics.count_db_hits({"dbHits": 2, "children": [{"dbHits": 3, "children": []}]}) == 5
+    metrics.registry.clear()
+
+# Run the test
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_metrics(pathlib.Path(tempfile.mkdtemp()))
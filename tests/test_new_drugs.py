@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_common.csr_graph import build_csr_graph
+from scripts_common.new_drugs import compute_new_drug_candidates, find_new_drugs
+
+NODES = """id\tname\tkind
+Compound::C1\tup drug\tCompound
+Compound::C2\tdown drug\tCompound
+Compound::C3\ttreating drug\tCompound
+Compound::C4\tsame direction drug\tCompound
+Compound::C5\tno disease drug\tCompound
+Gene::G1\tgene one\tGene
+Gene::G2\tgene two\tGene
+Anatomy::A1\twith disease\tAnatomy
+Anatomy::A2\twithout disease\tAnatomy
+Disease::D1\tdisease one\tDisease
+"""
+
+EDGES = """source\tmetaedge\ttarget
+Compound::C1\tCuG\tGene::G1
+Anatomy::A1\tAdG\tGene::G1
+Compound::C2\tCdG\tGene::G2
+Anatomy::A1\tAuG\tGene::G2
+Compound::C3\tCuG\tGene::G1
+Compound::C3\tCtD\tDisease::D1
+Compound::C4\tCuG\tGene::G2
+Compound::C5\tCdG\tGene::G1
+Anatomy::A2\tAuG\tGene::G1
+Disease::D1\tDlA\tAnatomy::A1
+"""
+
+def test_compute_new_drug_candidates(tmp_path):
+    """
+    Candidates regulate a gene opposite to an anatomy where a disease occurs; treating compounds are split out.
+    """
+    nodes = tmp_path / "nodes.tsv"
+    edges = tmp_path / "edges.tsv"
+    nodes.write_text(NODES, encoding="utf-8")
+    edges.write_text(EDGES, encoding="utf-8")
+    graph = build_csr_graph(str(nodes), str(edges))
+
+    new_drugs, old_drugs = compute_new_drug_candidates(graph)
+    assert new_drugs == {"Compound::C1", "Compound::C2"}
+    assert old_drugs == {"Compound::C3"}
+    assert find_new_drugs(graph) == [("Compound::C1", "up drug"), ("Compound::C2", "down drug")]
+
+# Run the test
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_compute_new_drug_candidates(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,76 @@
+import sys
+import os
+import asyncio
+import concurrent.futures
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts_common.backends import MemoryBackend, ServiceBackend
+from scripts_common.query_service import ExecutorBackend, start_service
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+class BlockingBackend(MemoryBackend):
+    """Memory backend whose Query 2 blocks until released, so requests overlap deterministically."""
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.query2_calls = 0
+        self.release = threading.Event()
+
+    def new_drug_candidates(self):
+        self.query2_calls += 1
+        self.release.wait()
+        return [{"Compound_ID": "Compound::C1", "Compound_Name": "one"}]
+
+async def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+def test_query_service():
+    """
+    The service answers over HTTP, runs concurrent identical requests once, and keeps answering
+    Query 1 while Query 2 runs, even with a single worker thread for lookups.
+    """
+    backend = BlockingBackend(os.path.join(DATA_DIR, "sample_nodes.tsv"), os.path.join(DATA_DIR, "sample_edges.tsv"))
+    clients = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=1))  # The service's lookup pool
+        service, server = await start_service(ExecutorBackend(backend), port=0)
+        client = ServiceBackend(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}")
+        requests = []
+        async with server:
+            try:
+                query2 = [loop.run_in_executor(clients, client.new_drug_candidates) for _ in range(4)]
+                requests += query2
+                await wait_until(lambda: service.counters["coalesced"] == 3)
+
+                # Query 1 lookups are answered while the shared Query 2 run is still blocked
+                lookup = loop.run_in_executor(clients, client.disease_info, "Disease::DOID:0050156")
+                requests.append(lookup)
+                await asyncio.wait([lookup], timeout=10)
+                assert lookup.done(), "Query 1 waited for Query 2"
+                assert lookup.result()["Drugs"] == ["Goserelin"]
+                assert await loop.run_in_executor(clients, client.disease_info, "Disease::DOID:0") is None
+                assert not any(request.done() for request in query2)
+
+                backend.release.set()
+                results = await asyncio.gather(*query2)
+                assert all(result == results[0] for result in results)
+                assert results[0] == [{"Compound_ID": "Compound::C1", "Compound_Name": "one"}]
+                assert backend.query2_calls == 1
+                assert service.counters["executions"] == 3  # One Query 2 run and two lookups
+            finally:
+                backend.release.set()  # Let blocked requests finish even if an assertion failed
+                await asyncio.wait(requests, timeout=10)
+
+    asyncio.run(scenario())
+    clients.shutdown()
+
+# Run the test
+if __name__ == "__main__":
+    test_query_service()
@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_data import METAEDGES, NODE_KINDS, generate_dataset, scaled
+from scripts_common.csr_graph import build_csr_graph
+
+def test_generate_dataset(tmp_path):
+    """
+    The generator is reproducible, keeps the scaled counts and writes files the loaders can read.
+    """
+    node_counts, edge_counts = generate_dataset(str(tmp_path / "a"), scale=0.05, seed=7)
+    generate_dataset(str(tmp_path / "b"), scale=0.05, seed=7)
+    for name in ("nodes.tsv", "edges.tsv"):
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+
+    assert node_counts == {kind: scaled(count, 0.05) for kind, (count, _, _) in NODE_KINDS.items()}
+    for metaedge, (source_kind, target_kind, count) in METAEDGES.items():
+        # Small scales can cap dense metaedges at every possible (source, target) pair
+        max_degree = node_counts[target_kind] - (source_kind == target_kind)
+        assert edge_counts[metaedge] == min(scaled(count, 0.05), node_counts[source_kind] * max_degree)
+
+    edges = (tmp_path / "a" / "edges.tsv").read_text().splitlines()[1:]
+    assert len(edges) == len(set(edges)) == sum(edge_counts.values())
+
+    graph = build_csr_graph(str(tmp_path / "a" / "nodes.tsv"), str(tmp_path / "a" / "edges.tsv"))
+    assert len(graph.get_names("Gene")) == node_counts["Gene"]
+    assert sum(1 for _ in graph.edges("GpBP")) == edge_counts["GpBP"]
+
+# Run the test
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_generate_dataset(pathlib.Path(tempfile.mkdtemp()))